@@ -4,10 +4,17 @@
 -- ============================================
 
 -- Drop existing tables (if needed for fresh start)
+DROP MATERIALIZED VIEW IF EXISTS request_rollup;
+DROP TABLE IF EXISTS rollup_refreshes CASCADE;
+DROP TABLE IF EXISTS request_outbox CASCADE;
+DROP TABLE IF EXISTS priority_weight_versions CASCADE;
+DROP TABLE IF EXISTS login_rate_limits CASCADE;
 DROP TABLE IF EXISTS audit_logs CASCADE;
 DROP TABLE IF EXISTS requests CASCADE;
 DROP TABLE IF EXISTS staff CASCADE;
 DROP TABLE IF EXISTS citizens CASCADE;
+DROP SEQUENCE IF EXISTS request_id_seq;
+DROP SEQUENCE IF EXISTS staff_id_seq;
 
 -- ============================================
 -- CITIZENS TABLE
@@ -80,19 +87,92 @@ CREATE TABLE requests (
 -- ============================================
 -- AUDIT LOGS TABLE (System Activity Tracking)
 -- ============================================
+-- Range-partitioned by month on timestamp: date filters only touch the
+-- matching months, and old months are detached, archived and dropped as a
+-- whole (flask --app app archive-audit-logs) instead of deleted row by row.
+-- Unique keys must include the partition key, hence (audit_id, timestamp)
+-- and (audit_code, timestamp).
 CREATE TABLE audit_logs (
-    audit_id SERIAL PRIMARY KEY,
-    audit_code VARCHAR(50) UNIQUE,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    audit_id SERIAL,
+    audit_code VARCHAR(50),
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     action_type VARCHAR(50) NOT NULL CHECK (action_type IN ('LOGIN', 'LOGOUT', 'CREATE', 'UPDATE', 'DELETE', 'STATUS_CHANGE', 'REGISTER', 'PASSWORD_CHANGED', 'LOGIN_FAILED', 'PASSWORD_CHANGE_FAILED')),
     user_email VARCHAR(255) NOT NULL,
     user_role VARCHAR(50),
     entity_type VARCHAR(50),
     entity_id VARCHAR(50),
     details TEXT,
-    ip_address VARCHAR(50)
+    ip_address VARCHAR(50),
+    PRIMARY KEY (audit_id, timestamp),
+    UNIQUE (audit_code, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Current month and the next three; the app's audit writer keeps creating
+-- upcoming months (AUDIT_PARTITION_MONTHS_AHEAD)
+DO $$
+DECLARE
+    month_start TIMESTAMP := date_trunc('month', CURRENT_DATE);
+BEGIN
+    FOR i IN 0..3 LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                       'audit_logs_' || to_char(month_start + make_interval(months => i), 'YYYYMM'),
+                       month_start + make_interval(months => i),
+                       month_start + make_interval(months => i + 1));
+    END LOOP;
+END $$;
+
+-- Entries outside every monthly partition (e.g. back-dated imports) land
+-- here; it normally stays empty
+CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+-- ============================================
+-- LOGIN RATE LIMITS (Shared Sliding-Window Counters)
+-- ============================================
+-- Used when the app runs with LOGIN_LIMITER_BACKEND=postgres; one row per
+-- key (e.g. 'login-ip:203.0.113.7') and fixed window. UNLOGGED: counters
+-- are disposable and skip the WAL.
+CREATE UNLOGGED TABLE login_rate_limits (
+    bucket_key VARCHAR(300) NOT NULL,
+    window_index BIGINT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_key, window_index)
+);
+
+-- ============================================
+-- PRIORITY WEIGHT VERSIONS (Priority Formula History)
+-- ============================================
+-- One row per weights version applied with `flask rescore-requests`; workers
+-- use the latest version for new requests.
+CREATE TABLE priority_weight_versions (
+    version INTEGER PRIMARY KEY,
+    weights JSONB NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    applied_by VARCHAR(255)
+);
+
+-- ============================================
+-- REQUEST OUTBOX (Cross-Worker Cache Invalidation)
+-- ============================================
+-- Written in the same transaction as every request insert/update, followed by
+-- NOTIFY request_changes. Workers apply entries after the last outbox_id they
+-- have seen; entries older than OUTBOX_RETENTION_SECONDS are pruned.
+CREATE TABLE request_outbox (
+    outbox_id BIGSERIAL PRIMARY KEY,
+    request_id VARCHAR(50) NOT NULL,
+    change_type VARCHAR(20) NOT NULL,
+    origin VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ============================================
+-- ID SEQUENCES (Block-Prefetched ID Allocation)
+-- ============================================
+-- Numbers for REQ-000001 / STAFF-0001 style IDs. Each nextval() reserves a
+-- block of INCREMENT BY numbers that one app worker hands out locally, so
+-- IDs never collide across workers. Gaps are expected.
+CREATE SEQUENCE request_id_seq START WITH 1 INCREMENT BY 100;
+CREATE SEQUENCE staff_id_seq START WITH 1 INCREMENT BY 1;
+
 -- ============================================
 -- INDEXES for Performance
 -- ============================================
@@ -114,12 +194,26 @@ CREATE INDEX idx_requests_status ON requests(status);
 CREATE INDEX idx_requests_severity ON requests(severity);
 CREATE INDEX idx_requests_priority ON requests(priority_score DESC);
 CREATE INDEX idx_requests_submitted ON requests(submitted_at DESC);
+-- Keyset pagination for GET /api/requests (ORDER BY priority_score DESC, submitted_at DESC, request_id DESC)
+CREATE INDEX idx_requests_keyset ON requests(priority_score DESC, submitted_at DESC, request_id DESC);
+-- Delta sync for GET /api/requests/changes (rows changed after an (updated_at, request_id) watermark)
+CREATE INDEX idx_requests_updated ON requests(updated_at, request_id);
 CREATE INDEX idx_requests_assigned_staff ON requests(assigned_staff_id);
 
+-- Request outbox pruning
+CREATE INDEX idx_request_outbox_created ON request_outbox(created_at);
+
 -- Audit logs indexes
-CREATE INDEX idx_audit_timestamp ON audit_logs(timestamp DESC);
-CREATE INDEX idx_audit_user ON audit_logs(user_email);
-CREATE INDEX idx_audit_action_type ON audit_logs(action_type);
+-- The admin listing filters on an equality column (action_type, user_email or
+-- entity_type) plus an optional time range, and pages newest first on
+-- (timestamp, audit_id). Each index below serves one filter with the ordering
+-- already in place, so a page is a short index range scan; the capped count
+-- query only needs the indexed columns (index-only scan).
+-- Indexes on the partitioned table are created on every partition.
+CREATE INDEX idx_audit_keyset ON audit_logs(timestamp DESC, audit_id DESC);
+CREATE INDEX idx_audit_action_keyset ON audit_logs(action_type, timestamp DESC, audit_id DESC);
+CREATE INDEX idx_audit_user_keyset ON audit_logs(user_email, timestamp DESC, audit_id DESC);
+CREATE INDEX idx_audit_entity_type_keyset ON audit_logs(entity_type, timestamp DESC, audit_id DESC);
 CREATE INDEX idx_audit_entity ON audit_logs(entity_type, entity_id);
 
 -- ============================================
@@ -146,6 +240,11 @@ INSERT INTO requests (request_id, citizen_name, email, phone, location_address,
 ('REQ-000002', 'Sarah Smith', 'sarah@example.com', '+1-555-0002', '456 Oak Ave, West District', 40.7228, -74.0160, 'educational', 'urgent', 1, 'Need laptop for online classes, exam next week', '["student"]', '', TRUE, '{"type": "devices", "details": "Engineering student, need computer for CAD software"}', FALSE, 'pending', CURRENT_TIMESTAMP - INTERVAL '1 hour', 68, 'Within 6 hours', NULL, NULL),
 ('REQ-000003', 'Maria Garcia', 'maria@example.com', '+1-555-0003', '789 Pine Rd, East District', 40.7328, -74.0260, 'food', 'urgent', 5, 'Family needs food assistance, lost job recently', '["children"]', 'Single parent with 3 children', FALSE, NULL, TRUE, 'pending', CURRENT_TIMESTAMP - INTERVAL '3 hours', 72, 'Within 6 hours', NULL, NULL);
 
+-- Continue the ID sequences after the sample rows (run the same statements
+-- when adding the sequences to an existing database)
+SELECT setval('request_id_seq', (SELECT COALESCE(MAX(SUBSTRING(request_id FROM 5)::INTEGER), 0) + 1 FROM requests WHERE request_id ~ '^REQ-[0-9]+$'), false);
+SELECT setval('staff_id_seq', (SELECT COALESCE(MAX(SUBSTRING(staff_id FROM 7)::INTEGER), 0) + 1 FROM staff WHERE staff_id ~ '^STAFF-[0-9]+$'), false);
+
 -- ============================================
 -- TRIGGERS
 -- ============================================
@@ -209,6 +308,31 @@ SELECT
     COUNT(*) AS total_requests
 FROM requests;
 
+-- Per need type/status/severity request counts for the dashboards. The app
+-- refreshes it with REFRESH MATERIALIZED VIEW CONCURRENTLY (which needs the
+-- unique index) at most once per DASHBOARD_ROLLUP_TTL, and sums the rows
+-- instead of counting the requests table on every page view.
+CREATE MATERIALIZED VIEW request_rollup AS
+SELECT 
+    need_type,
+    status,
+    severity,
+    COUNT(*) AS requests,
+    COUNT(*) FILTER (WHERE is_student = TRUE) AS students,
+    COUNT(*) FILTER (WHERE vulnerability_group ? 'student') AS student_group
+FROM requests
+GROUP BY need_type, status, severity;
+
+CREATE UNIQUE INDEX idx_request_rollup_key ON request_rollup(need_type, status, severity);
+
+-- When each materialized view was last refreshed (so only one worker refreshes per interval)
+CREATE TABLE rollup_refreshes (
+    view_name VARCHAR(100) PRIMARY KEY,
+    refreshed_at TIMESTAMP NOT NULL
+);
+
+INSERT INTO rollup_refreshes (view_name, refreshed_at) VALUES ('request_rollup', CURRENT_TIMESTAMP);
+
 -- ============================================
 -- VERIFICATION
 -- ============================================
@@ -1,347 +1,4151 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from datetime import datetime
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, g, has_request_context, Response
+from flask.json.provider import DefaultJSONProvider
+import click
+from datetime import datetime, timedelta
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 import json
+import logging
 import bcrypt
+import base64
+import csv
+import io
+import atexit
+import glob
+import gzip
+import heapq
+import os
+import queue
+import select
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+import math
+import random
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from sortedcontainers import SortedList
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:
+    import numpy as np
+except ImportError:  # Batch priority scoring falls back to plain Python
+    np = None
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-in-production'
 
-# In-memory data storage (loaded from database) 
-requests_db = []
-users_db = {
-    'citizens': {},
-    'government': {}
+# Diagnostics that are too chatty for production go through this logger (LOG_LEVEL=DEBUG to see them)
+logger = logging.getLogger('need_response')
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+# Behind nginx, take the client address from X-Forwarded-For (set to the number of proxies)
+if int(os.getenv('TRUSTED_PROXY_COUNT', 0)):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv('TRUSTED_PROXY_COUNT')))
+
+# ============================================
+# IN-MEMORY REQUEST STORE
+# ============================================
+
+# Queue order: pending first, then in-progress, then everything else
+STATUS_BUCKETS = {'pending': 0, 'in-progress': 1}
+
+_MISSING = object()  # Marks a RequestRecord field the request does not have
+_EMPTY_MAP = MappingProxyType({})  # Shared read-only empty dict field (studentInfo is {} on most rows)
+
+
+class RequestRecord:
+    """
+    Compact in-memory form of a request.
+    
+    Every field lives in a slot instead of a per-request dict, low-cardinality
+    strings (needType, severity, status, vulnerability groups, email) are
+    interned so all requests share one copy, and vulnerabilityGroup is kept
+    as a tuple. Records support the dict operations the rest of the app
+    uses (req['status'], req.get(...), req[...] = ..., 'x' in req), and
+    fields a request never had are left out of to_dict(), so the JSON shape
+    is the same as for the dicts they replace. Empty dict fields share one
+    read-only mapping; like vulnerabilityGroup they are read back as stored,
+    so changing one means assigning a new value. Responses serialize records
+    through RequestJSONProvider.
+    """
+    
+    FIELDS = (
+        'id', 'citizenName', 'email', 'phone', 'location', 'needType', 'severity',
+        'peopleAffected', 'description', 'vulnerabilityGroup', 'specialCircumstances',
+        'isStudent', 'studentInfo', 'educationalNeeds', 'hasEvidence', 'status',
+        'submittedAt', 'updatedAt', 'completedAt', 'verificationCount', 'priorityScore',
+        'estimatedResponse', 'estimatedResponseTime', 'assignedTo'
+    )
+    FIELD_SET = frozenset(FIELDS)
+    INTERNED = frozenset(('email', 'needType', 'severity', 'status',
+                          'estimatedResponse', 'estimatedResponseTime', 'assignedTo'))
+    
+    __slots__ = FIELDS + ('_extra',)
+    
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            object.__setattr__(self, name, _MISSING)
+        self._extra = None
+        for name, value in fields.items():
+            self[name] = value
+    
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+    
+    def __setitem__(self, name, value):
+        if name in self.INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        elif name == 'vulnerabilityGroup' and isinstance(value, list):
+            value = tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+        elif isinstance(value, dict) and not value:
+            value = _EMPTY_MAP
+        
+        if name in self.FIELD_SET:
+            object.__setattr__(self, name, value)
+        else:
+            # Rare ad-hoc keys go to a side dict created on first use
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
+    
+    def _lookup(self, name):
+        if name in self.FIELD_SET:
+            return object.__getattribute__(self, name)
+        if self._extra is not None:
+            return self._extra.get(name, _MISSING)
+        return _MISSING
+    
+    @staticmethod
+    def _to_json(name, value):
+        if value is _EMPTY_MAP:
+            return {}
+        if isinstance(value, tuple) and name == 'vulnerabilityGroup':
+            return list(value)
+        return value
+    
+    def __getitem__(self, name):
+        value = self._lookup(name)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+    
+    def get(self, name, default=None):
+        value = self._lookup(name)
+        return default if value is _MISSING else value
+    
+    def __contains__(self, name):
+        return self._lookup(name) is not _MISSING
+    
+    def keys(self):
+        return [name for name, _ in self.items()]
+    
+    def items(self):
+        fields = [(name, object.__getattribute__(self, name)) for name in self.FIELDS]
+        if self._extra:
+            fields.extend(self._extra.items())
+        return [(name, value) for name, value in fields if value is not _MISSING]
+    
+    def to_dict(self):
+        """The request in its API (JSON) shape"""
+        return {name: self._to_json(name, value) for name, value in self.items()}
+    
+    def __repr__(self):
+        return f"RequestRecord({self.to_dict()!r})"
+
+
+class RequestJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes RequestRecords as their API dicts"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, RequestRecord):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
+app.json = RequestJSONProvider(app)
+
+
+def submitted_hours(req):
+    """Hours since the epoch at which req was submitted (now if it has no submittedAt)"""
+    return epoch_seconds(req.get('submittedAt') or datetime.now()) / 3600
+
+
+def queue_key(req):
+    """
+    Sort key for the priority queue: (status bucket, -aged rank, submittedAt, id).
+    
+    With aging, effective priority is priorityScore + agingPerHour * hours
+    waited. The current time is the same for every request, so ranking by
+    priorityScore - agingPerHour * submitted_hours() orders requests exactly
+    as their effective priority does at any moment, and keys never have to
+    be recomputed as time passes. Ties are served first-come, first-served.
+    """
+    rank = req.get('priorityScore', 0)
+    aging = get_priority_weights().aging_per_hour
+    if aging:
+        rank -= aging * submitted_hours(req)
+    return (STATUS_BUCKETS.get(req.get('status'), 2),
+            -rank,
+            req.get('submittedAt') or '',
+            req['id'])
+
+
+def listing_key(req):
+    """Sort key of paged listings, which run in descending (priorityScore, submittedAt, id) order"""
+    return (req.get('priorityScore', 0), req.get('submittedAt') or '', req['id'])
+
+
+def counter_keys(req):
+    """Dashboard counters a request contributes to"""
+    keys = ['total', f"status:{req.get('status')}", f"severity:{req.get('severity')}"]
+    if req.get('isStudent', False):
+        keys.append('student')
+    if 'student' in (req.get('vulnerabilityGroup') or []):
+        keys.append('studentGroup')
+    return keys
+
+
+class RequestStore:
+    """
+    In-memory request storage with hash indexes and a priority queue.
+    
+    Requests are keyed by id, with secondary indexes on email, needType and
+    status so dashboard lookups cost O(result size) instead of a full scan.
+    All requests are also kept in a SortedList ordered by queue_key(), so
+    insertion is O(log N) and queue positions are rank lookups.
+    Dashboard counters (see counter_keys) are kept per needType, so stats for
+    everything or for one department's need types are O(1).
+    A second SortedList ordered by (updatedAt, id) serves delta sync, and
+    one SortedList of listing_key() per needType serves paged listings.
+    Department views (see view()) are further SortedLists of queue keys
+    restricted to a set of need types; each is built on first use and then
+    kept up to date by the same incremental updates as the main queue.
+    Requests are stored as RequestRecords (plain dicts are converted by
+    add()). Indexes are updated incrementally by add() and set_status();
+    records must not have their status changed directly.
+    
+    When only active requests are loaded (REQUEST_LOAD_MODE=active), the
+    counters of the rows left in the database are seeded with
+    seed_cold_counters(), and fault_in() moves such rows into the store
+    when they are first needed.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        # Secondary indexes map a key to an insertion-ordered {id: request} dict
+        self._by_email = {}
+        self._by_need_type = {}
+        self._by_status = {}
+        self._queue = SortedList()
+        self._queue_keys = {}
+        self._views = {}  # frozenset of need types -> SortedList of queue keys
+        self._views_by_need_type = {}  # needType -> [views containing it]
+        self._counters = {}  # needType -> Counter
+        self._cold_counters = {}  # needType -> Counter, for rows not loaded from the database
+        self._faulted_emails = set()
+        self._changes = SortedList()
+        self._change_keys = {}
+        self._listings = {}  # needType -> SortedList of listing keys
+        self._listing_keys = {}
+    
+    def __len__(self):
+        return len(self._by_id)
+    
+    def __contains__(self, request_id):
+        return request_id in self._by_id
+    
+    def __iter__(self):
+        return iter(self.all())
+    
+    @staticmethod
+    def _index_add(index, key, req):
+        index.setdefault(key, {})[req['id']] = req
+    
+    @staticmethod
+    def _index_remove(index, key, request_id):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(request_id, None)
+            if not bucket:
+                del index[key]
+    
+    def add(self, req):
+        """Insert a request (or replace one with the same id) and index it; returns the stored record"""
+        req = RequestRecord.from_dict(req)
+        with self._lock:
+            if req['id'] in self._by_id:
+                self.remove(req['id'])
+            self._by_id[req['id']] = req
+            self._index_add(self._by_email, req.get('email'), req)
+            self._index_add(self._by_need_type, req.get('needType'), req)
+            self._index_add(self._by_status, req.get('status'), req)
+            self._queue_insert(req)
+            self._changes_insert(req)
+            self._listing_insert(req)
+            self._count(req, 1)
+            return req
+    
+    def add_many(self, requests):
+        with self._lock:
+            for req in requests:
+                self.add(req)
+    
+    def load(self, requests):
+        """Replace the store contents in one step (readers never see a partial load)"""
+        store = RequestStore()
+        store.add_many(requests)
+        self.replace(store)
+    
+    def replace(self, other):
+        """Take over the contents of other, a store filled off to the side, under one lock acquisition"""
+        with self._lock, other._lock:
+            vars(self).update({name: value for name, value in vars(other).items() if name != '_lock'})
+    
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._by_email.clear()
+            self._by_need_type.clear()
+            self._by_status.clear()
+            self._queue.clear()
+            self._queue_keys.clear()
+            self._views.clear()
+            self._views_by_need_type.clear()
+            self._counters.clear()
+            self._cold_counters.clear()
+            self._faulted_emails.clear()
+            self._changes.clear()
+            self._change_keys.clear()
+            self._listings.clear()
+            self._listing_keys.clear()
+    
+    def _queue_insert(self, req):
+        key = queue_key(req)
+        self._queue.add(key)
+        self._queue_keys[req['id']] = key
+        for view in self._views_by_need_type.get(req.get('needType'), ()):
+            view.add(key)
+    
+    def _queue_remove(self, req):
+        key = self._queue_keys.pop(req['id'], None)
+        if key is not None:
+            self._queue.remove(key)
+            for view in self._views_by_need_type.get(req.get('needType'), ()):
+                view.remove(key)
+    
+    def _get_view(self, need_types):
+        need_types = frozenset(need_types)
+        view = self._views.get(need_types)
+        if view is None:
+            view = SortedList(self._queue_keys[req_id]
+                              for need_type in need_types
+                              for req_id in self._by_need_type.get(need_type, {}))
+            self._views[need_types] = view
+            for need_type in need_types:
+                self._views_by_need_type.setdefault(need_type, []).append(view)
+        return view
+    
+    def view(self, need_types, start=0, stop=None):
+        """
+        Requests whose needType is in need_types, in priority queue order
+        (None means all requests); start/stop select a slice of the queue
+        """
+        with self._lock:
+            keys = self._queue if need_types is None else self._get_view(need_types)
+            return [self._by_id[key[-1]] for key in keys.islice(start, stop)]
+    
+    def view_size(self, need_types):
+        with self._lock:
+            if need_types is None:
+                return len(self._queue)
+            return len(self._get_view(need_types))
+    
+    def _changes_insert(self, req):
+        key = (req.get('updatedAt') or '', req['id'])
+        self._changes.add(key)
+        self._change_keys[req['id']] = key
+    
+    def _changes_remove(self, request_id):
+        key = self._change_keys.pop(request_id, None)
+        if key is not None:
+            self._changes.remove(key)
+    
+    def _listing_insert(self, req):
+        key = listing_key(req)
+        self._listings.setdefault(req.get('needType'), SortedList()).add(key)
+        self._listing_keys[req['id']] = key
+    
+    def _listing_remove(self, req):
+        key = self._listing_keys.pop(req['id'], None)
+        if key is not None:
+            self._listings[req.get('needType')].remove(key)
+    
+    def listing(self, need_types, before, limit, predicate=None):
+        """
+        Requests in descending listing_key() order, starting just after before
+        
+        Args:
+            need_types: Need types to list (None means all requests)
+            before (tuple): listing_key() cursor, or None for the first page
+            limit (int): Maximum number of requests to return
+            predicate (callable): Optional filter
+        """
+        with self._lock:
+            if need_types is None:
+                need_types = list(self._listings)
+            runs = [
+                self._listings[need_type].irange(maximum=before, inclusive=(True, False), reverse=True)
+                for need_type in need_types if need_type in self._listings
+            ]
+            result = []
+            for key in heapq.merge(*runs, reverse=True):
+                req = self._by_id[key[-1]]
+                if predicate is None or predicate(req):
+                    result.append(req)
+                    if len(result) >= limit:
+                        break
+            return result
+    
+    def _count(self, req, delta):
+        counter = self._counters.setdefault(req.get('needType'), Counter())
+        for key in counter_keys(req):
+            counter[key] += delta
+    
+    def remove(self, request_id):
+        with self._lock:
+            req = self._by_id.pop(request_id, None)
+            if req is None:
+                return None
+            self._index_remove(self._by_email, req.get('email'), request_id)
+            self._index_remove(self._by_need_type, req.get('needType'), request_id)
+            self._index_remove(self._by_status, req.get('status'), request_id)
+            self._queue_remove(req)
+            self._changes_remove(request_id)
+            self._listing_remove(req)
+            self._count(req, -1)
+            return req
+    
+    def set_status(self, req, new_status, updated_at=None):
+        """Change a stored request's status (and updatedAt) and move it between status buckets"""
+        with self._lock:
+            self._index_remove(self._by_status, req.get('status'), req['id'])
+            self._queue_remove(req)
+            if updated_at is not None:
+                self._changes_remove(req['id'])
+                req['updatedAt'] = updated_at
+                self._changes_insert(req)
+            counter = self._counters[req.get('needType')]
+            counter[f"status:{req.get('status')}"] -= 1
+            req['status'] = new_status
+            counter[f"status:{new_status}"] += 1
+            self._index_add(self._by_status, new_status, req)
+            self._queue_insert(req)
+    
+    def set_statuses(self, reqs, new_status, updated_at=None):
+        """set_status for a batch of requests, under one acquisition of the store lock"""
+        with self._lock:
+            for req in reqs:
+                self.set_status(req, new_status, updated_at)
+    
+    def rescore(self, weights, statuses, rebuild=False, updated_at=None):
+        """
+        Recompute priorityScore with weights for requests in statuses
+        
+        Pass rebuild=True when the aging rate changed, since that changes
+        every queue key. Requests whose score changed get updated_at as their
+        updatedAt, so delta listings pick them up.
+        
+        Returns:
+            int: Number of requests whose score changed
+        """
+        with self._lock:
+            reqs = [req for status in statuses for req in self._by_status.get(status, {}).values()]
+            scores = calculate_priority_scores(reqs, weights)
+            changed = [(req, score) for req, score in zip(reqs, scores) if req['priorityScore'] != score]
+            
+            # Re-sorting beats len(changed) remove/insert pairs once many keys move
+            rebuild = rebuild or len(changed) > len(self._queue) // 8
+            for req, score in changed:
+                if not rebuild:
+                    self._queue_remove(req)
+                self._listing_remove(req)
+                req['priorityScore'] = score
+                self._listing_insert(req)
+                if not rebuild:
+                    self._queue_insert(req)
+                if updated_at is not None:
+                    self._changes_remove(req['id'])
+                    req['updatedAt'] = updated_at
+                    self._changes_insert(req)
+            if rebuild:
+                self._queue_keys = {request_id: queue_key(req) for request_id, req in self._by_id.items()}
+                self._queue = SortedList(self._queue_keys.values())
+                self._views.clear()  # Rebuilt on next use
+                self._views_by_need_type.clear()
+            return len(changed)
+    
+    def get(self, request_id):
+        return self._by_id.get(request_id)
+    
+    def seed_cold_counters(self, counters):
+        """Set the counters ({needType: Counter}) of requests that stay in the database"""
+        with self._lock:
+            self._cold_counters = {need_type: Counter(c) for need_type, c in counters.items()}
+    
+    def fault_in(self, requests):
+        """Add requests loaded on demand, moving them from the cold counters to the live ones"""
+        with self._lock:
+            added = []
+            for req in requests:
+                if req['id'] in self._by_id:
+                    continue
+                req = self.add(req)
+                cold = self._cold_counters.get(req.get('needType'))
+                if cold is not None:
+                    for key in counter_keys(req):
+                        # Rows submitted by another worker after startup were never counted cold
+                        if cold[key] > 0:
+                            cold[key] -= 1
+                added.append(req)
+            return added
+    
+    def mark_email_faulted(self, email):
+        """Record that every stored request for email is now resident"""
+        with self._lock:
+            self._faulted_emails.add(email)
+    
+    def email_faulted(self, email):
+        return email in self._faulted_emails
+    
+    def all(self):
+        """All requests in priority queue order"""
+        with self._lock:
+            return [self._by_id[key[-1]] for key in self._queue]
+    
+    def queue_position(self, request_id):
+        """1-based position of a pending request in the queue, or None if it is not pending"""
+        with self._lock:
+            key = self._queue_keys.get(request_id)
+            if key is None or key[0] != STATUS_BUCKETS['pending']:
+                return None
+            # Pending is the first bucket, so the global rank is the pending rank
+            return self._queue.bisect_left(key) + 1
+    
+    def by_email(self, email):
+        with self._lock:
+            return list(self._by_email.get(email, {}).values())
+    
+    def by_status(self, status):
+        with self._lock:
+            return list(self._by_status.get(status, {}).values())
+    
+    def count_by_status(self, status):
+        return len(self._by_status.get(status, ()))
+    
+    def changed_since(self, since, limit, predicate=None):
+        """
+        Requests whose (updatedAt, id) is after since, oldest change first
+        
+        Args:
+            since (tuple): (updatedAt, id) watermark
+            limit (int): Maximum number of requests to return
+            predicate (callable): Optional visibility filter
+        """
+        with self._lock:
+            result = []
+            for key in self._changes.irange(minimum=since, inclusive=(False, False)):
+                req = self._by_id[key[1]]
+                if predicate is None or predicate(req):
+                    result.append(req)
+                    if len(result) >= limit:
+                        break
+            return result
+    
+    def counters(self, need_types=None):
+        """Summed dashboard counters for the given need types (None means all requests)"""
+        with self._lock:
+            if need_types is None:
+                need_types = set(self._counters) | set(self._cold_counters)
+            total = Counter()
+            for need_type in need_types:
+                total.update(self._counters.get(need_type, {}))
+                total.update(self._cold_counters.get(need_type, {}))
+            return total
+    
+    def verify_counters(self):
+        """
+        Recount every request and compare with the running counters.
+        
+        Returns:
+            dict: {needType: {counter: (running, recounted)}} for every mismatch; empty if consistent
+        """
+        with self._lock:
+            recount = {}
+            for req in self._by_id.values():
+                counter = recount.setdefault(req.get('needType'), Counter())
+                for key in counter_keys(req):
+                    counter[key] += 1
+            
+            mismatches = {}
+            for need_type in set(recount) | set(self._counters):
+                running = self._counters.get(need_type, Counter())
+                expected = recount.get(need_type, Counter())
+                for key in set(running) | set(expected):
+                    if running[key] != expected[key]:
+                        mismatches.setdefault(need_type, {})[key] = (running[key], expected[key])
+            return mismatches
+    
+    def by_need_types(self, need_types):
+        """Requests whose needType is in need_types (None means all requests)"""
+        if need_types is None:
+            return self.all()
+        with self._lock:
+            result = []
+            for need_type in sorted(need_types):
+                result.extend(self._by_need_type.get(need_type, {}).values())
+            return result
+
+
+# In-memory data storage (loaded from database) 
+requests_db = RequestStore()
+users_db = {
+    'citizens': {},
+    'government': {}
+}
+AUDIT_MEMORY_ENTRIES = int(os.getenv('AUDIT_MEMORY_ENTRIES', 1000))  # Recent entries kept per worker
+audit_logs = deque(maxlen=AUDIT_MEMORY_ENTRIES)  # Recent audit trail; the full trail is in the database
+staff_db = []  # Government staff database
+
+# Load requests from database on startup
+def init_app():
+    """
+    Initialize application by loading data from database
+    
+    Requests are streamed in batches. With REQUEST_LOAD_MODE=active only
+    pending and in-progress requests are loaded; the rest are counted with an
+    aggregate query and fetched on demand.
+    """
+    weights = load_priority_weights_from_db()
+    if weights is not None:
+        set_priority_weights(weights)
+        print(f"Using priority weights version {weights.version}")
+    
+    active_only = REQUEST_LOAD_MODE == 'active'
+    print(f"Loading {'active' if active_only else 'all'} requests from database...")
+    started = time.monotonic()
+    
+    # Changes committed from here on are replayed from the outbox after the load
+    watermark = request_sync.current_watermark()
+    
+    # Load into a separate store: on a reload the live one keeps serving
+    # complete data until the new one is swapped in
+    store = RequestStore()
+    try:
+        for batch in stream_requests_from_db(active_only=active_only):
+            store.add_many(batch)
+            elapsed = time.monotonic() - started
+            print(f"  ...{len(store)} requests loaded ({elapsed:.1f}s, {len(store) / max(elapsed, 0.001):.0f}/s)")
+    except Exception:
+        print(f"Request load failed; keeping the {len(requests_db)} requests already in memory")
+        return
+    
+    if active_only:
+        cold_counters = load_cold_request_counters_from_db()
+        store.seed_cold_counters(cold_counters)
+        cold_total = sum(c['total'] for c in cold_counters.values())
+        print(f"Counted {cold_total} completed/closed requests left in the database")
+    
+    requests_db.replace(store)
+    print(f"Loaded {len(requests_db)} requests from database in {time.monotonic() - started:.1f}s")
+    request_sync.start(watermark)
+    
+    if response_analytics.seed_from_db():
+        print("Loaded response time analytics")
+
+# ============================================
+# DATABASE CONNECTION POOL
+# ============================================
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'Need-baseGovernmentResponseSystem'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', '123')
+}
+
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))  # Per worker process
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))  # Seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 1800))  # Recycle connections after 30 minutes
+DB_POOL_HEALTH_CHECK_IDLE = float(os.getenv('DB_POOL_HEALTH_CHECK_IDLE', 30))  # Ping connections idle longer than this
+
+
+class PooledConnection:
+    """
+    Proxy around a psycopg2 connection checked out from ConnectionPool.
+    
+    Behaves like the raw connection (cursor/commit/rollback), but close()
+    hands the connection back to the pool instead of tearing it down. When
+    the connection is bound to the current Flask request, close() is a no-op
+    and the connection is returned by the teardown handler.
+    """
+    
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._last_used = time.monotonic()
+        self._request_scoped = False
+        self._released = False
+        self._prepared = set()  # Statement names PREPAREd on this server connection
+    
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+    
+    def prepare(self, name, param_types, statement):
+        """
+        PREPARE name (param_types) AS statement on this connection, once
+        
+        Prepared statements last as long as the server connection, so a
+        pooled connection plans the statement on first use and afterwards
+        only runs EXECUTE name (...).
+        """
+        if name in self._prepared:
+            return
+        cur = self._raw.cursor()
+        cur.execute(f"PREPARE {name} {param_types} AS {statement}")
+        cur.close()
+        self._prepared.add(name)
+    
+    def close(self):
+        if self._request_scoped:
+            return
+        self._pool.release(self)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of PostgreSQL connections for one process.
+    
+    - At most max_size connections are open at any time; callers wait up to
+      timeout seconds for a free one and get None if the pool stays exhausted
+    - Connections idle longer than health_check_idle are pinged before reuse
+    - Connections older than max_lifetime are closed instead of reused
+    """
+    
+    def __init__(self, config, max_size, timeout, max_lifetime, health_check_idle):
+        self.config = config
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_idle = health_check_idle
+        self.pid = os.getpid()
+        self._idle = []  # LIFO stack so hot connections are reused first
+        self._open = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            'connectionsCreated': 0,
+            'connectionsClosed': 0,
+            'connectFailures': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'totalWaitMs': 0.0,
+            'exhausted': 0,
+            'healthCheckFailures': 0,
+            'recycled': 0,
+            'peakInUse': 0
+        }
+    
+    def _connect(self):
+        try:
+            raw = psycopg2.connect(**self.config)
+        except psycopg2.OperationalError as e:
+            print(f"Error: Unable to connect to the database. Check your credentials.")
+            print(e)
+            return None
+        return PooledConnection(self, raw, time.monotonic())
+    
+    def _discard(self, conn):
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._metrics['connectionsClosed'] += 1
+            self._cond.notify()
+    
+    def _is_usable(self, conn):
+        """Check lifetime and liveness of an idle connection before handing it out"""
+        now = time.monotonic()
+        if conn._raw.closed:
+            return False
+        if now - conn._created_at > self.max_lifetime:
+            with self._cond:
+                self._metrics['recycled'] += 1
+            return False
+        if now - conn._last_used > self.health_check_idle:
+            try:
+                cur = conn._raw.cursor()
+                cur.execute("SELECT 1")
+                cur.close()
+                conn._raw.rollback()
+            except Exception:
+                with self._cond:
+                    self._metrics['healthCheckFailures'] += 1
+                return False
+        return True
+    
+    def checkout(self):
+        """Borrow a connection; returns None if the database is unreachable or the pool is exhausted"""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        wait_started = time.monotonic()
+        
+        while True:
+            conn = None
+            create = False
+            with self._cond:
+                while not self._idle and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['exhausted'] += 1
+                        print(f"Database pool exhausted: {self._in_use}/{self.max_size} connections in use")
+                        return None
+                    waited = True
+                    self._cond.wait(remaining)
+                
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    self._open += 1
+                    create = True
+            
+            if create:
+                conn = self._connect()
+                if conn is None:
+                    with self._cond:
+                        self._open -= 1
+                        self._metrics['connectFailures'] += 1
+                        self._cond.notify()
+                    return None
+                with self._cond:
+                    self._metrics['connectionsCreated'] += 1
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                continue
+            
+            with self._cond:
+                self._in_use += 1
+                self._metrics['checkouts'] += 1
+                self._metrics['peakInUse'] = max(self._metrics['peakInUse'], self._in_use)
+                if waited:
+                    self._metrics['waits'] += 1
+                    self._metrics['totalWaitMs'] += (time.monotonic() - wait_started) * 1000
+            conn._released = False
+            conn._request_scoped = False
+            return conn
+    
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any transaction left open"""
+        if conn._released or self.pid != os.getpid():
+            return
+        conn._released = True
+        with self._cond:
+            self._in_use -= 1
+        
+        raw = conn._raw
+        if raw.closed or time.monotonic() - conn._created_at > self.max_lifetime:
+            self._discard(conn)
+            return
+        try:
+            if raw.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                raw.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        
+        conn._last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+    
+    def stats(self):
+        with self._cond:
+            return {
+                **self._metrics,
+                'totalWaitMs': round(self._metrics['totalWaitMs'], 2),
+                'pid': self.pid,
+                'maxSize': self.max_size,
+                'open': self._open,
+                'inUse': self._in_use,
+                'idle': len(self._idle)
+            }
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+_forked_pools = []  # Pools inherited from a parent process; kept referenced so their sockets are never finalized here
+
+
+def get_db_pool():
+    """
+    Return this process's connection pool, creating it on first use.
+    
+    Under gunicorn every worker is a forked copy of the master, so the pool is
+    keyed by PID: a worker never reuses (or closes) connections opened by the
+    process it was forked from.
+    """
+    global _db_pool
+    pool = _db_pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    
+    with _db_pool_lock:
+        if _db_pool is None or _db_pool.pid != os.getpid():
+            if _db_pool is not None:
+                _forked_pools.append(_db_pool)
+            _db_pool = ConnectionPool(
+                DB_CONFIG,
+                max_size=DB_POOL_MAX_SIZE,
+                timeout=DB_POOL_TIMEOUT,
+                max_lifetime=DB_POOL_MAX_LIFETIME,
+                health_check_idle=DB_POOL_HEALTH_CHECK_IDLE
+            )
+        return _db_pool
+
+
+def get_db_connection():
+    """
+    Get a pooled database connection.
+    
+    Inside a Flask request the same connection is reused for the whole request
+    and returned to the pool on teardown. Outside a request the caller must
+    call close() to return it.
+    """
+    if not has_request_context():
+        return get_db_pool().checkout()
+    
+    if g.get('db_unavailable'):
+        return None
+    conn = g.get('db_conn')
+    if conn is None:
+        conn = get_db_pool().checkout()
+        if conn is None:
+            g.db_unavailable = True
+            return None
+        conn._request_scoped = True
+        g.db_conn = conn
+    return conn
+
+
+@app.teardown_request
+def release_db_connection(exception=None):
+    """Return the request's pooled connection, if any"""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn._pool.release(conn)
+
+# ============================================
+# ID ALLOCATION (BLOCK-PREFETCHED SEQUENCES)
+# ============================================
+
+class IdAllocator:
+    """
+    Hands out formatted IDs (e.g. REQ-000001) backed by a PostgreSQL sequence.
+    
+    The sequence's INCREMENT BY is the block size: one nextval() reserves a
+    whole block for this worker, which then allocates from it locally with
+    no database round trip. IDs are unique across workers and restarts; a
+    worker that exits abandons the rest of its block, which leaves gaps.
+    Forked workers never reuse their parent's block. Without a database,
+    numbers continue after the highest ID held in memory.
+    """
+    
+    def __init__(self, sequence, prefix, width, existing_ids):
+        self.sequence = sequence
+        self.prefix = prefix
+        self.width = width
+        self._existing_ids = existing_ids  # Callable returning the IDs held in memory
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._blocks = []  # Reserved (next, end) number ranges
+        self._increment = None
+        self._local_next = None
+        self._metrics = {'allocated': 0, 'blocksReserved': 0, 'allocatedWithoutDatabase': 0}
+    
+    def format(self, number):
+        return f"{self.prefix}{str(number).zfill(self.width)}"
+    
+    def parse(self, id_value):
+        """Number of an ID in this allocator's format, or None"""
+        suffix = (id_value or '')[len(self.prefix):]
+        if id_value and id_value.startswith(self.prefix) and suffix.isdigit():
+            return int(suffix)
+        return None
+    
+    def next_id(self):
+        return self.allocate(1)[0]
+    
+    def allocate(self, count):
+        """Reserve count IDs, in increasing order"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._blocks = []
+                self._local_next = None
+            
+            available = sum(end - start for start, end in self._blocks)
+            if available < count and not self._reserve(count - available):
+                return [self.format(n) for n in self._allocate_locally(count)]
+            
+            numbers = []
+            while len(numbers) < count:
+                start, end = self._blocks[0]
+                take = min(end - start, count - len(numbers))
+                numbers.extend(range(start, start + take))
+                if start + take == end:
+                    self._blocks.pop(0)
+                else:
+                    self._blocks[0] = (start + take, end)
+            self._metrics['allocated'] += count
+            return [self.format(n) for n in numbers]
+    
+    def _reserve(self, needed):
+        """Reserve enough blocks for needed more IDs; False if the database is unavailable"""
+        # A connection of our own: committing must not touch the caller's transaction
+        conn = get_db_pool().checkout()
+        if not conn:
+            return False
+        
+        try:
+            cur = conn.cursor()
+            if self._increment is None:
+                cur.execute("SELECT increment_by FROM pg_sequences WHERE sequencename = %s", (self.sequence,))
+                self._increment = cur.fetchone()[0]
+            blocks = -(-needed // self._increment)
+            cur.execute("SELECT nextval(%s) FROM generate_series(1, %s)", (self.sequence, blocks))
+            for (start,) in cur.fetchall():
+                self._blocks.append((start, start + self._increment))
+            conn.commit()
+            cur.close()
+            self._metrics['blocksReserved'] += blocks
+            return True
+        except Exception as e:
+            print(f"Error reserving IDs from {self.sequence}: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+    
+    def _allocate_locally(self, count):
+        if self._local_next is None:
+            numbers = (self.parse(id_value) for id_value in self._existing_ids())
+            self._local_next = max((n for n in numbers if n is not None), default=0) + 1
+        start = self._local_next
+        self._local_next += count
+        self._metrics['allocatedWithoutDatabase'] += count
+        return range(start, start + count)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                **self._metrics,
+                'sequence': self.sequence,
+                'blockSize': self._increment,
+                'reservedRemaining': sum(end - start for start, end in self._blocks)
+            }
+
+
+request_ids = IdAllocator('request_id_seq', 'REQ-', 6, lambda: [req['id'] for req in requests_db.all()])
+staff_ids = IdAllocator('staff_id_seq', 'STAFF-', 4, lambda: [staff['id'] for staff in staff_db])
+
+# ============================================
+# DATABASE HELPER FUNCTIONS FOR REQUESTS
+# ============================================
+
+REQUEST_COLUMNS = """
+    request_id, citizen_name, email, phone, location_address,
+    need_type, severity, people_affected, description,
+    vulnerability_group, special_circumstances, is_student,
+    educational_needs, has_evidence, status, submitted_at,
+    updated_at, completed_at, priority_score, 
+    estimated_response_time, assigned_to
+"""
+
+def row_to_request(row):
+    """Convert a requests row (selected with REQUEST_COLUMNS) to a RequestRecord"""
+    return RequestRecord(
+        id=row[0],
+        citizenName=row[1],
+        email=row[2],
+        phone=row[3],
+        location=row[4],
+        needType=row[5],
+        severity=row[6],
+        peopleAffected=row[7],
+        description=row[8],
+        vulnerabilityGroup=row[9] if row[9] else [],
+        specialCircumstances=row[10],
+        isStudent=row[11],
+        studentInfo=row[12] if row[12] else {},
+        hasEvidence=row[13],
+        status=row[14],
+        submittedAt=row[15].isoformat() if row[15] else None,
+        updatedAt=row[16].isoformat() if row[16] else None,
+        completedAt=row[17].isoformat() if row[17] else None,
+        priorityScore=row[18],
+        estimatedResponse=row[19],
+        assignedTo=row[20]
+    )
+
+# Startup load: 'full' keeps every request in memory, 'active' only pending/in-progress ones
+REQUEST_LOAD_MODE = os.getenv('REQUEST_LOAD_MODE', 'full')
+REQUEST_LOAD_BATCH_SIZE = int(os.getenv('REQUEST_LOAD_BATCH_SIZE', 5000))
+ACTIVE_STATUSES = ('pending', 'in-progress')
+
+
+def lazy_loading():
+    return REQUEST_LOAD_MODE == 'active'
+
+
+def stream_requests_from_db(active_only=False, batch_size=REQUEST_LOAD_BATCH_SIZE):
+    """
+    Yield requests from the database in batches of batch_size
+    
+    Uses a named (server-side) cursor, so only one batch of rows is held in
+    memory at a time however large the table is.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return
+    
+    try:
+        cur = conn.cursor(name='stream_requests')
+        cur.itersize = batch_size
+        if active_only:
+            cur.execute(f"""
+                SELECT {REQUEST_COLUMNS}
+                FROM requests
+                WHERE status IN %s
+            """, (ACTIVE_STATUSES,))
+        else:
+            cur.execute(f"""
+                SELECT {REQUEST_COLUMNS}
+                FROM requests
+            """)
+        
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [row_to_request(row) for row in rows]
+        
+        cur.close()
+        conn.commit()
+    except Exception as e:
+        print(f"Error loading requests from database: {e}")
+        conn.rollback()
+        raise  # A partial load must not be mistaken for the full table
+    finally:
+        conn.close()
+
+def load_requests_from_db():
+    """Load all requests from database into memory"""
+    return [req for batch in stream_requests_from_db() for req in batch]
+
+def load_cold_request_counters_from_db():
+    """Dashboard counters ({needType: Counter}) for requests that are not active"""
+    conn = get_db_connection()
+    if not conn:
+        return {}
+    
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT need_type, status, severity,
+                   COALESCE(is_student, FALSE),
+                   COALESCE(vulnerability_group ? 'student', FALSE),
+                   COUNT(*)
+            FROM requests
+            WHERE status NOT IN %s
+            GROUP BY 1, 2, 3, 4, 5
+        """, (ACTIVE_STATUSES,))
+        
+        counters = {}
+        for need_type, status, severity, is_student, student_group, count in cur.fetchall():
+            sample = {
+                'needType': need_type,
+                'status': status,
+                'severity': severity,
+                'isStudent': is_student,
+                'vulnerabilityGroup': ['student'] if student_group else []
+            }
+            counter = counters.setdefault(need_type, Counter())
+            for key in counter_keys(sample):
+                counter[key] += count
+        
+        cur.close()
+        conn.close()
+        return counters
+    except Exception as e:
+        print(f"Error counting requests in database: {e}")
+        conn.rollback()
+        conn.close()
+        return {}
+
+def fetch_requests_from_db(where_sql, params):
+    """Requests matching a WHERE clause, or None when the database is unavailable"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    try:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT {REQUEST_COLUMNS}
+            FROM requests
+            WHERE {where_sql}
+        """, params)
+        rows = [row_to_request(row) for row in cur.fetchall()]
+        cur.close()
+        conn.close()
+        return rows
+    except Exception as e:
+        print(f"Error loading requests from database: {e}")
+        conn.rollback()
+        conn.close()
+        return None
+
+def get_request(request_id):
+    """Look up a request, faulting it in from the database if it was not loaded at startup"""
+    req = requests_db.get(request_id)
+    if req is None and lazy_loading():
+        rows = fetch_requests_from_db("request_id = %s", (request_id,))
+        if rows:
+            requests_db.fault_in(rows)
+            req = requests_db.get(request_id)
+    return req
+
+def get_requests_by_email(email):
+    """A citizen's requests, faulting in their completed ones on first access"""
+    if lazy_loading() and not requests_db.email_faulted(email):
+        rows = fetch_requests_from_db("email = %s AND status NOT IN %s", (email, ACTIVE_STATUSES))
+        if rows is not None:
+            requests_db.fault_in(rows)
+            requests_db.mark_email_faulted(email)
+    return requests_db.by_email(email)
+
+def save_request_to_db(request_data):
+    """
+    Save a single request to database (with its outbox entry)
+    
+    Returns:
+        bool: False if the database is unavailable; raises if the insert fails
+    """
+    conn = get_db_connection()
+    if not conn:
+        return False
+    
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO requests (
+                request_id, citizen_name, email, phone, location_address,
+                need_type, severity, people_affected, description,
+                vulnerability_group, special_circumstances, is_student,
+                educational_needs, has_evidence, status, priority_score,
+                estimated_response_time, submitted_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            request_data['id'],
+            request_data['citizenName'],
+            request_data['email'],
+            request_data.get('phone'),
+            request_data.get('location'),
+            request_data['needType'],
+            request_data['severity'],
+            request_data.get('peopleAffected', 1),
+            request_data['description'],
+            json.dumps(request_data.get('vulnerabilityGroup', [])),
+            request_data.get('specialCircumstances'),
+            request_data.get('isStudent', False),
+            json.dumps(request_data.get('studentInfo', {})),
+            request_data.get('hasEvidence', False),
+            request_data.get('status', 'pending'),
+            request_data.get('priorityScore', 0),
+            request_data.get('estimatedResponse'),
+            request_data.get('submittedAt') or datetime.now()
+        ))
+        record_request_changes(cur, [request_data['id']], 'created')
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving request to database: {e}")
+        conn.rollback()
+        conn.close()
+        raise
+
+# One statement for single and bulk status changes. $3 is recorded as the
+# assignee of requests that have none yet (NULL leaves assignments alone).
+# $5 is the staff member making the change: it becomes assigned_staff_id when
+# none is set, and on completion, so completions are attributed to the
+# department that did them (see ResponseAnalytics.seed_from_db).
+REQUEST_STATUS_UPDATE = """
+    UPDATE requests
+    SET status = $1,
+        updated_at = $2,
+        completed_at = CASE WHEN $1 = 'completed' THEN $2 ELSE completed_at END,
+        assigned_to = COALESCE(assigned_to, $3),
+        assigned_staff_id = CASE WHEN $1 = 'completed' THEN COALESCE($5, assigned_staff_id)
+                                 ELSE COALESCE(assigned_staff_id, $5) END
+    WHERE request_id = ANY($4)
+    RETURNING request_id, assigned_to
+"""
+REQUEST_STATUS_UPDATE_TYPES = "(varchar, timestamp, varchar, varchar[], varchar)"
+
+def update_request_statuses_in_db(request_ids, new_status, assign_to=None, changed_at=None, staff_id=None):
+    """
+    Move requests to new_status with one prepared UPDATE ... WHERE request_id = ANY(...)
+    and their outbox entries, in one transaction
+    
+    Args:
+        request_ids (list): Requests to update
+        new_status (str): Status to set
+        assign_to (str): Assignee for requests that have none yet
+        changed_at (datetime): updated_at (and completed_at) value; defaults to now
+        staff_id (str): staff_id of the staff member making the change, if any
+    
+    Returns:
+        dict|None: request_id -> assigned_to for the updated rows, or None if the database is unavailable; raises if the update fails
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    changed_at = changed_at or datetime.now()
+    try:
+        conn.prepare('update_request_statuses', REQUEST_STATUS_UPDATE_TYPES, REQUEST_STATUS_UPDATE)
+        cur = conn.cursor()
+        cur.execute("EXECUTE update_request_statuses (%s, %s, %s, %s, %s)",
+                    (new_status, changed_at, assign_to, list(request_ids), staff_id))
+        updated = dict(cur.fetchall())
+        if updated:
+            record_request_changes(cur, list(updated), 'updated')
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+        return updated
+    except Exception as e:
+        print(f"Error updating request status: {e}")
+        conn.rollback()
+        conn.close()
+        raise
+
+def update_request_status_in_db(request_id, new_status, assign_to=None, changed_at=None, staff_id=None):
+    """
+    Update one request's status (see update_request_statuses_in_db)
+    
+    Returns:
+        bool: False if the database is unavailable; raises if the update fails
+    """
+    return update_request_statuses_in_db([request_id], new_status, assign_to, changed_at, staff_id) is not None
+
+# ============================================
+# KEYSET PAGINATION FOR REQUEST LISTINGS
+# ============================================
+
+REQUESTS_PAGE_DEFAULT = 50
+REQUESTS_PAGE_MAX = 200
+
+def encode_cursor(req):
+    """Opaque cursor pointing just past req in (priorityScore, submittedAt, id) DESC order"""
+    key = [req.get('priorityScore', 0), req.get('submittedAt'), req['id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        score, submitted_at, request_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(score, int) or not isinstance(request_id, str):
+        raise ValueError('Invalid cursor')
+    return score, submitted_at, request_id
+
+def parse_request_filters(args):
+    """
+    Read listing filters from query parameters
+    
+    Returns:
+        dict: status, severity, needType, submittedFrom, submittedTo (None when absent)
+    
+    Raises:
+        ValueError: if a date filter is not an ISO date/datetime
+    """
+    filters = {
+        'status': args.get('status') or None,
+        'severity': args.get('severity') or None,
+        'needType': args.get('needType') or None,
+        'submittedFrom': None,
+        'submittedTo': None
+    }
+    for param, key in (('submitted_from', 'submittedFrom'), ('submitted_to', 'submittedTo')):
+        value = args.get(param)
+        if value:
+            try:
+                filters[key] = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f'Invalid {param}: expected an ISO date')
+    return filters
+
+def build_requests_page_query(filters, allowed_types, email, after, limit):
+    """
+    SQL for one page of requests with a keyset seek on
+    (priority_score, submitted_at, request_id) DESC.
+    
+    Args:
+        filters (dict): From parse_request_filters
+        allowed_types (iterable|None): Role restriction on need types (None = unrestricted)
+        email (str|None): Restrict to one citizen's requests
+        after (tuple|None): Decoded cursor; only rows strictly after it are returned
+        limit (int): Page size
+    
+    Returns:
+        tuple: (query, params) selecting up to limit + 1 rows in REQUEST_COLUMNS order
+    """
+    where_clauses = []
+    params = []
+    if filters['status']:
+        where_clauses.append("status = %s")
+        params.append(filters['status'])
+    if filters['severity']:
+        where_clauses.append("severity = %s")
+        params.append(filters['severity'])
+    if filters['needType']:
+        where_clauses.append("need_type = %s")
+        params.append(filters['needType'])
+    if allowed_types is not None:
+        where_clauses.append("need_type = ANY(%s)")
+        params.append(list(allowed_types))
+    if email:
+        where_clauses.append("email = %s")
+        params.append(email)
+    if filters['submittedFrom']:
+        where_clauses.append("submitted_at >= %s")
+        params.append(filters['submittedFrom'])
+    if filters['submittedTo']:
+        where_clauses.append("submitted_at <= %s")
+        params.append(filters['submittedTo'])
+    if after:
+        where_clauses.append("(priority_score, submitted_at, request_id) < (%s, %s::timestamp, %s)")
+        params.extend(after)
+    
+    where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+    params.append(limit + 1)
+    
+    return f"""
+        SELECT {REQUEST_COLUMNS}
+        FROM requests
+        WHERE {where_sql}
+        ORDER BY priority_score DESC, submitted_at DESC, request_id DESC
+        LIMIT %s
+    """, params
+
+def query_requests_page_from_db(filters, allowed_types, email, after, limit):
+    """
+    Fetch one page of requests (see build_requests_page_query)
+    
+    Returns:
+        list|None: Up to limit + 1 requests (the extra row signals another page), or None if the database is unavailable
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    try:
+        cur = conn.cursor()
+        cur.execute(*build_requests_page_query(filters, allowed_types, email, after, limit))
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+        return [row_to_request(row) for row in rows]
+    except Exception as e:
+        print(f"Error querying requests page: {e}")
+        conn.rollback()
+        conn.close()
+        return None
+
+def query_requests_page_in_memory(store, filters, allowed_types, email, after, limit):
+    """Same contract as query_requests_page_from_db, served from the in-memory store's indexes"""
+    submitted_from = filters['submittedFrom'].isoformat() if filters['submittedFrom'] else None
+    submitted_to = filters['submittedTo'].isoformat() if filters['submittedTo'] else None
+    if after:
+        after = (after[0], after[1] or '', after[2])
+    
+    def keep(req):
+        if filters['status'] and req['status'] != filters['status']:
+            return False
+        if filters['severity'] and req['severity'] != filters['severity']:
+            return False
+        if filters['needType'] and req['needType'] != filters['needType']:
+            return False
+        if allowed_types is not None and req['needType'] not in allowed_types:
+            return False
+        if email and req['email'] != email:
+            return False
+        submitted_at = req.get('submittedAt') or ''
+        if submitted_from and submitted_at < submitted_from:
+            return False
+        if submitted_to and submitted_at > submitted_to:
+            return False
+        if after and listing_key(req) >= after:
+            return False
+        return True
+    
+    # A citizen's few requests are sorted directly; other listings walk the
+    # store's listing order from the cursor, per need type where restricted
+    if email:
+        return sorted(filter(keep, store.by_email(email)), key=listing_key, reverse=True)[:limit + 1]
+    need_types = [filters['needType']] if filters['needType'] else allowed_types
+    return store.listing(need_types, after, limit + 1, keep)
+
+# ============================================
+# DELTA SYNC (CHANGES SINCE A WATERMARK)
+# ============================================
+
+# updated_at is stamped when a transaction starts, so a slow writer can commit a
+# row that is older than a watermark already handed out. Watermarks therefore
+# never move past now - DELTA_SYNC_LAG_SECONDS; newer rows are sent again on the
+# next poll and clients merge by id.
+DELTA_SYNC_LAG_SECONDS = float(os.getenv('DELTA_SYNC_LAG_SECONDS', 5))
+DELTA_SYNC_PAGE_DEFAULT = 200
+DELTA_SYNC_PAGE_MAX = 500
+
+def encode_watermark(key):
+    """Opaque watermark for an (updatedAt, id) position"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+def decode_watermark(token):
+    """Decode a watermark from encode_watermark; raises ValueError if it is malformed"""
+    try:
+        updated_at, request_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid watermark')
+    if not isinstance(updated_at, str) or not isinstance(request_id, str):
+        raise ValueError('Invalid watermark')
+    return updated_at, request_id
+
+def query_request_changes_from_db(since, allowed_types, email, limit):
+    """
+    Fetch requests changed after the since watermark, oldest change first
+    
+    Returns:
+        tuple|None: (up to limit + 1 requests, safe point ISO timestamp), or None if the database is unavailable
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    where_clauses = []
+    params = []
+    if since:
+        where_clauses.append("(updated_at, request_id) > (%s::timestamp, %s)")
+        params.extend(since)
+    if allowed_types is not None:
+        where_clauses.append("need_type = ANY(%s)")
+        params.append(list(allowed_types))
+    if email:
+        where_clauses.append("email = %s")
+        params.append(email)
+    where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+    params.append(limit + 1)
+    
+    try:
+        cur = conn.cursor()
+        # Take the safe point before scanning so nothing committed during the scan is skipped
+        cur.execute("SELECT (clock_timestamp() - make_interval(secs => %s))::timestamp",
+                    (DELTA_SYNC_LAG_SECONDS,))
+        safe_point = cur.fetchone()[0].isoformat()
+        rows = []
+        if since:
+            cur.execute(f"""
+                SELECT {REQUEST_COLUMNS}
+                FROM requests
+                WHERE {where_sql}
+                ORDER BY updated_at, request_id
+                LIMIT %s
+            """, params)
+            rows = [row_to_request(row) for row in cur.fetchall()]
+        cur.close()
+        conn.close()
+        return rows, safe_point
+    except Exception as e:
+        print(f"Error querying request changes: {e}")
+        conn.rollback()
+        conn.close()
+        return None
+
+def query_request_changes_in_memory(store, since, allowed_types, email, limit):
+    """Same contract as query_request_changes_from_db, served from the store's change index"""
+    safe_point = datetime.fromtimestamp(time.time() - DELTA_SYNC_LAG_SECONDS).isoformat()
+    if not since:
+        return [], safe_point
+    
+    def visible(req):
+        if allowed_types is not None and req['needType'] not in allowed_types:
+            return False
+        if email and req['email'] != email:
+            return False
+        return True
+    
+    return store.changed_since(since, limit + 1, visible), safe_point
+
+def get_request_visibility(user_email):
+    """
+    Visibility rules shared by the request listing endpoints
+    
+    Returns:
+        tuple: (allowed need types or None, citizen email or None)
+    """
+    if session.get('user_role') == 'government':
+        return get_session_allowed_need_types(), None
+    return None, user_email or None
+
+# ============================================
+# BULK REQUEST INGESTION
+# ============================================
+
+BULK_INGEST_MAX_ROWS = int(os.getenv('BULK_INGEST_MAX_ROWS', 10000))  # Rows accepted per batch
+BULK_STATUS_MAX_REQUESTS = int(os.getenv('BULK_STATUS_MAX_REQUESTS', 500))  # Requests per bulk status change
+
+# Allowed values, as in the requests table's CHECK constraints
+REQUEST_NEED_TYPES = frozenset(['medical', 'water', 'food', 'shelter', 'mental-health',
+                                'educational', 'clothing', 'financial', 'other'])
+REQUEST_SEVERITIES = frozenset(['critical', 'urgent', 'moderate', 'low'])
+REQUEST_STATUSES = frozenset(['pending', 'in-progress', 'completed', 'rejected', 'cancelled'])
+
+# Columns written by COPY, in the order of bulk_copy_row()
+BULK_COPY_COLUMNS = (
+    'request_id', 'citizen_name', 'email', 'phone', 'location_address',
+    'need_type', 'severity', 'people_affected', 'description',
+    'vulnerability_group', 'special_circumstances', 'is_student',
+    'educational_needs', 'has_evidence', 'status', 'priority_score',
+    'estimated_response_time', 'submitted_at', 'updated_at'
+)
+
+
+class BulkIngestError(Exception):
+    """A batch that cannot be ingested at all (unreadable, too large or rejected by the database)"""
+
+
+class BulkIngestUnavailable(BulkIngestError):
+    """The database is unavailable, so nothing was stored; the batch can be retried as is"""
+
+
+def parse_bulk_rows(body, content_type):
+    """
+    Parse a batch of requests from a CSV or JSON body
+    
+    JSON is a list of request objects (or {"requests": [...]}) using the same
+    fields as POST /api/requests. CSV has a header row with those field names;
+    vulnerabilityGroup holds values separated by ';'.
+    
+    Returns:
+        list: One dict per row
+    """
+    if 'csv' in (content_type or ''):
+        reader = csv.DictReader(io.StringIO(body))
+        rows = []
+        for row in reader:
+            row = {key.strip(): (value.strip() if isinstance(value, str) else value)
+                   for key, value in row.items() if key}
+            if row.get('vulnerabilityGroup'):
+                row['vulnerabilityGroup'] = [g.strip() for g in row['vulnerabilityGroup'].split(';') if g.strip()]
+            rows.append(row)
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            raise BulkIngestError('Body is not valid JSON')
+        if isinstance(rows, dict):
+            rows = rows.get('requests')
+        if not isinstance(rows, list):
+            raise BulkIngestError('Expected a list of requests')
+    
+    if len(rows) > BULK_INGEST_MAX_ROWS:
+        raise BulkIngestError(f"Batch has {len(rows)} rows, the limit is {BULK_INGEST_MAX_ROWS}")
+    return rows
+
+
+def parse_flag(value):
+    """Boolean from JSON or a CSV cell ('true', 'yes', '1')"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', 'yes', '1', 'y')
+    return bool(value)
+
+
+def validate_bulk_row(row):
+    """
+    Validate one bulk row and build the request fields from it
+    
+    Returns:
+        tuple: (request dict or None, list of error messages)
+    """
+    if not isinstance(row, dict):
+        return None, ['Row is not an object']
+    
+    errors = []
+    for field in ('citizenName', 'email', 'description'):
+        if not row.get(field):
+            errors.append(f"{field} is required")
+    if row.get('needType') not in REQUEST_NEED_TYPES:
+        errors.append(f"needType must be one of {', '.join(sorted(REQUEST_NEED_TYPES))}")
+    if row.get('severity') not in REQUEST_SEVERITIES:
+        errors.append(f"severity must be one of {', '.join(sorted(REQUEST_SEVERITIES))}")
+    
+    people_affected = row.get('peopleAffected') or 1
+    try:
+        people_affected = int(people_affected)
+        if people_affected < 1:
+            raise ValueError
+    except (TypeError, ValueError):
+        errors.append('peopleAffected must be a positive integer')
+    
+    vulnerability_group = row.get('vulnerabilityGroup') or ['none']
+    if not isinstance(vulnerability_group, list):
+        errors.append('vulnerabilityGroup must be a list')
+    
+    if errors:
+        return None, errors
+    
+    location = row.get('location')
+    if isinstance(location, dict):
+        location = location.get('address')
+    
+    return {
+        'citizenName': row['citizenName'],
+        'email': row['email'],
+        'phone': row.get('phone') or None,
+        'location': location or None,
+        'needType': row['needType'],
+        'severity': row['severity'],
+        'peopleAffected': people_affected,
+        'description': row['description'],
+        'vulnerabilityGroup': vulnerability_group,
+        'specialCircumstances': row.get('specialCircumstances') or None,
+        'isStudent': parse_flag(row.get('isStudent', False)),
+        'educationalNeeds': row.get('educationalNeeds') or None,
+        'hasEvidence': parse_flag(row.get('hasEvidence', False))
+    }, []
+
+
+def bulk_copy_row(req):
+    """CSV fields for one request, matching BULK_COPY_COLUMNS (stored like save_request_to_db stores them)"""
+    return (
+        req['id'], req['citizenName'], req['email'], req.get('phone'), req.get('location'),
+        req['needType'], req['severity'], req['peopleAffected'], req['description'],
+        json.dumps(list(req.get('vulnerabilityGroup') or [])), req.get('specialCircumstances'),
+        't' if req.get('isStudent') else 'f',
+        # educational_needs holds studentInfo, as written by save_request_to_db and read by row_to_request
+        json.dumps(dict(req.get('studentInfo') or {})),
+        't' if req.get('hasEvidence') else 'f',
+        req['status'], req['priorityScore'], req.get('estimatedResponseTime'),
+        req['submittedAt'], req['updatedAt']
+    )
+
+
+def copy_requests_to_db(requests):
+    """
+    Insert requests with a single COPY in one transaction
+    
+    Returns:
+        bool: False if the database is unavailable; raises BulkIngestError if the batch was rejected
+    """
+    conn = get_db_connection()
+    if not conn:
+        return False
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for req in requests:
+        # Unquoted empty fields are NULL in COPY's CSV format
+        writer.writerow(['' if value is None else value for value in bulk_copy_row(req)])
+    buffer.seek(0)
+    
+    try:
+        cur = conn.cursor()
+        cur.copy_expert(
+            f"COPY requests ({', '.join(BULK_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        record_request_changes(cur, [req['id'] for req in requests], 'created')
+        conn.commit()
+        cur.close()
+        return True
+    except Exception as e:
+        print(f"Error copying requests to database: {e}")
+        conn.rollback()
+        raise BulkIngestError(f"Database rejected the batch: {e}")
+    finally:
+        conn.close()
+
+
+def ingest_requests(rows, actor):
+    """
+    Validate, score and store a batch of requests
+    
+    Valid rows are loaded with one COPY and added to the in-memory store in
+    one call; invalid rows are reported and skipped. If the database rejects
+    the batch (BulkIngestError) or is unavailable (BulkIngestUnavailable)
+    nothing is stored.
+    
+    Args:
+        rows (list): Parsed rows (see parse_bulk_rows)
+        actor (str): Email recorded in the audit log
+    
+    Returns:
+        dict: accepted request ids and per-row errors (row numbers are 1-based)
+    """
+    errors = []
+    valid = []
+    for number, row in enumerate(rows, 1):
+        fields, row_errors = validate_bulk_row(row)
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+        else:
+            valid.append(fields)
+    
+    if not valid:
+        return {'accepted': [], 'errors': errors}
+    
+    now = datetime.now().isoformat()
+    ids = request_ids.allocate(len(valid))
+    scores = calculate_priority_scores(valid)
+    batch = []
+    for request_id, fields, score in zip(ids, valid, scores):
+        batch.append(RequestRecord.from_dict({
+            'id': request_id,
+            **fields,
+            'status': 'pending',
+            'submittedAt': now,
+            'updatedAt': now,
+            'verificationCount': 0,
+            'priorityScore': score
+        }))
+    
+    if not copy_requests_to_db(batch):
+        raise BulkIngestUnavailable('Database unavailable; no requests were stored')
+    requests_db.add_many(batch)
+    for req in batch:
+        req['estimatedResponseTime'] = estimate_response_time(
+            req['priorityScore'], requests_db.queue_position(req['id'])
+        )
+    
+    log_audit_action('CREATE', actor,
+                     f"Bulk ingest of {len(batch)} requests ({len(errors)} rows rejected)",
+                     'REQUEST', f"{batch[0]['id']}..{batch[-1]['id']}")
+    
+    # One trend update and one live event per need type instead of one per row
+    record_response_event('submitted', batch[0], count=len(batch))
+    for need_type, count in Counter(req['needType'] for req in batch).items():
+        publish_request_event('bulk_submitted', {'id': None, 'needType': need_type}, count=count)
+    
+    return {'accepted': [req['id'] for req in batch], 'errors': errors}
+
+# ============================================
+# REAL-TIME EVENTS (SERVER-SENT EVENTS)
+# ============================================
+
+# Each worker process has one EventBroker holding its SSE subscribers. Events
+# are published with NOTIFY on EVENTS_CHANNEL; one listener thread per worker
+# receives them (including its own) and fans them out locally, so a submit
+# handled by one gunicorn worker reaches dashboards connected to any other.
+EVENTS_CHANNEL = 'request_events'
+# Other sections register handler(payload) here for their own NOTIFY channels; the
+# listener also calls handler(None) after (re)connecting, since notifications
+# sent while it was disconnected are lost
+NOTIFY_HANDLERS = {}
+SSE_MAX_SUBSCRIBERS = int(os.getenv('SSE_MAX_SUBSCRIBERS', 1000))  # Per worker process
+SSE_SUBSCRIBER_QUEUE_SIZE = 100
+SSE_HEARTBEAT_SECONDS = 15
+BULK_EVENT_MAX_REQUESTS = 50  # Requests summarized per bulk event, to stay under the NOTIFY payload limit
+
+
+class EventSubscriber:
+    """One SSE connection: a bounded queue plus the events it may see"""
+    
+    def __init__(self, allowed_types, email):
+        self.queue = queue.Queue(maxsize=SSE_SUBSCRIBER_QUEUE_SIZE)
+        self.allowed_types = allowed_types  # None = every need type
+        self.email = email  # Citizens only see their own requests
+        self.overflowed = False
+    
+    def wants(self, event):
+        # Bulk events list the citizens they concern instead of a single email
+        if self.email is not None and event.get('email') != self.email and self.email not in event.get('emails', ()):
+            return False
+        if self.allowed_types is not None and event.get('needType') not in self.allowed_types:
+            return False
+        return True
+
+
+class EventBroker:
+    """
+    Per-process fan-out of request events to SSE subscribers.
+    
+    Subscribers never get a thread of their own: each stream blocks on its
+    queue, which under gevent workers is a cheap greenlet. The single LISTEN
+    thread is started with the first subscriber (or first ensure_listener()
+    call) and reconnects on failure; besides EVENTS_CHANNEL it dispatches
+    the channels in NOTIFY_HANDLERS.
+    """
+    
+    def __init__(self):
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._listener = None
+        self._listening = False
+        self._next_event_id = 0
+        self._metrics = {'published': 0, 'delivered': 0, 'dropped': 0, 'listenerReconnects': 0}
+    
+    def subscribe(self, allowed_types, email):
+        """Register a subscriber; returns None when this worker is at SSE_MAX_SUBSCRIBERS"""
+        with self._lock:
+            if len(self._subscribers) >= SSE_MAX_SUBSCRIBERS:
+                return None
+            subscriber = EventSubscriber(allowed_types, email)
+            self._subscribers.add(subscriber)
+        self.ensure_listener()
+        return subscriber
+    
+    def ensure_listener(self):
+        """Start the LISTEN thread if it is not running yet"""
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='event-listener', daemon=True)
+                self._listener.start()
+    
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+    
+    def publish_local(self, event):
+        """Deliver an event to this worker's matching subscribers without blocking"""
+        with self._lock:
+            self._next_event_id += 1
+            event = {**event, 'eventId': self._next_event_id}
+            subscribers = list(self._subscribers)
+            self._metrics['published'] += 1
+        
+        for subscriber in subscribers:
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+                self._metrics['delivered'] += 1
+            except queue.Full:
+                # Slow client: drop events and tell it to resynchronize instead
+                subscriber.overflowed = True
+                self._metrics['dropped'] += 1
+    
+    def is_listening(self):
+        return self._listening
+    
+    def _relay(self, payload):
+        if payload is None:
+            return
+        try:
+            self.publish_local(json.loads(payload))
+        except ValueError:
+            print(f"Ignoring malformed event payload: {payload[:100]}")
+    
+    def _listen(self):
+        """LISTEN on EVENTS_CHANNEL and NOTIFY_HANDLERS' channels with a dedicated connection"""
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**DB_CONFIG)
+                conn.autocommit = True
+                cur = conn.cursor()
+                handlers = {EVENTS_CHANNEL: self._relay, **NOTIFY_HANDLERS}
+                for channel in handlers:
+                    cur.execute(f"LISTEN {channel}")
+                self._listening = True
+                backoff = 1
+                for handler in handlers.values():
+                    handler(None)
+                
+                while True:
+                    if select.select([conn], [], [], SSE_HEARTBEAT_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        handler = handlers.get(notify.channel)
+                        if handler is not None:
+                            handler(notify.payload)
+            except Exception as e:
+                print(f"Event listener error: {e}")
+            finally:
+                self._listening = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            
+            self._metrics['listenerReconnects'] += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                **self._metrics,
+                'pid': self.pid,
+                'subscribers': len(self._subscribers),
+                'listening': self._listening
+            }
+
+
+_event_broker = None
+_event_broker_lock = threading.Lock()
+
+
+def get_event_broker():
+    """Return this process's EventBroker (one per gunicorn worker, created after fork)"""
+    global _event_broker
+    with _event_broker_lock:
+        if _event_broker is None or _event_broker.pid != os.getpid():
+            _event_broker = EventBroker()
+        return _event_broker
+
+
+def publish_request_event(event_type, req, **extra):
+    """
+    Publish a request event to every worker's SSE subscribers
+    
+    Args:
+        event_type (str): 'submitted', 'status_changed' or 'bulk_status_changed'
+        req (dict): The request the event is about
+        **extra: Additional fields, e.g. oldStatus
+    """
+    event = {
+        'type': event_type,
+        'requestId': req['id'],
+        'needType': req.get('needType'),
+        'email': req.get('email'),
+        'status': req.get('status'),
+        'priorityScore': req.get('priorityScore'),
+        'updatedAt': req.get('updatedAt'),
+        **extra
+    }
+    
+    broker = get_event_broker()
+    conn = get_db_connection()
+    if conn:
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_notify(%s, %s)", (EVENTS_CHANNEL, json.dumps(event)))
+            conn.commit()
+            cur.close()
+            conn.close()
+            # Our own listener delivers it locally, unless it is (re)connecting
+            if broker.is_listening():
+                return
+        except Exception as e:
+            print(f"Error publishing request event: {e}")
+            conn.rollback()
+            conn.close()
+    
+    # No database: only this worker's subscribers can be reached
+    broker.publish_local(event)
+
+
+def publish_status_changes(reqs, old_statuses):
+    """
+    Publish status changes: a status_changed event for a single request,
+    otherwise bulk_status_changed events per need type, each covering up to
+    BULK_EVENT_MAX_REQUESTS requests and listing the citizens concerned
+    """
+    if len(reqs) == 1:
+        publish_request_event('status_changed', reqs[0], oldStatus=old_statuses[reqs[0]['id']])
+        return
+    
+    by_need_type = {}
+    for req in reqs:
+        by_need_type.setdefault(req.get('needType'), []).append(req)
+    for need_type, group in by_need_type.items():
+        for i in range(0, len(group), BULK_EVENT_MAX_REQUESTS):
+            chunk = group[i:i + BULK_EVENT_MAX_REQUESTS]
+            publish_request_event('bulk_status_changed',
+                                  {'id': None, 'needType': need_type, 'status': chunk[0].get('status'),
+                                   'updatedAt': chunk[0].get('updatedAt')},
+                                  count=len(chunk), emails=sorted({req.get('email') for req in chunk if req.get('email')}))
+
+
+def format_sse(event_name, data, event_id=None):
+    """Encode one server-sent event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_name}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+# ============================================
+# CROSS-WORKER REQUEST CACHE SYNC (OUTBOX)
+# ============================================
+
+REQUEST_CHANGES_CHANNEL = 'request_changes'
+OUTBOX_BATCH_SIZE = 1000  # Outbox entries applied per query
+OUTBOX_RETENTION_SECONDS = float(os.getenv('OUTBOX_RETENTION_SECONDS', 3600))  # Older entries are pruned
+OUTBOX_PRUNE_INTERVAL = 60  # Seconds between prunes by each worker
+
+
+def outbox_origin():
+    """Identifies this worker process in request_outbox.origin"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def record_request_changes(cur, request_ids, change_type):
+    """
+    Add outbox entries for changed requests in the caller's transaction
+    
+    The NOTIFY is delivered to every worker when the transaction commits,
+    so no worker can see the change before the row itself is committed.
+    """
+    cur.execute("""
+        INSERT INTO request_outbox (request_id, change_type, origin)
+        SELECT unnest(%s::varchar[]), %s, %s
+    """, (list(request_ids), change_type, outbox_origin()))
+    cur.execute("SELECT pg_notify(%s, '')", (REQUEST_CHANGES_CHANNEL,))
+
+
+class RequestCacheSync:
+    """
+    Keeps this worker's requests_db in step with writes made by any worker.
+    
+    Request writes commit a request_outbox row in the same transaction and
+    NOTIFY request_changes. On each notification this worker reads the
+    outbox entries after the last one it applied, joined to the current
+    request rows, and upserts them into requests_db, skipping its own writes
+    (already applied locally). After a listener reconnect it catches up the
+    same way; only when it was out of touch for longer than
+    OUTBOX_RETENTION_SECONDS, so entries may have been pruned, does it
+    reload all requests.
+    
+    outbox_ids are taken when a row is inserted, not when its transaction
+    commits, so a lower id can become visible after a higher one.
+    last_outbox_id therefore only moves over ids that were applied, or that
+    have been missing for DELTA_SYNC_LAG_SECONDS (rolled back, or the request
+    was deleted). Entries above a gap are applied once and remembered, and
+    the next catch-up re-reads from last_outbox_id to pick up late commits.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.last_outbox_id = None  # None until init_app() has loaded the store
+        self._last_sync = time.monotonic()
+        self._last_prune = 0
+        self._ahead = set()  # Handled outbox_ids above a gap
+        self._gaps = {}  # Missing outbox_id -> time.monotonic() it was first noticed
+        self._metrics = {'applied': 0, 'skippedOwn': 0, 'catchUps': 0, 'reloads': 0, 'errors': 0}
+    
+    def current_watermark(self):
+        """
+        Outbox id taken before a full load; None without a database
+        
+        Entries from the last DELTA_SYNC_LAG_SECONDS are left above it, since
+        lower ids among them may still be uncommitted; replaying the ones
+        the load already saw is harmless.
+        """
+        conn = get_db_connection()
+        if not conn:
+            return None
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT COALESCE(MAX(outbox_id), 0) FROM request_outbox
+                WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+            """, (DELTA_SYNC_LAG_SECONDS,))
+            watermark = cur.fetchone()[0]
+            cur.close()
+            conn.commit()
+            return watermark
+        except Exception as e:
+            print(f"Error reading request outbox: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+    
+    def start(self, watermark):
+        """Apply changes after watermark (those made during the load) and follow new ones"""
+        if watermark is None:
+            return
+        with self._lock:
+            self.last_outbox_id = watermark
+            self._ahead.clear()
+            self._gaps.clear()
+            self._last_sync = time.monotonic()
+        get_event_broker().ensure_listener()
+        # Our own writes during the load went to the store that was just replaced
+        self.catch_up(include_own=True)
+    
+    def catch_up(self, include_own=False):
+        with self._lock:
+            if self.last_outbox_id is None:
+                return
+            conn = get_db_connection()
+            if not conn:
+                return
+            
+            origin = outbox_origin()
+            now = time.monotonic()
+            try:
+                cur = conn.cursor()
+                after = self.last_outbox_id
+                while True:
+                    cur.execute(f"""
+                        SELECT o.outbox_id, o.change_type, o.origin, r.*
+                        FROM request_outbox o
+                        JOIN LATERAL (
+                            SELECT {REQUEST_COLUMNS} FROM requests WHERE request_id = o.request_id
+                        ) r ON TRUE
+                        WHERE o.outbox_id > %s
+                        ORDER BY o.outbox_id
+                        LIMIT %s
+                    """, (after, OUTBOX_BATCH_SIZE))
+                    rows = cur.fetchall()
+                    for outbox_id, change_type, row_origin, *columns in rows:
+                        for missing in range(after + 1, outbox_id):
+                            if missing not in self._ahead:
+                                self._gaps.setdefault(missing, now)
+                        after = outbox_id
+                        if outbox_id in self._ahead:
+                            continue
+                        if row_origin == origin and not include_own:
+                            self._metrics['skippedOwn'] += 1
+                        else:
+                            self._apply(change_type, row_to_request(columns))
+                        self._ahead.add(outbox_id)
+                    if len(rows) < OUTBOX_BATCH_SIZE:
+                        break
+                self._advance(now)
+                
+                if time.monotonic() - self._last_prune > OUTBOX_PRUNE_INTERVAL:
+                    cur.execute("""
+                        DELETE FROM request_outbox
+                        WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    """, (OUTBOX_RETENTION_SECONDS,))
+                    self._last_prune = time.monotonic()
+                
+                conn.commit()
+                cur.close()
+                self._last_sync = time.monotonic()
+                self._metrics['catchUps'] += 1
+            except Exception as e:
+                print(f"Error applying request outbox: {e}")
+                self._metrics['errors'] += 1
+                conn.rollback()
+            finally:
+                conn.close()
+    
+    def _advance(self, now):
+        """Move last_outbox_id over handled ids and over gaps older than DELTA_SYNC_LAG_SECONDS"""
+        while True:
+            next_id = self.last_outbox_id + 1
+            if next_id in self._ahead:
+                self._ahead.discard(next_id)
+                self._gaps.pop(next_id, None)
+            elif next_id in self._gaps and now - self._gaps[next_id] >= DELTA_SYNC_LAG_SECONDS:
+                del self._gaps[next_id]
+            else:
+                return
+            self.last_outbox_id = next_id
+    
+    def _apply(self, change_type, req):
+        # With lazy loading, an update to a row this worker never loaded is fetched on demand instead
+        if change_type == 'created' or req['id'] in requests_db or not lazy_loading():
+            requests_db.add(req)
+            self._metrics['applied'] += 1
+    
+    def on_notify(self, payload):
+        if payload is None and self.last_outbox_id is not None \
+                and time.monotonic() - self._last_sync > OUTBOX_RETENTION_SECONDS:
+            # (Re)connected after a long gap: entries we need may have been pruned
+            self._metrics['reloads'] += 1
+            init_app()
+            return
+        self.catch_up()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                **self._metrics,
+                'lastOutboxId': self.last_outbox_id,
+                'pendingGaps': len(self._gaps),
+                'secondsSinceSync': round(time.monotonic() - self._last_sync, 1)
+            }
+
+
+request_sync = RequestCacheSync()
+
+NOTIFY_HANDLERS[REQUEST_CHANGES_CHANNEL] = request_sync.on_notify
+
+# ============================================
+# AUDIT LOG WRITER (BATCHED, ASYNCHRONOUS)
+# ============================================
+
+AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))  # Entries buffered in memory per worker
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 500))  # Flush once this many entries are waiting...
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv('AUDIT_FLUSH_INTERVAL_MS', 200))  # ...or after this long
+AUDIT_RETRY_SECONDS = 5  # Back off this long after a failed flush before touching the database again
+AUDIT_SPOOL_DIR = os.getenv('AUDIT_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audit_spool'))
+
+AUDIT_COLUMNS = ('audit_code', 'timestamp', 'action_type', 'user_email', 'user_role',
+                 'entity_type', 'entity_id', 'details', 'ip_address')
+
+
+def pid_is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AuditWriter:
+    """
+    Writes audit entries to PostgreSQL from a background thread.
+    
+    Request handlers only enqueue. The writer thread flushes a batch with one
+    multi-row INSERT every AUDIT_FLUSH_INTERVAL_MS or AUDIT_BATCH_SIZE entries.
+    When the queue is full or PostgreSQL is unavailable, entries are appended
+    to a per-process spool file (one JSON entry per line) and replayed once the
+    database accepts writes again. Spool files left behind by workers that
+    have exited are replayed by whichever worker claims them first. Inserts use
+    ON CONFLICT DO NOTHING against the (audit_code, timestamp) key, so a
+    replayed entry is never duplicated. The thread also creates upcoming
+    monthly partitions (see ensure_audit_partitions).
+    """
+    
+    def __init__(self):
+        self.pid = os.getpid()
+        self._queue = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self._spool_lock = threading.Lock()
+        self._spool_path = os.path.join(AUDIT_SPOOL_DIR, f"audit-{self.pid}.jsonl")
+        self._stop = threading.Event()
+        self._retry_at = 0
+        self._partitions_due = 0
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._metrics = {'enqueued': 0, 'written': 0, 'batches': 0, 'spilled': 0,
+                         'replayed': 0, 'rejected': 0, 'flushErrors': 0}
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+    
+    def next_code(self):
+        """Audit code unique across workers: microsecond timestamp, pid and a per-process sequence"""
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        return f"AUDIT-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{self.pid}-{seq}"
+    
+    def submit(self, entry):
+        """Queue an entry for writing; never blocks the caller"""
+        self.submit_many([entry])
+    
+    def submit_many(self, entries):
+        """Queue entries back to back, so the writer thread takes them in the same batch"""
+        self._metrics['enqueued'] += len(entries)
+        for i, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                # Backpressure: the database is not keeping up, park the rest on disk
+                self._spill(entries[i:])
+                return
+    
+    def _spill(self, entries):
+        with self._spool_lock:
+            os.makedirs(AUDIT_SPOOL_DIR, exist_ok=True)
+            with open(self._spool_path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._metrics['spilled'] += len(entries)
+    
+    def _run(self):
+        interval = AUDIT_FLUSH_INTERVAL_MS / 1000
+        while not self._stop.is_set():
+            batch = self._take_batch(interval)
+            backing_off = time.monotonic() < self._retry_at
+            if batch:
+                if backing_off or not self._write(batch):
+                    self._spill(batch)
+            elif not backing_off and self._spool_pending():
+                self._replay_spool()
+            if not backing_off and time.monotonic() >= self._partitions_due:
+                self._partitions_due = time.monotonic() + AUDIT_PARTITION_CHECK_SECONDS
+                ensure_audit_partitions()
+    
+    def _take_batch(self, interval):
+        """Wait up to interval for the first entry, then drain up to AUDIT_BATCH_SIZE"""
+        batch = []
+        deadline = time.monotonic() + interval
+        while len(batch) < AUDIT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _write(self, batch):
+        """Insert a batch in one statement; returns False when it should be retried later"""
+        conn = get_db_connection()
+        if not conn:
+            self._metrics['flushErrors'] += 1
+            self._retry_at = time.monotonic() + AUDIT_RETRY_SECONDS
+            return False
+        
+        rows = [tuple(entry.get(col) for col in AUDIT_COLUMNS) for entry in batch]
+        sql = f"""
+            INSERT INTO audit_logs ({', '.join(AUDIT_COLUMNS)})
+            VALUES %s
+            ON CONFLICT DO NOTHING
+        """
+        try:
+            cur = conn.cursor()
+            try:
+                psycopg2.extras.execute_values(cur, sql, rows, page_size=AUDIT_BATCH_SIZE)
+                conn.commit()
+            except (psycopg2.IntegrityError, psycopg2.DataError):
+                # A bad row (e.g. an unknown action_type) must not sink the whole batch
+                conn.rollback()
+                for row, entry in zip(rows, batch):
+                    try:
+                        psycopg2.extras.execute_values(cur, sql, [row])
+                        conn.commit()
+                    except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                        conn.rollback()
+                        self._metrics['rejected'] += 1
+                        print(f"Rejected audit entry {entry.get('audit_code')}: {e}")
+            cur.close()
+            self._metrics['written'] += len(batch)
+            self._metrics['batches'] += 1
+            return True
+        except Exception as e:
+            print(f"Error flushing audit batch: {e}")
+            self._metrics['flushErrors'] += 1
+            self._retry_at = time.monotonic() + AUDIT_RETRY_SECONDS
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            return False
+        finally:
+            conn.close()
+    
+    def _spool_pending(self):
+        try:
+            return any(name.endswith('.jsonl') for name in os.listdir(AUDIT_SPOOL_DIR))
+        except FileNotFoundError:
+            return False
+    
+    def _claim_spool_files(self):
+        """Atomically take ownership of our own spool file and those of exited workers"""
+        claimed = []
+        for path in glob.glob(os.path.join(AUDIT_SPOOL_DIR, 'audit-*.jsonl')):
+            try:
+                owner = int(os.path.basename(path)[len('audit-'):-len('.jsonl')])
+            except ValueError:
+                continue
+            if owner != self.pid and pid_is_alive(owner):
+                continue
+            target = f"{path}.{self.pid}.replay"
+            try:
+                if owner == self.pid:
+                    with self._spool_lock:
+                        os.rename(path, target)
+                else:
+                    os.rename(path, target)  # Only one worker wins the rename
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+        # Replay files a previous attempt of ours left half-done
+        claimed.extend(glob.glob(os.path.join(AUDIT_SPOOL_DIR, f"*.{self.pid}.replay")))
+        return sorted(set(claimed))
+    
+    def _replay_spool(self):
+        for path in self._claim_spool_files():
+            with open(path, encoding='utf-8') as f:
+                entries = []
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        pass  # Torn write from a crash
+            
+            for i in range(0, len(entries), AUDIT_BATCH_SIZE):
+                if not self._write(entries[i:i + AUDIT_BATCH_SIZE]):
+                    return  # Still unavailable; the claimed file is retried next time
+                self._metrics['replayed'] += len(entries[i:i + AUDIT_BATCH_SIZE])
+            os.remove(path)
+    
+    def shutdown(self, timeout=5):
+        """Flush what is queued; anything the database does not take goes to the spool"""
+        self._stop.set()
+        self._thread.join(timeout)
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if remaining and not self._write(remaining):
+            self._spill(remaining)
+    
+    def stats(self):
+        return {
+            **self._metrics,
+            'pid': self.pid,
+            'queued': self._queue.qsize(),
+            'spoolPending': self._spool_pending()
+        }
+
+
+_audit_writer = None
+_audit_writer_lock = threading.Lock()
+
+
+def get_audit_writer():
+    """Return this process's AuditWriter, starting its thread on first use"""
+    global _audit_writer
+    with _audit_writer_lock:
+        if _audit_writer is None or _audit_writer.pid != os.getpid():
+            _audit_writer = AuditWriter()
+            atexit.register(_audit_writer.shutdown)
+        return _audit_writer
+
+# ============================================
+# AUDIT LOG PARTITIONS (MONTHLY, WITH RETENTION)
+# ============================================
+
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv('AUDIT_PARTITION_MONTHS_AHEAD', 3))  # Future months kept ready
+AUDIT_PARTITION_CHECK_SECONDS = 3600  # How often each audit writer checks for missing partitions
+AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', 12))  # Months kept online, current month included
+AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audit_archive'))
+AUDIT_PARTITION_LOCK = 7310  # pg_advisory_xact_lock key: one worker maintains partitions at a time
+AUDIT_PARTITION_PREFIX = 'audit_logs_'
+AUDIT_ARCHIVE_MARKER = 'detached by archive-audit-logs'  # Table comment on partitions the retention job detached
+
+
+def add_months(month, n):
+    """First day of the month n months after month"""
+    index = month.year * 12 + month.month - 1 + n
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def audit_partition_name(month):
+    """Partition holding month's audit entries, e.g. audit_logs_202610"""
+    return f"{AUDIT_PARTITION_PREFIX}{month.year:04d}{month.month:02d}"
+
+
+def audit_partition_month(name):
+    """Month a partition from audit_partition_name holds, or None for any other table"""
+    suffix = name[len(AUDIT_PARTITION_PREFIX):]
+    if not name.startswith(AUDIT_PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    try:
+        return datetime(int(suffix[:4]), int(suffix[4:]), 1)
+    except ValueError:
+        return None
+
+
+def audit_logs_partitioned(cur):
+    """Whether audit_logs is a partitioned table (databases created before partitioning are not)"""
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('audit_logs')")
+    row = cur.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def ensure_audit_partitions(months_ahead=AUDIT_PARTITION_MONTHS_AHEAD):
+    """
+    Create the monthly audit_logs partitions from this month to months_ahead months out
+    
+    Returns:
+        list|None: Names of the partitions created, or None if the database is
+            unavailable or audit_logs is not partitioned
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    try:
+        cur = conn.cursor()
+        if not audit_logs_partitioned(cur):
+            conn.rollback()
+            cur.close()
+            conn.close()
+            return None
+        
+        # Other workers wait here and then find the partitions in place
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (AUDIT_PARTITION_LOCK,))
+        this_month = add_months(datetime.now(), 0)
+        created = []
+        for n in range(months_ahead + 1):
+            month = add_months(this_month, n)
+            name = audit_partition_name(month)
+            cur.execute("SELECT to_regclass(%s)", (name,))
+            if cur.fetchone()[0] is not None:
+                continue
+            cur.execute(f"CREATE TABLE {name} PARTITION OF audit_logs FOR VALUES FROM (%s) TO (%s)",
+                        (month.strftime('%Y-%m-%d'), add_months(month, 1).strftime('%Y-%m-%d')))
+            created.append(name)
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+        return created
+    except Exception as e:
+        print(f"Error creating audit log partitions: {e}")
+        conn.rollback()
+        conn.close()
+        return None
+
+
+def archive_audit_partitions(retention_months=AUDIT_RETENTION_MONTHS, archive_dir=AUDIT_ARCHIVE_DIR, dry_run=False):
+    """
+    Move monthly audit_logs partitions older than the retention window out of the database
+    
+    Each expired partition is detached (a quick catalog change; no rows are
+    moved), exported to <archive_dir>/<partition>.csv.gz and dropped.
+    The detach also sets AUDIT_ARCHIVE_MARKER as the table's comment, so a
+    partition that was detached but not yet dropped, e.g. because an earlier
+    run was interrupted, is finished on the next run; other tables that only
+    share the audit_logs_YYYYMM name are left alone.
+    
+    Args:
+        retention_months (int): Months kept, counting the current one
+        archive_dir (str): Where the compressed CSV exports go
+        dry_run (bool): Only report which partitions would be archived
+    
+    Returns:
+        list|None: {'partition', 'rows', 'path'} per partition (rows is None
+            on a dry run), or None if the database is unavailable or
+            audit_logs is not partitioned
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    cutoff = add_months(datetime.now(), 1 - max(retention_months, 1))
+    archived = []
+    try:
+        cur = conn.cursor()
+        if not audit_logs_partitioned(cur):
+            conn.rollback()
+            cur.close()
+            conn.close()
+            return None
+        
+        # Attached monthly partitions, plus ones this job detached in an interrupted run
+        cur.execute("""
+            SELECT c.relname, c.relispartition
+            FROM pg_class c
+            WHERE c.relkind = 'r' AND pg_table_is_visible(c.oid)
+              AND c.relname LIKE %s
+              AND CASE WHEN c.relispartition
+                       THEN EXISTS (SELECT 1 FROM pg_inherits i
+                                    WHERE i.inhrelid = c.oid AND i.inhparent = 'audit_logs'::regclass)
+                       ELSE obj_description(c.oid, 'pg_class') = %s
+                  END
+        """, (AUDIT_PARTITION_PREFIX.replace('_', '\\_') + '%', AUDIT_ARCHIVE_MARKER))
+        expired = []
+        for name, attached in sorted(cur.fetchall()):
+            month = audit_partition_month(name)
+            if month is not None and month < cutoff:
+                expired.append((name, attached))
+        conn.rollback()
+        
+        for name, attached in expired:
+            path = os.path.join(archive_dir, f"{name}.csv.gz")
+            if dry_run:
+                archived.append({'partition': name, 'rows': None, 'path': path})
+                continue
+            
+            if attached:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (AUDIT_PARTITION_LOCK,))
+                # Marked in the same transaction, so a detached partition always carries the marker
+                cur.execute(f"COMMENT ON TABLE {name} IS %s", (AUDIT_ARCHIVE_MARKER,))
+                cur.execute(f"ALTER TABLE audit_logs DETACH PARTITION {name}")
+                conn.commit()
+            
+            # Export to a temporary file first, so a crash never leaves a truncated archive behind
+            os.makedirs(archive_dir, exist_ok=True)
+            cur.execute(f"SELECT COUNT(*) FROM {name}")
+            rows = cur.fetchone()[0]
+            with gzip.open(path + '.tmp', 'wb') as f:
+                cur.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+            with open(path + '.tmp', 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(path + '.tmp', path)
+            
+            cur.execute(f"DROP TABLE {name}")
+            conn.commit()
+            archived.append({'partition': name, 'rows': rows, 'path': path})
+        
+        cur.close()
+        conn.close()
+        return archived
+    except Exception as e:
+        print(f"Error archiving audit log partitions: {e}")
+        conn.rollback()
+        conn.close()
+        raise
+
+# ============================================
+# PASSWORD HASHING FUNCTIONS (BCRYPT)
+# ============================================
+
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # Cost factor for new hashes
+PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', os.cpu_count() or 2))  # Concurrent bcrypt computations per worker process
+PASSWORD_POOL_MAX_QUEUE = int(os.getenv('PASSWORD_POOL_MAX_QUEUE', 32))  # Jobs allowed to wait for a free thread
+PASSWORD_POOL_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_POOL_QUEUE_TIMEOUT', 2))  # Seconds to wait for a queue slot before giving up
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password pool's queue is full; answered with 503"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+    
+    bcrypt releases the GIL, so hashing on PASSWORD_POOL_WORKERS threads runs
+    in parallel with the rest of the worker instead of stalling it. At most
+    PASSWORD_POOL_WORKERS + PASSWORD_POOL_MAX_QUEUE jobs are admitted; past
+    that callers wait up to PASSWORD_POOL_QUEUE_TIMEOUT and then get
+    PasswordHasherBusy, so a login storm is shed early rather than piling up.
+    Under gevent the jobs go to the hub's native thread pool, because
+    monkey-patched threads would run bcrypt on the event loop.
+    """
+    
+    def __init__(self, workers, max_queue):
+        self.pid = os.getpid()
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._gevent_pool = None
+        self._lock = threading.Lock()
+        self._metrics = {'submitted': 0, 'completed': 0, 'rejected': 0, 'inFlight': 0,
+                         'waitMsTotal': 0.0, 'runMsTotal': 0.0, 'maxWaitMs': 0.0}
+        
+        if 'gevent.monkey' in sys.modules and sys.modules['gevent.monkey'].is_module_patched('threading'):
+            import gevent
+            self._gevent_pool = gevent.get_hub().threadpool
+            self._gevent_pool.maxsize = max(self._gevent_pool.maxsize, workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+    
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for its result"""
+        job = self._admit(fn, args, self._slots.acquire(timeout=PASSWORD_POOL_QUEUE_TIMEOUT))
+        try:
+            if self._gevent_pool is not None:
+                return self._gevent_pool.spawn(job).get()
+            return self._executor.submit(job).result()
+        finally:
+            self._finish()
+    
+    def submit(self, fn, *args):
+        """
+        Start fn(*args) on the pool without waiting; returns a concurrent.futures.Future
+        
+        For callers on an asyncio event loop (asgi.py), which must not block:
+        a full queue raises PasswordHasherBusy at once.
+        """
+        job = self._admit(fn, args, self._slots.acquire(blocking=False))
+        try:
+            future = self._executor.submit(job)
+        except Exception:
+            self._finish()
+            raise
+        future.add_done_callback(lambda _: self._finish())
+        return future
+    
+    def _admit(self, fn, args, acquired):
+        """Account for a job that got (or failed to get) a slot; returns the wrapped job"""
+        if not acquired:
+            with self._lock:
+                self._metrics['rejected'] += 1
+            raise PasswordHasherBusy('Password service is busy, try again shortly')
+        
+        queued_at = time.monotonic()
+        with self._lock:
+            self._metrics['submitted'] += 1
+            self._metrics['inFlight'] += 1
+        
+        def job():
+            started = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.monotonic()
+                wait_ms = (started - queued_at) * 1000
+                with self._lock:
+                    self._metrics['completed'] += 1
+                    self._metrics['waitMsTotal'] += wait_ms
+                    self._metrics['maxWaitMs'] = max(self._metrics['maxWaitMs'], wait_ms)
+                    self._metrics['runMsTotal'] += (finished - started) * 1000
+        
+        return job
+    
+    def _finish(self):
+        with self._lock:
+            self._metrics['inFlight'] -= 1
+        self._slots.release()
+    
+    def submit_background(self, fn, *args):
+        """Fire-and-forget job (e.g. a rehash); skipped when the pool is saturated"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        
+        def job():
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Background password job failed: {e}")
+            finally:
+                self._slots.release()
+        
+        if self._gevent_pool is not None:
+            self._gevent_pool.spawn(job)
+        else:
+            self._executor.submit(job)
+        return True
+    
+    def stats(self):
+        with self._lock:
+            completed = self._metrics['completed'] or 1
+            return {
+                'pid': self.pid,
+                'workers': self.workers,
+                'bcryptRounds': BCRYPT_ROUNDS,
+                'submitted': self._metrics['submitted'],
+                'completed': self._metrics['completed'],
+                'rejected': self._metrics['rejected'],
+                'inFlight': self._metrics['inFlight'],
+                'queued': max(self._metrics['inFlight'] - self.workers, 0),
+                'avgWaitMs': round(self._metrics['waitMsTotal'] / completed, 2),
+                'maxWaitMs': round(self._metrics['maxWaitMs'], 2),
+                'avgRunMs': round(self._metrics['runMsTotal'] / completed, 2)
+            }
+
+
+_password_hasher = None
+_password_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Return this process's PasswordHasher (one per gunicorn worker, created after fork)"""
+    global _password_hasher
+    with _password_hasher_lock:
+        if _password_hasher is None or _password_hasher.pid != os.getpid():
+            _password_hasher = PasswordHasher(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_QUEUE)
+        return _password_hasher
+
+
+@app.errorhandler(PasswordHasherBusy)
+def handle_password_hasher_busy(e):
+    response = jsonify({'success': False, 'error': str(e)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def _hashpw(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def _checkpw(plain_password, hashed_password):
+    try:
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except Exception as e:
+        print(f"Password verification error: {e}")
+        return False
+
+def hash_password(password):
+    """
+    Hash a password using bcrypt (cost BCRYPT_ROUNDS) on the password pool
+    Args:
+        password (str): Plain text password
+    Returns:
+        str: Hashed password
+    Raises:
+        PasswordHasherBusy: If the pool's queue is full
+    """
+    return get_password_hasher().run(_hashpw, password)
+
+def verify_password(plain_password, hashed_password):
+    """
+    Verify a password against its hash on the password pool
+    Args:
+        plain_password (str): Plain text password to verify
+        hashed_password (str): Hashed password from database
+    Returns:
+        bool: True if password matches, False otherwise
+    Raises:
+        PasswordHasherBusy: If the pool's queue is full
+    """
+    return get_password_hasher().run(_checkpw, plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password):
+    """True if a bcrypt hash was made with a cost other than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split('$')[2]) != BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+def rehash_password_if_needed(password, hashed_password, save):
+    """
+    After a successful login, re-hash the password at the current cost in the
+    background and hand the new hash to save(new_hash)
+    """
+    if not password_needs_rehash(hashed_password):
+        return
+    
+    def rehash():
+        save(_hashpw(password))
+    
+    get_password_hasher().submit_background(rehash)
+
+def update_staff_password_hash(email, password_hash):
+    """Store a re-hashed password for a staff member"""
+    conn = get_db_connection()
+    if not conn:
+        return False
+    
+    try:
+        cur = conn.cursor()
+        cur.execute("UPDATE staff SET password_hash = %s WHERE email = %s", (password_hash, email))
+        conn.commit()
+        cur.close()
+        conn.close()
+        notify_staff_changed(email)
+        return True
+    except Exception as e:
+        print(f"Error updating password hash: {e}")
+        conn.rollback()
+        conn.close()
+        return False
+
+# ============================================
+# LOGIN RATE LIMITING
+# ============================================
+
+LOGIN_IP_LIMIT = int(os.getenv('LOGIN_IP_LIMIT', 30))  # Login attempts per client IP...
+LOGIN_IP_WINDOW = int(os.getenv('LOGIN_IP_WINDOW', 60))  # ...per this many seconds
+LOGIN_EMAIL_FAILURE_LIMIT = int(os.getenv('LOGIN_EMAIL_FAILURE_LIMIT', 5))  # Failed logins per account...
+LOGIN_EMAIL_WINDOW = int(os.getenv('LOGIN_EMAIL_WINDOW', 900))  # ...per this many seconds
+LOGIN_LIMITER_MAX_KEYS = int(os.getenv('LOGIN_LIMITER_MAX_KEYS', 100000))  # Buckets kept in memory per limiter
+LOGIN_LIMITER_BACKEND = os.getenv('LOGIN_LIMITER_BACKEND', 'memory')  # 'memory' (per worker) or 'postgres' (shared)
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window counter keyed by e.g. client IP or account email.
+    
+    Each key keeps only its current and previous fixed-window counts; the
+    sliding count is the current count plus the previous one weighted by how
+    much of the previous window still overlaps. Buckets live in an
+    OrderedDict used as an LRU, capped at max_keys, so a flood of distinct
+    keys evicts the least recently seen ones instead of growing memory.
+    """
+    
+    def __init__(self, name, limit, window, max_keys=LOGIN_LIMITER_MAX_KEYS):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [window index, previous count, current count]
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'blocked': 0, 'evicted': 0}
+    
+    def _counts(self, key, index):
+        """(previous, current) window counts for key"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 0, 0
+            self._buckets.move_to_end(key)
+            if bucket[0] == index:
+                return bucket[1], bucket[2]
+            if bucket[0] == index - 1:
+                return bucket[2], 0
+            return 0, 0
+    
+    def _increment(self, key, index):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [index, 0, 0]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self._metrics['evicted'] += 1
+            else:
+                self._buckets.move_to_end(key)
+            if bucket[0] != index:
+                previous = bucket[2] if bucket[0] == index - 1 else 0
+                bucket[:] = [index, previous, 0]
+            bucket[2] += 1
+    
+    def _forget(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+    
+    def retry_after(self, key):
+        """Seconds until key may try again; 0 if it is under the limit"""
+        now = time.time()
+        index, elapsed = divmod(now, self.window)
+        previous, current = self._counts(key, int(index))
+        weight = 1 - elapsed / self.window
+        if previous * weight + current < self.limit:
+            return 0
+        
+        self._metrics['blocked'] += 1
+        if current < self.limit:
+            # The previous window's share drops below the remaining allowance later in this window
+            wait = self.window * (1 - (self.limit - current) / previous) - elapsed
+        else:
+            # Only once this window becomes the (shrinking) previous one
+            wait = (self.window - elapsed) + self.window * (1 - self.limit / current)
+        return max(1, math.ceil(wait))
+    
+    def hit(self, key):
+        self._metrics['hits'] += 1
+        self._increment(key, int(time.time() // self.window))
+    
+    def reset(self, key):
+        self._forget(key)
+    
+    def stats(self):
+        with self._lock:
+            return {**self._metrics, 'limit': self.limit, 'window': self.window, 'keys': len(self._buckets)}
+
+
+class PostgresSlidingWindowLimiter(SlidingWindowLimiter):
+    """
+    SlidingWindowLimiter whose counts are shared by every worker through the
+    login_rate_limits table. If the database is unavailable it falls back to
+    this worker's in-memory buckets.
+    """
+    
+    def _counts(self, key, index):
+        conn = get_db_connection()
+        if not conn:
+            return super()._counts(key, index)
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT window_index, attempts FROM login_rate_limits
+                WHERE bucket_key = %s AND window_index IN (%s, %s)
+            """, (f"{self.name}:{key}", index - 1, index))
+            counts = dict(cur.fetchall())
+            cur.close()
+            conn.commit()
+            conn.close()
+            return counts.get(index - 1, 0), counts.get(index, 0)
+        except Exception as e:
+            print(f"Rate limiter database error: {e}")
+            conn.rollback()
+            conn.close()
+            return super()._counts(key, index)
+    
+    def _increment(self, key, index):
+        conn = get_db_connection()
+        if not conn:
+            return super()._increment(key, index)
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                INSERT INTO login_rate_limits (bucket_key, window_index, attempts)
+                VALUES (%s, %s, 1)
+                ON CONFLICT (bucket_key, window_index) DO UPDATE SET attempts = login_rate_limits.attempts + 1
+            """, (f"{self.name}:{key}", index))
+            if random.random() < 0.01:
+                # Expired windows are cleaned up occasionally rather than on every attempt
+                cur.execute("DELETE FROM login_rate_limits WHERE bucket_key LIKE %s AND window_index < %s",
+                            (f"{self.name}:%", index - 1))
+            conn.commit()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            print(f"Rate limiter database error: {e}")
+            conn.rollback()
+            conn.close()
+            super()._increment(key, index)
+    
+    def _forget(self, key):
+        super()._forget(key)
+        conn = get_db_connection()
+        if not conn:
+            return
+        try:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM login_rate_limits WHERE bucket_key = %s", (f"{self.name}:{key}",))
+            conn.commit()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            print(f"Rate limiter database error: {e}")
+            conn.rollback()
+            conn.close()
+
+
+_limiter_class = PostgresSlidingWindowLimiter if LOGIN_LIMITER_BACKEND == 'postgres' else SlidingWindowLimiter
+login_ip_limiter = _limiter_class('login-ip', LOGIN_IP_LIMIT, LOGIN_IP_WINDOW)
+login_email_limiter = _limiter_class('login-email', LOGIN_EMAIL_FAILURE_LIMIT, LOGIN_EMAIL_WINDOW)
+
+
+def login_rate_limit_stats():
+    return {
+        'backend': LOGIN_LIMITER_BACKEND,
+        'ip': login_ip_limiter.stats(),
+        'email': login_email_limiter.stats()
+    }
+
+# ============================================
+# ROLE-BASED ACCESS CONTROL
+# ============================================
+
+# Department-based mapping
+DEPARTMENT_NEED_TYPES = {
+    'Educational Support': frozenset(['educational']),  # Education only
+    'Emergency Services': frozenset(['water', 'other']),  # Emergency Services
+    'Financial Assistance': frozenset(['financial']),  # Financial Assistance
+    'Infrastructure & Housing': frozenset(['shelter', 'clothing']),  # Infrastructure & Housing
+    'Social Services': frozenset(['food', 'medical', 'mental-health']),  # Social Services
+    'Relief Operations': frozenset(['food']),  # Foods & Nutrition
+    'Health and Medical Services': frozenset(['medical', 'mental-health'])  # Health and Medical Services
 }
-audit_logs = []  # Audit trail for system actions
-staff_db = []  # Government staff database
 
-# Load requests from database on startup
-def init_app():
-    """Initialize application by loading data from database"""
-    global requests_db
-    print("Loading requests from database...")
-    requests_db = load_requests_from_db()
-    print(f"Loaded {len(requests_db)} requests from database")
-def get_db_connection():
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="Need-baseGovernmentResponseSystem", 
-            user="postgres",
-            password="123"
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        print(f"Error: Unable to connect to the database. Check your credentials.")
-        print(e)
-        return None
+# Role-based mapping (fallback if department not found)
+ROLE_NEED_TYPES = {
+    'analyst': frozenset(['educational']),  # Education only
+    'coordinator': frozenset(['water', 'financial', 'other']),  # Emergency Services and Financial Assistance
+    'support': frozenset(['shelter', 'clothing']),  # Infrastructure & Housing
+    'officer': frozenset(['food', 'medical', 'mental-health'])  # Social Services, Relief Operations, Health and Medical Services
+}
+
+# Managers and admins have full access
+FULL_ACCESS_ROLES = frozenset(['manager', 'admin'])
+
+
+def get_allowed_need_types_for_role(role, department):
+    """
+    Map staff departments to the need types they can view and manage
+    
+    Args:
+        role (str): Staff role (analyst, coordinator, support, officer, manager, admin)
+        department (str): Staff department
+    
+    Returns:
+        frozenset: Allowed need types, or None for full access
+    """
+    if role in FULL_ACCESS_ROLES:
+        return None  # None means no filtering - can see all
+    
+    # Check department first, then fall back to role
+    if department in DEPARTMENT_NEED_TYPES:
+        return DEPARTMENT_NEED_TYPES[department]
+    
+    return ROLE_NEED_TYPES.get((role or '').lower(), None)
+
+
+def filter_requests_by_need_types(store, allowed_types):
+    """
+    Filter requests to the need types a staff member can access
+    
+    Args:
+        store (RequestStore): Request store to read from
+        allowed_types: Need types from get_session_allowed_need_types() (None means all)
+    
+    Returns:
+        list: Filtered requests that the staff member can access, in priority queue order
+    """
+    logger.debug("Filter: allowed types=%s", allowed_types)
+    
+    # Read the department's precomputed, already sorted view (None = full access)
+    filtered = store.view(allowed_types)
+    logger.debug("Filtered %d requests from %d total", len(filtered), len(store))
+    if logger.isEnabledFor(logging.DEBUG):
+        for req in filtered:
+            logger.debug("  - %s: %s", req.get('id'), req.get('needType'))
+    
+    return filtered
+
+
+def calculate_avg_response_time(need_types=None):
+    """
+    Calculate average response time for completed requests
+    
+    Args:
+        need_types (set): Need types to include, or None for all requests
+    
+    Returns:
+        float: Average time from submission to completion in hours
+    """
+    mean = response_analytics.latency(need_types).mean()
+    if mean is None:
+        return 0
+    
+    return round(mean / 3600, 1)
+
 
 # ============================================
-# DATABASE HELPER FUNCTIONS FOR REQUESTS
+# STAFF PRINCIPAL CACHE
 # ============================================
 
-def load_requests_from_db():
-    """Load all requests from database into memory"""
+STAFF_CACHE_TTL = float(os.getenv('STAFF_CACHE_TTL', 60))  # Seconds a cached staff lookup stays valid
+STAFF_CACHE_MAX_SIZE = int(os.getenv('STAFF_CACHE_MAX_SIZE', 10000))
+STAFF_CHANNEL = 'staff_changes'  # NOTIFY payload: a staff email, or '*' for everyone
+
+
+class StaffPrincipal:
+    """What login and authorization need to know about a staff member"""
+    
+    __slots__ = ('staff_id', 'email', 'full_name', 'department', 'role', 'status',
+                 'permissions', 'password_hash', 'allowed_need_types')
+    
+    def __init__(self, staff_id, email, full_name, department, role, status, permissions, password_hash):
+        self.staff_id = staff_id
+        self.email = email
+        self.full_name = full_name
+        self.department = department
+        self.role = role or 'officer'
+        self.status = status
+        self.permissions = permissions or {}
+        self.password_hash = password_hash
+        # Precomputed once per cache fill instead of on every permission check
+        self.allowed_need_types = get_allowed_need_types_for_role(self.role, department)
+    
+    @property
+    def is_active(self):
+        return self.status == 'active'
+
+
+STAFF_PRINCIPAL_QUERY = """
+    SELECT staff_id, email, full_name, department, role, status, permissions, password_hash
+    FROM staff
+    WHERE email = %s
+"""
+
+STAFF_LIST_QUERY = """
+    SELECT staff_id, full_name, email, phone, official_id, department, 
+           role, employee_id, status, joined_date, requests_handled, 
+           permissions, added_by, added_date
+    FROM staff 
+    ORDER BY added_date DESC
+"""
+
+
+def staff_row_to_dict(row):
+    """Convert a STAFF_LIST_QUERY row to the staff dict used by the admin API"""
+    return {
+        'id': row[0],
+        'fullName': row[1],
+        'email': row[2],
+        'phone': row[3],
+        'officialId': row[4],
+        'department': row[5],
+        'role': row[6],
+        'employeeId': row[7],
+        'status': row[8],
+        'joinedDate': row[9].isoformat() if row[9] else None,
+        'requestsHandled': row[10] or 0,
+        'permissions': row[11] or {},
+        'addedBy': row[12],
+        'addedDate': row[13].strftime('%m/%d/%Y') if row[13] else None
+    }
+
+
+def load_staff_principal_from_db(email):
+    """
+    Returns:
+        tuple: (found, principal); found is None when the database is unavailable
+    """
     conn = get_db_connection()
     if not conn:
-        return []
+        return None, None
     
     try:
         cur = conn.cursor()
-        cur.execute("""
-            SELECT request_id, citizen_name, email, phone, location_address,
-                   need_type, severity, people_affected, description,
-                   vulnerability_group, special_circumstances, is_student,
-                   educational_needs, has_evidence, status, submitted_at,
-                   updated_at, completed_at, priority_score, 
-                   estimated_response_time, assigned_to
-            FROM requests
-            ORDER BY submitted_at DESC
-        """)
-        
-        rows = cur.fetchall()
-        requests_list = []
-        
-        for row in rows:
-            requests_list.append({
-                'id': row[0],
-                'citizenName': row[1],
-                'email': row[2],
-                'phone': row[3],
-                'location': row[4],
-                'needType': row[5],
-                'severity': row[6],
-                'peopleAffected': row[7],
-                'description': row[8],
-                'vulnerabilityGroup': row[9] if row[9] else [],
-                'specialCircumstances': row[10],
-                'isStudent': row[11],
-                'studentInfo': row[12] if row[12] else {},
-                'hasEvidence': row[13],
-                'status': row[14],
-                'submittedAt': row[15].isoformat() if row[15] else None,
-                'updatedAt': row[16].isoformat() if row[16] else None,
-                'completedAt': row[17].isoformat() if row[17] else None,
-                'priorityScore': row[18],
-                'estimatedResponse': row[19],
-                'assignedTo': row[20]
-            })
-        
+        cur.execute(STAFF_PRINCIPAL_QUERY, (email,))
+        row = cur.fetchone()
         cur.close()
         conn.close()
-        return requests_list
+        return (True, StaffPrincipal(*row)) if row else (False, None)
     except Exception as e:
-        print(f"Error loading requests from database: {e}")
-        if conn:
-            conn.close()
-        return []
+        print(f"Database error loading staff principal: {e}")
+        conn.rollback()
+        conn.close()
+        return None, None
 
-def save_request_to_db(request_data):
-    """Save a single request to database"""
+def load_staff_list_from_db():
+    """All staff, newest first, or None when the database is unavailable"""
     conn = get_db_connection()
     if not conn:
-        return False
+        return None
     
     try:
         cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO requests (
-                request_id, citizen_name, email, phone, location_address,
-                need_type, severity, people_affected, description,
-                vulnerability_group, special_circumstances, is_student,
-                educational_needs, has_evidence, status, priority_score,
-                estimated_response_time, submitted_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            request_data['id'],
-            request_data['citizenName'],
-            request_data['email'],
-            request_data.get('phone'),
-            request_data.get('location'),
-            request_data['needType'],
-            request_data['severity'],
-            request_data.get('peopleAffected', 1),
-            request_data['description'],
-            json.dumps(request_data.get('vulnerabilityGroup', [])),
-            request_data.get('specialCircumstances'),
-            request_data.get('isStudent', False),
-            json.dumps(request_data.get('studentInfo', {})),
-            request_data.get('hasEvidence', False),
-            request_data.get('status', 'pending'),
-            request_data.get('priorityScore', 0),
-            request_data.get('estimatedResponse'),
-            datetime.now()
-        ))
-        
-        conn.commit()
+        cur.execute(STAFF_LIST_QUERY)
+        staff_list = [staff_row_to_dict(row) for row in cur.fetchall()]
         cur.close()
         conn.close()
-        return True
+        return staff_list
     except Exception as e:
-        print(f"Error saving request to database: {e}")
-        if conn:
-            conn.rollback()
-            conn.close()
-        return False
+        print(f"Database error: {e}")
+        conn.rollback()
+        conn.close()
+        return None
+
+
+class StaffPrincipalCache:
+    """
+    Per-worker cache of staff principals by email, plus the admin staff list.
+    
+    Entries expire after STAFF_CACHE_TTL and are dropped immediately by
+    invalidate(). notify_staff_changed() also broadcasts the invalidation on
+    STAFF_CHANNEL so other workers drop their copy. Unknown emails are cached
+    too (as None), so repeated logins for a non-staff address do not hit the
+    database. Lookups made while the database is down are not cached.
+    The event listener that delivers invalidations is started once, when
+    the first entry is cached.
+    """
+    
+    def __init__(self, ttl=STAFF_CACHE_TTL, max_size=STAFF_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # email -> (expires_at, principal or None)
+        self._staff_list = None  # (expires_at, list)
+        self._metrics = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._listening = False
+    
+    def _listen_for_invalidations(self):
+        # Nothing can go stale before the first entry, so the listener starts then
+        if not self._listening:
+            get_event_broker().ensure_listener()
+            self._listening = True
+    
+    def get(self, email):
+        """The StaffPrincipal for email, or None if there is no such staff member"""
+        hit, principal = self.lookup(email)
+        if hit:
+            return principal
+        
+        found, principal = load_staff_principal_from_db(email)
+        if found is None:
+            return None
+        self.put(email, principal)
+        return principal
+    
+    def lookup(self, email):
+        """
+        Cache-only lookup (no database access)
+        
+        Returns:
+            tuple: (hit, principal)
+        """
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(email)
+                self._metrics['hits'] += 1
+                return True, entry[1]
+            self._metrics['misses'] += 1
+            return False, None
+    
+    def put(self, email, principal):
+        """Cache a principal (None for an unknown email) loaded from the database"""
+        self._listen_for_invalidations()
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def staff_list(self):
+        """All staff rows (see load_staff_list_from_db), or None when the database is unavailable"""
+        staff_list = self.cached_staff_list()
+        if staff_list is not None:
+            return staff_list
+        
+        staff_list = load_staff_list_from_db()
+        if staff_list is not None:
+            self.put_staff_list(staff_list)
+        return staff_list
+    
+    def cached_staff_list(self):
+        """The cached staff list, or None on a miss (no database access)"""
+        with self._lock:
+            if self._staff_list is not None and self._staff_list[0] > time.monotonic():
+                self._metrics['hits'] += 1
+                return self._staff_list[1]
+            self._metrics['misses'] += 1
+            return None
+    
+    def put_staff_list(self, staff_list):
+        self._listen_for_invalidations()
+        with self._lock:
+            self._staff_list = (time.monotonic() + self.ttl, staff_list)
+    
+    def invalidate(self, email=None):
+        """Drop one staff member (and the staff list), or everything when email is None"""
+        with self._lock:
+            self._metrics['invalidations'] += 1
+            self._staff_list = None
+            if email is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(email, None)
+    
+    def stats(self):
+        with self._lock:
+            return {**self._metrics, 'entries': len(self._entries)}
+
+
+staff_cache = StaffPrincipalCache()
+
 
-def update_request_status_in_db(request_id, new_status, assigned_to=None):
-    """Update request status in database"""
+def notify_staff_changed(email=None):
+    """Invalidate a staff member's cached principal in this and every other worker"""
+    staff_cache.invalidate(email)
     conn = get_db_connection()
     if not conn:
-        return False
-    
+        return
     try:
         cur = conn.cursor()
-        
-        if new_status == 'completed':
-            cur.execute("""
-                UPDATE requests 
-                SET status = %s, updated_at = %s, completed_at = %s, assigned_to = %s
-                WHERE request_id = %s
-            """, (new_status, datetime.now(), datetime.now(), assigned_to, request_id))
-        else:
-            cur.execute("""
-                UPDATE requests 
-                SET status = %s, updated_at = %s, assigned_to = %s
-                WHERE request_id = %s
-            """, (new_status, datetime.now(), assigned_to, request_id))
-        
+        cur.execute("SELECT pg_notify(%s, %s)", (STAFF_CHANNEL, email or '*'))
         conn.commit()
         cur.close()
         conn.close()
-        return True
     except Exception as e:
-        print(f"Error updating request status: {e}")
-        if conn:
-            conn.rollback()
-            conn.close()
-        return False
+        print(f"Error broadcasting staff change: {e}")
+        conn.rollback()
+        conn.close()
 
-# ============================================
-# PASSWORD HASHING FUNCTIONS (BCRYPT)
-# ============================================
 
-def hash_password(password):
+def _on_staff_notify(payload):
+    # None: the listener (re)connected and may have missed invalidations
+    staff_cache.invalidate(None if payload in (None, '*') else payload)
+
+NOTIFY_HANDLERS[STAFF_CHANNEL] = _on_staff_notify
+
+
+def get_session_allowed_need_types():
     """
-    Hash a password using bcrypt
-    Args:
-        password (str): Plain text password
-    Returns:
-        str: Hashed password
+    Need types the logged-in government user may see and manage
+    
+    Uses the cached staff principal, so a role or department change (or a
+    deactivation) applies to existing sessions; falls back to the values
+    stored in the session for accounts that are not in the staff table.
     """
-    # Generate salt and hash password
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    principal = staff_cache.get(session.get('user_email'))
+    if principal is not None:
+        return principal.allowed_need_types if principal.is_active else frozenset()
+    return get_allowed_need_types_for_role(
+        session.get('user_position', 'officer'),
+        session.get('user_department', '')
+    )
 
-def verify_password(plain_password, hashed_password):
+# ============================================
+# DASHBOARD ROLLUPS (POSTGRESQL AGGREGATES)
+# ============================================
+
+DASHBOARD_ROLLUP_TTL = float(os.getenv('DASHBOARD_ROLLUP_TTL', 10))  # Seconds between refreshes
+DASHBOARD_ROLLUP_MAX_AGE = DASHBOARD_ROLLUP_TTL * 6  # Older snapshots are not served
+
+
+class DashboardRollup:
     """
-    Verify a password against its hash
-    Args:
-        plain_password (str): Plain text password to verify
-        hashed_password (str): Hashed password from database
-    Returns:
-        bool: True if password matches, False otherwise
+    Dashboard counters read from PostgreSQL rollups and cached per worker.
+    
+    A background thread refreshes the request_rollup materialized view
+    (REFRESH ... CONCURRENTLY, so readers are never blocked) at most once per
+    DASHBOARD_ROLLUP_TTL across all workers, coordinated through an advisory
+    lock and the rollup_refreshes table, then reads it together with the
+    staff_performance view. Request handlers only read the cached snapshot,
+    so stats cost O(need types) however large the tables are, and every
+    worker reports the same numbers. Without a fresh snapshot (no database)
+    counters() and staff_summary() return None and callers use the
+    in-memory counters instead.
     """
-    try:
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
-    except Exception as e:
-        print(f"Password verification error: {e}")
-        return False
+    
+    def __init__(self, ttl=DASHBOARD_ROLLUP_TTL):
+        self.pid = os.getpid()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters = None  # needType -> Counter
+        self._staff = None
+        self._loaded_at = 0
+        self._metrics = {'refreshes': 0, 'viewRefreshes': 0, 'errors': 0}
+        self._thread = threading.Thread(target=self._run, name='dashboard-rollup', daemon=True)
+        self._thread.start()
+    
+    def _fresh(self):
+        return self._counters is not None and time.monotonic() - self._loaded_at < DASHBOARD_ROLLUP_MAX_AGE
+    
+    def counters(self, need_types=None):
+        """Summed counters (same keys as counter_keys) for need_types (None = all), or None"""
+        with self._lock:
+            if not self._fresh():
+                return None
+            if need_types is None:
+                need_types = self._counters.keys()
+            total = Counter()
+            for need_type in need_types:
+                total.update(self._counters.get(need_type, {}))
+            return total
+    
+    def staff_summary(self):
+        """{'total', 'active', 'byDepartment'} from staff_performance, or None"""
+        with self._lock:
+            return self._staff if self._fresh() else None
+    
+    def _run(self):
+        while True:
+            self.refresh()
+            time.sleep(self.ttl)
+    
+    def refresh(self):
+        conn = get_db_connection()
+        if not conn:
+            return
+        
+        try:
+            cur = conn.cursor()
+            
+            # One worker refreshes the materialized view per TTL; the rest just read it
+            cur.execute("SELECT pg_try_advisory_xact_lock(hashtext('request_rollup'))")
+            if cur.fetchone()[0]:
+                cur.execute("""
+                    SELECT refreshed_at < clock_timestamp() - make_interval(secs => %s)
+                    FROM rollup_refreshes WHERE view_name = 'request_rollup'
+                """, (self.ttl,))
+                row = cur.fetchone()
+                if row is None or row[0]:
+                    cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY request_rollup")
+                    cur.execute("""
+                        INSERT INTO rollup_refreshes (view_name, refreshed_at)
+                        VALUES ('request_rollup', clock_timestamp())
+                        ON CONFLICT (view_name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+                    """)
+                    self._metrics['viewRefreshes'] += 1
+            conn.commit()
+            
+            cur.execute("""
+                SELECT need_type, status, severity, requests, students, student_group
+                FROM request_rollup
+            """)
+            counters = {}
+            for need_type, status, severity, requests, students, student_group in cur.fetchall():
+                counter = counters.setdefault(need_type, Counter())
+                counter['total'] += requests
+                counter[f"status:{status}"] += requests
+                counter[f"severity:{severity}"] += requests
+                counter['student'] += students
+                counter['studentGroup'] += student_group
+            
+            cur.execute("""
+                SELECT department, status, COUNT(*)
+                FROM staff_performance
+                GROUP BY department, status
+            """)
+            staff = {'total': 0, 'active': 0, 'byDepartment': {}}
+            for department, status, count in cur.fetchall():
+                staff['total'] += count
+                if status == 'active':
+                    staff['active'] += count
+                staff['byDepartment'][department] = staff['byDepartment'].get(department, 0) + count
+            
+            conn.commit()
+            cur.close()
+            
+            with self._lock:
+                self._counters = counters
+                self._staff = staff
+                self._loaded_at = time.monotonic()
+            self._metrics['refreshes'] += 1
+        except Exception as e:
+            print(f"Error refreshing dashboard rollup: {e}")
+            self._metrics['errors'] += 1
+            conn.rollback()
+        finally:
+            conn.close()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                **self._metrics,
+                'pid': self.pid,
+                'fresh': self._fresh(),
+                'ageSeconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+            }
+
+
+_dashboard_rollup = None
+_dashboard_rollup_lock = threading.Lock()
+
+
+def get_dashboard_rollup():
+    """Return this process's DashboardRollup, starting its refresh thread on first use"""
+    global _dashboard_rollup
+    with _dashboard_rollup_lock:
+        if _dashboard_rollup is None or _dashboard_rollup.pid != os.getpid():
+            _dashboard_rollup = DashboardRollup()
+        return _dashboard_rollup
+
+
+def get_request_counters(need_types=None):
+    """Dashboard counters from the shared rollup, or this worker's store when it is unavailable"""
+    counts = get_dashboard_rollup().counters(need_types)
+    if counts is None:
+        counts = requests_db.counters(need_types)
+    return counts
 
 # ============================================
-# ROLE-BASED ACCESS CONTROL
+# RESPONSE TIME ANALYTICS
 # ============================================
 
-def get_allowed_need_types_for_role(role, department):
+RESPONSE_TIMES_CHANNEL = 'response_times'
+LATENCY_SKETCH_ACCURACY = 0.02  # Relative error of reported quantiles
+RESPONSE_TREND_BUCKET_SECONDS = int(os.getenv('RESPONSE_TREND_BUCKET_SECONDS', 86400))  # One point per day
+RESPONSE_TREND_BUCKETS = int(os.getenv('RESPONSE_TREND_BUCKETS', 7))  # Points returned per series
+RESPONSE_DIMENSIONS = ('needType', 'severity', 'department')
+
+# Trend series name per recorded event kind
+TREND_SERIES = {
+    'submitted': 'pending_trend',
+    'in-progress': 'in_progress_trend',
+    'completed': 'completed_trend'
+}
+
+_LATENCY_GAMMA = (1 + LATENCY_SKETCH_ACCURACY) / (1 - LATENCY_SKETCH_ACCURACY)
+_LOG_LATENCY_GAMMA = math.log(_LATENCY_GAMMA)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def latency_bucket(seconds):
+    """Sketch bucket of a latency; bucket i covers (GAMMA^(i-1), GAMMA^i] seconds"""
+    return math.ceil(math.log(max(seconds, 1.0)) / _LOG_LATENCY_GAMMA)
+
+
+def epoch_seconds(value):
+    """Seconds since the epoch of a naive timestamp (datetime or ISO string), as PostgreSQL's EXTRACT(EPOCH ...)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - _EPOCH).total_seconds()
+
+
+def current_trend_bucket():
+    """Trend bucket of the current time (timestamps are naive local time, like the stored ones)"""
+    return int(epoch_seconds(datetime.now()) // RESPONSE_TREND_BUCKET_SECONDS)
+
+
+class LatencySketch:
     """
-    Map staff departments to the need types they can view and manage
+    Mergeable streaming quantile sketch of latencies in seconds.
     
-    Args:
-        role (str): Staff role (analyst, coordinator, support, officer, manager, admin)
-        department (str): Staff department
+    Values are counted in logarithmic buckets (see latency_bucket), so any
+    quantile is within LATENCY_SKETCH_ACCURACY of the true value while a few
+    hundred buckets cover everything from seconds to years. Adding a value
+    is O(1) and sketches merge by adding bucket counts, so per-dimension
+    sketches can be combined for any set of need types.
+    """
     
-    Returns:
-        list: List of allowed need types, or None for full access
-    """
-    # Department-based mapping
-    department_mapping = {
-        'Educational Support': ['educational'],  # Education only
-        'Emergency Services': ['water', 'other'],  # Emergency Services
-        'Financial Assistance': ['financial'],  # Financial Assistance
-        'Infrastructure & Housing': ['shelter', 'clothing'],  # Infrastructure & Housing
-        'Social Services': ['food', 'medical', 'mental-health'],  # Social Services
-        'Relief Operations': ['food'],  # Foods & Nutrition
-        'Health and Medical Services': ['medical', 'mental-health']  # Health and Medical Services
-    }
+    __slots__ = ('buckets', 'count', 'total')
     
-    # Role-based mapping (fallback if department not found)
-    role_mapping = {
-        'analyst': ['educational'],  # Education only
-        'coordinator': ['water', 'financial', 'other'],  # Emergency Services and Financial Assistance
-        'support': ['shelter', 'clothing'],  # Infrastructure & Housing
-        'officer': ['food', 'medical', 'mental-health']  # Social Services, Relief Operations, Health and Medical Services
-    }
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
     
-    # Managers and admins have full access
-    if role in ['manager', 'admin']:
-        return None  # None means no filtering - can see all
+    def add(self, seconds, count=1, total=None):
+        self.buckets[latency_bucket(seconds)] += count
+        self.count += count
+        self.total += max(seconds, 0.0) * count if total is None else total
     
-    # Check department first, then fall back to role
-    if department in department_mapping:
-        return department_mapping[department]
+    def add_bucket(self, bucket, count, total):
+        self.buckets[bucket] += count
+        self.count += count
+        self.total += total
     
-    return role_mapping.get(role.lower(), None)
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+    
+    def mean(self):
+        return self.total / self.count if self.count else None
+    
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1) in seconds, or None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                return 2 * _LATENCY_GAMMA ** bucket / (_LATENCY_GAMMA + 1)
+    
+    def summary(self):
+        """Count plus mean and p50/p90/p99 completion time in hours"""
+        def hours(seconds):
+            return None if seconds is None else round(seconds / 3600, 1)
+        
+        return {
+            'count': self.count,
+            'meanHours': hours(self.mean()),
+            'p50Hours': hours(self.quantile(0.5)),
+            'p90Hours': hours(self.quantile(0.9)),
+            'p99Hours': hours(self.quantile(0.99))
+        }
 
 
-def filter_requests_by_role(requests, role, department):
+class ResponseTimeAnalytics:
     """
-    Filter requests based on staff role and department
-    
-    Args:
-        requests (list): List of all requests
-        role (str): Staff role
-        department (str): Staff department
+    Completion latency (completedAt - submittedAt) sketches and status trends.
     
-    Returns:
-        list: Filtered requests that the staff member can access
+    One LatencySketch is kept per needType, severity and completing
+    department, and the trend series count submissions, starts and
+    completions per RESPONSE_TREND_BUCKET_SECONDS bucket. Both are seeded at
+    startup with grouped queries (the sketch buckets are computed in SQL)
+    and then updated from status change events, so dashboards never rescan
+    request history. Events are broadcast on RESPONSE_TIMES_CHANNEL so every
+    worker applies every change.
     """
-    allowed_types = get_allowed_need_types_for_role(role, department)
     
-    print(f"DEBUG FILTER: Role={role}, Dept={department}, Allowed Types={allowed_types}")
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._overall = LatencySketch()
+        self._sketches = {}  # (dimension, value) -> LatencySketch
+        self._trends = {}  # bucket index -> Counter of event kinds
     
-    # If allowed_types is None, user has full access
-    if allowed_types is None:
-        print(f"DEBUG: Full access - returning all {len(requests)} requests")
-        return requests
+    def _sketch(self, sketches, dimension, value):
+        key = (dimension, value)
+        sketch = sketches.get(key)
+        if sketch is None:
+            sketch = sketches[key] = LatencySketch()
+        return sketch
     
-    # Filter requests by allowed need types
-    filtered = [req for req in requests if req.get('needType') in allowed_types]
-    print(f"DEBUG: Filtered {len(filtered)} requests from {len(requests)} total")
-    for req in filtered:
-        print(f"  - {req.get('id')}: {req.get('needType')}")
+    def _prune_trends(self, trends):
+        oldest = current_trend_bucket() - RESPONSE_TREND_BUCKETS
+        for bucket in [b for b in trends if b <= oldest]:
+            del trends[bucket]
     
-    return filtered
+    def apply(self, event):
+        """Apply a response time event (see record_response_event) to this worker's state"""
+        kind = event['kind']
+        with self._lock:
+            bucket = int(event['at'] // RESPONSE_TREND_BUCKET_SECONDS)
+            self._trends.setdefault(bucket, Counter())[kind] += event.get('count', 1)
+            self._prune_trends(self._trends)
+            
+            if kind == 'completed' and event.get('latency') is not None:
+                latency = event['latency']
+                self._overall.add(latency)
+                for dimension in RESPONSE_DIMENSIONS:
+                    self._sketch(self._sketches, dimension, event.get(dimension) or 'Unassigned').add(latency)
+    
+    def seed(self, latency_rows, trend_rows):
+        """
+        Replace all state with aggregated history
+        
+        Args:
+            latency_rows: (needType, severity, department, bucket, count, total seconds)
+            trend_rows: (kind, trend bucket, count)
+        """
+        overall = LatencySketch()
+        sketches = {}
+        for need_type, severity, department, bucket, count, total in latency_rows:
+            overall.add_bucket(bucket, count, total)
+            for dimension, value in zip(RESPONSE_DIMENSIONS, (need_type, severity, department)):
+                self._sketch(sketches, dimension, value or 'Unassigned').add_bucket(bucket, count, total)
+        
+        trends = {}
+        for kind, bucket, count in trend_rows:
+            trends.setdefault(bucket, Counter())[kind] += count
+        self._prune_trends(trends)
+        
+        with self._lock:
+            self._overall = overall
+            self._sketches = sketches
+            self._trends = trends
+    
+    def latency(self, need_types=None):
+        """Merged sketch for need_types (None = every request)"""
+        with self._lock:
+            if need_types is None:
+                merged = LatencySketch()
+                merged.merge(self._overall)
+                return merged
+            merged = LatencySketch()
+            for need_type in need_types:
+                sketch = self._sketches.get(('needType', need_type))
+                if sketch is not None:
+                    merged.merge(sketch)
+            return merged
+    
+    def breakdown(self):
+        """{dimension: {value: summary}} for every dimension, plus the overall summary"""
+        with self._lock:
+            result = {'overall': self._overall.summary()}
+            for dimension in RESPONSE_DIMENSIONS:
+                result[dimension] = {}
+            for (dimension, value), sketch in sorted(self._sketches.items()):
+                result[dimension][value] = sketch.summary()
+            return result
+    
+    def trends(self):
+        """Series of the last RESPONSE_TREND_BUCKETS buckets, oldest first"""
+        current = current_trend_bucket()
+        buckets = range(current - RESPONSE_TREND_BUCKETS + 1, current + 1)
+        with self._lock:
+            result = {
+                series: [self._trends.get(b, {}).get(kind, 0) for b in buckets]
+                for kind, series in TREND_SERIES.items()
+            }
+        result['bucketStarts'] = [
+            (_EPOCH + timedelta(seconds=b * RESPONSE_TREND_BUCKET_SECONDS)).isoformat() for b in buckets
+        ]
+        return result
+    
+    def seed_from_db(self):
+        """Seed from the database with grouped queries; returns False without a database"""
+        conn = get_db_connection()
+        if not conn:
+            return False
+        
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                WITH completed AS (
+                    SELECT r.need_type, r.severity, s.department,
+                           GREATEST(EXTRACT(EPOCH FROM r.completed_at - r.submitted_at), 0) AS seconds
+                    FROM requests r
+                    LEFT JOIN staff s ON s.staff_id = r.assigned_staff_id
+                    WHERE r.status = 'completed' AND r.completed_at IS NOT NULL
+                )
+                SELECT need_type, severity, department,
+                       CEIL(LN(GREATEST(seconds, 1)) / %s)::int AS bucket,
+                       COUNT(*), SUM(seconds)
+                FROM completed
+                GROUP BY need_type, severity, department, bucket
+            """, (_LOG_LATENCY_GAMMA,))
+            latency_rows = [(n, s, d, b, c, float(t)) for n, s, d, b, c, t in cur.fetchall()]
+            
+            # Requests have no started_at, so current in-progress rows count on their updated_at
+            since = _EPOCH + timedelta(
+                seconds=(current_trend_bucket() - RESPONSE_TREND_BUCKETS + 1) * RESPONSE_TREND_BUCKET_SECONDS
+            )
+            cur.execute("""
+                SELECT 'submitted', FLOOR(EXTRACT(EPOCH FROM submitted_at) / %(width)s)::bigint AS bucket, COUNT(*)
+                FROM requests WHERE submitted_at >= %(since)s GROUP BY bucket
+                UNION ALL
+                SELECT 'in-progress', FLOOR(EXTRACT(EPOCH FROM updated_at) / %(width)s)::bigint AS bucket, COUNT(*)
+                FROM requests WHERE status = 'in-progress' AND updated_at >= %(since)s GROUP BY bucket
+                UNION ALL
+                SELECT 'completed', FLOOR(EXTRACT(EPOCH FROM completed_at) / %(width)s)::bigint AS bucket, COUNT(*)
+                FROM requests WHERE completed_at >= %(since)s GROUP BY bucket
+            """, {'width': RESPONSE_TREND_BUCKET_SECONDS, 'since': since})
+            trend_rows = cur.fetchall()
+            
+            cur.close()
+            conn.commit()
+            self.seed(latency_rows, trend_rows)
+            return True
+        except Exception as e:
+            print(f"Error loading response time analytics: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+
+response_analytics = ResponseTimeAnalytics()
+
+
+RESPONSE_EVENTS_PER_NOTIFY = 40  # Keeps each NOTIFY payload well under PostgreSQL's 8000-byte limit
 
 
-def calculate_avg_response_time(requests):
+def response_event(kind, req, department=None, count=1):
+    """Response time event for one request (see record_response_event)"""
+    event = {
+        'kind': kind,
+        'at': epoch_seconds(datetime.now()),
+        'count': count,
+        'needType': req.get('needType'),
+        'severity': req.get('severity'),
+        'department': department
+    }
+    if kind == 'completed' and req.get('completedAt') and req.get('submittedAt'):
+        event['latency'] = epoch_seconds(req['completedAt']) - epoch_seconds(req['submittedAt'])
+    return event
+
+
+def record_response_event(kind, req, department=None, count=1):
     """
-    Calculate average response time for completed requests
+    Record a submission, start or completion in every worker's analytics
     
     Args:
-        requests (list): List of requests
+        kind (str): 'submitted', 'in-progress' or 'completed'
+        req (dict): The request, after the change
+        department (str): Department of the staff member who made the change
+        count (int): Number of requests the event stands for (bulk submissions)
+    """
+    broadcast_response_events([response_event(kind, req, department, count)])
+
+
+def record_response_events(kind, reqs, department=None):
+    """record_response_event for many requests, with one event per need type and severity where latency does not matter"""
+    if kind == 'completed':
+        events = [response_event(kind, req, department) for req in reqs]
+    else:
+        groups = Counter((req.get('needType'), req.get('severity')) for req in reqs)
+        events = [response_event(kind, {'needType': need_type, 'severity': severity}, department, count)
+                  for (need_type, severity), count in groups.items()]
+    broadcast_response_events(events)
+
+
+def broadcast_response_events(events):
+    """NOTIFY events to every worker (several per payload), or apply them locally without a database"""
+    broker = get_event_broker()
+    broker.ensure_listener()
+    conn = get_db_connection()
+    if conn:
+        try:
+            cur = conn.cursor()
+            for i in range(0, len(events), RESPONSE_EVENTS_PER_NOTIFY):
+                cur.execute("SELECT pg_notify(%s, %s)",
+                            (RESPONSE_TIMES_CHANNEL, json.dumps(events[i:i + RESPONSE_EVENTS_PER_NOTIFY])))
+            conn.commit()
+            cur.close()
+            conn.close()
+            # Our own listener applies them, unless it is (re)connecting
+            if broker.is_listening():
+                return
+        except Exception as e:
+            print(f"Error broadcasting response time event: {e}")
+            conn.rollback()
+            conn.close()
+    
+    for event in events:
+        response_analytics.apply(event)
+
+
+def _on_response_times_notify(payload):
+    if payload is None:
+        # The listener (re)connected and may have missed events: reload the aggregates
+        response_analytics.seed_from_db()
+        return
+    try:
+        events = json.loads(payload)
+        for event in events if isinstance(events, list) else [events]:
+            response_analytics.apply(event)
+    except (ValueError, KeyError, TypeError):
+        print(f"Ignoring malformed response time payload: {payload[:100]}")
+
+NOTIFY_HANDLERS[RESPONSE_TIMES_CHANNEL] = _on_response_times_notify
+
+# ============================================
+# BATCH PRIORITY RESCORING
+# ============================================
+
+# Workers reload the weights and rescore their in-memory requests when a new version is applied
+PRIORITY_WEIGHTS_CHANNEL = 'priority_weights'
+RESCORE_FETCH_SIZE = 50000  # Rows per round trip while reading requests to rescore
+
+
+def load_priority_weights_from_db():
+    """Latest weights version applied with rescore-requests, or None"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT weights FROM priority_weight_versions
+            ORDER BY version DESC
+            LIMIT 1
+        """)
+        row = cur.fetchone()
+        cur.close()
+        conn.commit()
+        return PriorityWeights.from_dict(row[0]) if row else None
+    except Exception as e:
+        print(f"Error loading priority weights: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+
+def rescore_requests_in_db(weights, statuses=ACTIVE_STATUSES, applied_by='system'):
+    """
+    Apply a weights version to every stored request in statuses
+    
+    Reads only the columns the formula needs, scores them with
+    score_priority_columns and writes the changed scores (and updated_at)
+    back with one UPDATE ... FROM unnest(). The weights version and an
+    outbox entry per changed request are recorded and workers are notified
+    in the same transaction.
     
     Returns:
-        int: Average response time in hours
+        dict: scanned and changed row counts and timings, or None without a database
     """
-    completed = [r for r in requests if r['status'] == 'completed']
-    if not completed:
-        return 0
+    conn = get_db_connection()
+    if not conn:
+        return None
     
-    # Mock calculation - in production, calculate from timestamp data
-    return 24  # 24 hours average
+    started = time.monotonic()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT version, weights FROM priority_weight_versions ORDER BY version DESC LIMIT 1")
+        row = cur.fetchone()
+        if row and (weights.version < row[0] or (weights.version == row[0] and row[1] != weights.to_dict())):
+            raise ValueError(f"Weights version {weights.version} is not newer than applied version {row[0]}")
+        cur.execute("""
+            INSERT INTO priority_weight_versions (version, weights, applied_by)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (version) DO NOTHING
+        """, (weights.version, json.dumps(weights.to_dict()), applied_by))
+        
+        reader = conn.cursor(name='rescore_requests')
+        reader.execute("""
+            SELECT request_id, priority_score, severity, vulnerability_group,
+                   COALESCE(people_affected, 1), need_type, has_evidence,
+                   COALESCE(special_circumstances, '') <> ''
+            FROM requests
+            WHERE status = ANY(%s)
+        """, (list(statuses),))
+        
+        columns = [[] for _ in range(8)]
+        while True:
+            rows = reader.fetchmany(RESCORE_FETCH_SIZE)
+            if not rows:
+                break
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+        reader.close()
+        ids, old_scores = columns[0], columns[1]
+        columns[3] = weights.vulnerability_bonuses(columns[3])
+        loaded = time.monotonic()
+        
+        scores = score_priority_columns(weights, *columns[2:])
+        changed = [(request_id, int(score)) for request_id, old, score in zip(ids, old_scores, scores) if old != score]
+        scored = time.monotonic()
+        
+        if changed:
+            changed_ids, changed_scores = zip(*changed)
+            cur.execute("""
+                UPDATE requests r
+                SET priority_score = v.score, updated_at = %s
+                FROM unnest(%s::varchar[], %s::int[]) AS v(request_id, score)
+                WHERE r.request_id = v.request_id
+            """, (datetime.now(), list(changed_ids), list(changed_scores)))
+            record_request_changes(cur, changed_ids, 'updated')
+        cur.execute("SELECT pg_notify(%s, %s)", (PRIORITY_WEIGHTS_CHANNEL, str(weights.version)))
+        conn.commit()
+        cur.close()
+        
+        return {
+            'version': weights.version,
+            'scanned': len(ids),
+            'changed': len(changed),
+            'loadSeconds': round(loaded - started, 3),
+            'scoreSeconds': round(scored - loaded, 3),
+            'updateSeconds': round(time.monotonic() - scored, 3)
+        }
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
 
+def _on_priority_weights_notify(payload):
+    # None: the listener (re)connected and may have missed a new version
+    weights = load_priority_weights_from_db()
+    previous = get_priority_weights()
+    if weights is None or weights.version == previous.version:
+        return
+    set_priority_weights(weights)
+    changed = requests_db.rescore(weights, ACTIVE_STATUSES,
+                                  rebuild=weights.aging_per_hour != previous.aging_per_hour,
+                                  updated_at=datetime.now().isoformat())
+    print(f"Applied priority weights version {weights.version} ({changed} requests rescored)")
+
+NOTIFY_HANDLERS[PRIORITY_WEIGHTS_CHANNEL] = _on_priority_weights_notify
 
 # ============================================
 # PRIORITY ALGORITHM
 # ============================================
 
-# Priority algorithm
-def calculate_priority_score(req):
-    """Calculate priority score for a relief request"""
-    score = 0
-    
+# Priority algorithm weights (version 2). Deployments override them with
+# PRIORITY_WEIGHTS_FILE; rescore-requests applies a new version to stored requests.
+DEFAULT_PRIORITY_WEIGHTS = {
+    'version': 2,
     # 1. Severity Score (0-40 points)
-    severity_scores = {
+    'severity': {
         'critical': 40,
         'urgent': 30,
         'moderate': 15,
         'low': 5
-    }
-    score += severity_scores.get(req['severity'], 0)
-    
+    },
     # 2. Vulnerability Multiplier (1.0-2.5x)
-    vulnerability_weights = {
+    'vulnerability': {
         'children': 0.4,
         'elderly': 0.3,
         'disabled': 0.4,
         'pregnant': 0.3,
         'student': 0.2,
         'none': 0
-    }
-    
-    vulnerability_bonus = sum(vulnerability_weights.get(group, 0) 
-                             for group in req.get('vulnerabilityGroup', []))
-    score *= (1 + vulnerability_bonus)
-    
+    },
     # 3. Number of People Affected (0-20 points)
-    people_score = min(req.get('peopleAffected', 1) * 2, 20)
-    score += people_score
-    
+    'peoplePerPerson': 2,
+    'peopleCap': 20,
     # 4. Need Type Priority
-    need_type_priority = {
+    'needType': {
         'medical': 10,
         'water': 8,
         'food': 7,
@@ -351,19 +4155,190 @@ def calculate_priority_score(req):
         'clothing': 3,
         'financial': 3,
         'other': 2
-    }
-    score += need_type_priority.get(req.get('needType'), 0)
+    },
+    # 5. Evidence Bonus (5 points)
+    'evidenceBonus': 5,
+    # 6. Special Circumstances (5 points)
+    'specialCircumstancesBonus': 5,
+    # 7. Aging: effective priority gained per hour of waiting (see queue_key)
+    'agingPerHour': 0.5
+}
+
+PRIORITY_WEIGHTS_FILE = os.getenv(
+    'PRIORITY_WEIGHTS_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'priority_weights.json')
+)
+
+
+class PriorityWeights:
+    """
+    One version of the priority formula's weights.
+    
+    The vulnerability bonus adds the weight of each group in the order the
+    request lists them, repeats included, exactly as the original formula
+    did. Both scorers take their bonuses from vulnerability_bonus, so they
+    perform the same floating point operations and round to the same scores.
+    """
+    
+    __slots__ = ('version', 'severity', 'vulnerability', 'people_per_person', 'people_cap',
+                 'need_type', 'evidence_bonus', 'special_bonus', 'aging_per_hour')
+    
+    def __init__(self, data):
+        self.version = int(data['version'])
+        self.severity = {str(k): v for k, v in data['severity'].items()}
+        self.vulnerability = {str(k): v for k, v in data['vulnerability'].items()}
+        self.people_per_person = data['peoplePerPerson']
+        self.people_cap = data['peopleCap']
+        self.need_type = {str(k): v for k, v in data['needType'].items()}
+        self.evidence_bonus = data['evidenceBonus']
+        self.special_bonus = data['specialCircumstancesBonus']
+        self.aging_per_hour = data.get('agingPerHour', 0)  # Versions before 2 had no aging
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Validate a weights config; raises ValueError if it is incomplete or malformed"""
+        try:
+            weights = cls(data)
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            raise ValueError(f"Invalid priority weights: {e!r}")
+        numbers = [weights.people_per_person, weights.people_cap, weights.evidence_bonus, weights.special_bonus,
+                   weights.aging_per_hour,
+                   *weights.severity.values(), *weights.vulnerability.values(), *weights.need_type.values()]
+        if not all(isinstance(n, (int, float)) and not isinstance(n, bool) for n in numbers):
+            raise ValueError('Invalid priority weights: every weight must be a number')
+        return weights
+    
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'severity': self.severity,
+            'vulnerability': self.vulnerability,
+            'peoplePerPerson': self.people_per_person,
+            'peopleCap': self.people_cap,
+            'needType': self.need_type,
+            'evidenceBonus': self.evidence_bonus,
+            'specialCircumstancesBonus': self.special_bonus,
+            'agingPerHour': self.aging_per_hour
+        }
+    
+    def vulnerability_bonus(self, groups):
+        return sum(self.vulnerability.get(group, 0) for group in groups or ())
+    
+    def vulnerability_bonuses(self, group_lists):
+        """vulnerability_bonus for each list, summing each distinct list once"""
+        cache = {}
+        bonuses = []
+        for groups in group_lists:
+            key = tuple(groups or ())
+            bonus = cache.get(key)
+            if bonus is None:
+                bonus = cache[key] = self.vulnerability_bonus(key)
+            bonuses.append(bonus)
+        return bonuses
+
+
+def load_priority_weights_file(path=PRIORITY_WEIGHTS_FILE):
+    """Weights from a JSON config file, or the built-in defaults if there is none"""
+    if not os.path.exists(path):
+        return PriorityWeights.from_dict(DEFAULT_PRIORITY_WEIGHTS)
+    with open(path, encoding='utf-8') as f:
+        return PriorityWeights.from_dict(json.load(f))
+
+
+_priority_weights = load_priority_weights_file()
+
+
+def get_priority_weights():
+    """Weights used for new requests in this worker"""
+    return _priority_weights
+
+
+def set_priority_weights(weights):
+    global _priority_weights
+    _priority_weights = weights
+
+
+def calculate_priority_score(req, weights=None):
+    """Calculate priority score for a relief request"""
+    weights = weights or get_priority_weights()
+    score = 0
+    
+    # 1. Severity Score (0-40 points)
+    score += weights.severity.get(req['severity'], 0)
+    
+    # 2. Vulnerability Multiplier (1.0-2.5x)
+    vulnerability_bonus = weights.vulnerability_bonus(req.get('vulnerabilityGroup') or [])
+    score *= (1 + vulnerability_bonus)
+    
+    # 3. Number of People Affected (0-20 points)
+    people_score = min(req.get('peopleAffected', 1) * weights.people_per_person, weights.people_cap)
+    score += people_score
+    
+    # 4. Need Type Priority
+    score += weights.need_type.get(req.get('needType'), 0)
     
     # 5. Evidence Bonus (5 points)
     if req.get('hasEvidence', False):
-        score += 5
+        score += weights.evidence_bonus
     
     # 6. Special Circumstances (5 points)
     if req.get('specialCircumstances'):
-        score += 5
+        score += weights.special_bonus
     
     return round(score)
 
+def score_priority_columns(weights, severities, bonuses, people, need_types, evidence, special):
+    """
+    Priority scores for columns of request fields (one list per field)
+    
+    Args:
+        severities, need_types: Strings
+        bonuses: Vulnerability bonuses (PriorityWeights.vulnerability_bonuses)
+        people: People affected
+        evidence, special: Booleans
+    
+    Returns:
+        A NumPy int array when NumPy is installed, else a list of ints
+    """
+    if np is None:
+        return [
+            round(weights.severity.get(s, 0) * (1 + b)
+                  + min(p * weights.people_per_person, weights.people_cap)
+                  + weights.need_type.get(n, 0)
+                  + (weights.evidence_bonus if e else 0)
+                  + (weights.special_bonus if c else 0))
+            for s, b, p, n, e, c in zip(severities, bonuses, people, need_types, evidence, special)
+        ]
+    
+    count = len(severities)
+    score = np.fromiter((weights.severity.get(s, 0) for s in severities), dtype=np.float64, count=count)
+    score *= 1 + np.asarray(bonuses, dtype=np.float64)
+    score += np.minimum(np.asarray(people, dtype=np.float64) * weights.people_per_person, weights.people_cap)
+    score += np.fromiter((weights.need_type.get(n, 0) for n in need_types), dtype=np.float64, count=count)
+    score += np.where(np.asarray(evidence, dtype=bool), weights.evidence_bonus, 0)
+    score += np.where(np.asarray(special, dtype=bool), weights.special_bonus, 0)
+    # rint rounds half to even, like round()
+    return np.rint(score).astype(np.int64)
+
+def calculate_priority_scores(reqs, weights=None):
+    """
+    Priority scores for a batch of requests, same results as calculate_priority_score
+    
+    The fields are gathered into columns and scored in one vectorized pass
+    (see score_priority_columns).
+    """
+    weights = weights or get_priority_weights()
+    scores = score_priority_columns(
+        weights,
+        [req['severity'] for req in reqs],
+        weights.vulnerability_bonuses(req.get('vulnerabilityGroup') for req in reqs),
+        [req.get('peopleAffected', 1) for req in reqs],
+        [req.get('needType') for req in reqs],
+        [req.get('hasEvidence', False) for req in reqs],
+        [bool(req.get('specialCircumstances')) for req in reqs]
+    )
+    return [int(score) for score in scores]
+
 def estimate_response_time(priority_score, queue_position):
     """Estimate response time based on priority and queue position"""
     if priority_score >= 80:
@@ -377,40 +4352,54 @@ def estimate_response_time(priority_score, queue_position):
         return f'Within {days} {"day" if days == 1 else "days"}'
 
 def log_audit_action(action_type, user_email, details, entity_type=None, entity_id=None):
-    """Log an audit trail entry"""
-    audit_entry = {
-        'id': f"AUDIT-{str(len(audit_logs) + 1).zfill(6)}",
+    """Log an audit trail entry (persisted to the database by the background audit writer)"""
+    audit_entry = build_audit_entry(action_type, user_email, details, entity_type, entity_id)
+    audit_logs.append(audit_entry)
+    get_audit_writer().submit(audit_entry)
+    return audit_entry
+
+def log_audit_actions(actions):
+    """
+    Log several audit entries at once, so the audit writer stores them in one batch
+    
+    Args:
+        actions (list): (action_type, user_email, details, entity_type, entity_id) tuples
+    """
+    audit_entries = [build_audit_entry(*action) for action in actions]
+    audit_logs.extend(audit_entries)
+    get_audit_writer().submit_many(audit_entries)
+    return audit_entries
+
+def build_audit_entry(action_type, user_email, details, entity_type=None, entity_id=None):
+    in_request = has_request_context()
+    audit_code = get_audit_writer().next_code()  # Unique across workers
+    return {
+        'id': audit_code,
+        'audit_code': audit_code,
         'timestamp': datetime.now().isoformat(),
         'action_type': action_type,  # e.g., 'CREATE', 'UPDATE', 'DELETE', 'LOGIN', 'STATUS_CHANGE'
-        'user_email': user_email,
-        'user_role': session.get('user_role', 'unknown'),
+        'user_email': user_email or 'anonymous',
+        'user_role': session.get('user_role', 'unknown') if in_request else 'system',
         'entity_type': entity_type,  # e.g., 'REQUEST', 'STAFF', 'CITIZEN'
         'entity_id': entity_id,
         'details': details,
-        'ip_address': request.remote_addr if request else None
+        'ip_address': request.remote_addr if in_request else None
     }
-    audit_logs.append(audit_entry)
-    return audit_entry
 
 def get_dashboard_stats():
-    """Calculate dashboard statistics"""
-    total_requests = len(requests_db)
-    pending = sum(1 for r in requests_db if r['status'] == 'pending')
-    in_progress = sum(1 for r in requests_db if r['status'] == 'in-progress')
-    completed = sum(1 for r in requests_db if r['status'] == 'completed')
-    critical_requests = sum(1 for r in requests_db if r['severity'] == 'critical')
-    student_requests = sum(1 for r in requests_db if r.get('isStudent', False))
+    """Calculate dashboard statistics from the cached rollup (or the request store's running counters)"""
+    counts = get_request_counters()
     
-    # Calculate average response time (mock value)
-    avg_response_time = 4.5
+    # Average time from submission to completion, from the response time sketches
+    avg_response_time = calculate_avg_response_time()
     
     return {
-        'totalRequests': total_requests,
-        'pending': pending,
-        'inProgress': in_progress,
-        'completed': completed,
-        'criticalRequests': critical_requests,
-        'studentRequests': student_requests,
+        'totalRequests': counts['total'],
+        'pending': counts['status:pending'],
+        'inProgress': counts['status:in-progress'],
+        'completed': counts['status:completed'],
+        'criticalRequests': counts['severity:critical'],
+        'studentRequests': counts['student'],
         'avgResponseTime': avg_response_time
     }
 
@@ -443,7 +4432,7 @@ def citizen_dashboard():
         return redirect(url_for('citizen_login'))
     
     user_email = session['user_email']
-    user_requests = [r for r in requests_db if r['email'] == user_email]
+    user_requests = get_requests_by_email(user_email)
     
     return render_template('citizen_dashboard.html', 
                          user_name=session.get('user_name', 'Citizen'),
@@ -464,6 +4453,8 @@ def government_login():
     """Government login page"""
     return render_template('government_login.html')
 
+GOVERNMENT_DASHBOARD_PAGE = 50  # Requests rendered with the page
+
 @app.route('/government/dashboard')
 def government_dashboard():
     """Government dashboard"""
@@ -474,29 +4465,21 @@ def government_dashboard():
     user_role = session.get('user_position', 'officer')  # Default to officer
     user_department = session.get('user_department', 'Relief Operations')
     
-    # Filter requests based on role
-    filtered_requests = filter_requests_by_role(
-        requests_db, 
-        user_role, 
-        user_department
-    )
-    
-    # Sort requests by priority
-    sorted_requests = sorted(filtered_requests, 
-                            key=lambda r: (0 if r['status'] == 'pending' 
-                                         else 1 if r['status'] == 'in-progress' 
-                                         else 2,
-                                         -r['priorityScore']))
+    # The first page of the department's view, already in priority order;
+    # the dashboard loads further pages from /api/requests
+    allowed_types = get_session_allowed_need_types()
+    sorted_requests = requests_db.view(allowed_types, 0, GOVERNMENT_DASHBOARD_PAGE)
     
-    # Calculate stats based on filtered requests only
+    # Calculate stats based on the department's need types only
+    counts = get_request_counters(allowed_types)
     stats = {
-        'totalRequests': len(filtered_requests),
-        'pending': len([r for r in filtered_requests if r['status'] == 'pending']),
-        'inProgress': len([r for r in filtered_requests if r['status'] == 'in-progress']),
-        'completed': len([r for r in filtered_requests if r['status'] == 'completed']),
-        'criticalRequests': len([r for r in filtered_requests if r['severity'] == 'critical']),
-        'studentRequests': len([r for r in filtered_requests if 'student' in r.get('vulnerabilityGroup', [])]),
-        'avgResponseTime': calculate_avg_response_time(filtered_requests)
+        'totalRequests': counts['total'],
+        'pending': counts['status:pending'],
+        'inProgress': counts['status:in-progress'],
+        'completed': counts['status:completed'],
+        'criticalRequests': counts['severity:critical'],
+        'studentRequests': counts['studentGroup'],
+        'avgResponseTime': calculate_avg_response_time(allowed_types)
     }
     
     return render_template('government_dashboard.html',
@@ -526,69 +4509,28 @@ def admin_dashboard():
     
     if conn:
         try:
-            cur = conn.cursor()
-            
-            # Get all staff from database
-            cur.execute("""
-                SELECT staff_id, full_name, email, phone, official_id, department, 
-                       role, employee_id, status, joined_date, requests_handled, 
-                       permissions, added_by, added_date
-                FROM staff 
-                ORDER BY added_date DESC
-            """)
-            staff_rows = cur.fetchall()
+            # Get all staff (cached); counts come from the rollup when it is loaded
+            staff_list = staff_cache.staff_list() or []
+            staff_summary = get_dashboard_rollup().staff_summary()
+            if staff_summary is not None:
+                total_staff = staff_summary['total']
+                active_staff = staff_summary['active']
+            else:
+                total_staff = len(staff_list)
+                active_staff = sum(1 for s in staff_list if s['status'] == 'active')
             
-            for row in staff_rows:
-                staff_list.append({
-                    'id': row[0],
-                    'fullName': row[1],
-                    'email': row[2],
-                    'phone': row[3],
-                    'officialId': row[4],
-                    'department': row[5],
-                    'role': row[6],
-                    'employeeId': row[7],
-                    'status': row[8],
-                    'joinedDate': row[9].isoformat() if row[9] else None,
-                    'requestsHandled': row[10] or 0,
-                    'permissions': row[11] or {},
-                    'addedBy': row[12],
-                    'addedDate': row[13].strftime('%m/%d/%Y') if row[13] else None
-                })
-            
-            # Get staff counts
-            cur.execute("SELECT COUNT(*) FROM staff")
-            total_staff = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM staff WHERE status = 'active'")
-            active_staff = cur.fetchone()[0]
+            cur = conn.cursor()
             
-            # Get recent audit logs
-            cur.execute("""
-                SELECT audit_code, timestamp, action_type, user_email, user_role,
-                       entity_type, entity_id, details, ip_address
-                FROM audit_logs
-                ORDER BY timestamp DESC
-                LIMIT 10
-            """)
-            audit_rows = cur.fetchall()
+            # Get recent audit logs (same query as the first page of the audit log listing)
+            query, params, count_queries = build_audit_logs_query(parse_audit_logs_args({'limit': 10}))
+            cur.execute(query, params)
+            audit_rows = cur.fetchall()[:10]
             
             for row in audit_rows:
-                recent_audits.append({
-                    'id': row[0],
-                    'timestamp': row[1].isoformat() if row[1] else None,
-                    'action_type': row[2],
-                    'user_email': row[3],
-                    'user_role': row[4],
-                    'entity_type': row[5],
-                    'entity_id': row[6],
-                    'details': row[7],
-                    'ip_address': row[8]
-                })
+                recent_audits.append(audit_row_to_dict(row))
             
-            # Get total audit count
-            cur.execute("SELECT COUNT(*) FROM audit_logs")
-            total_audits = cur.fetchone()[0]
+            # Get total audit count (estimated on large tables instead of a full scan)
+            total_audits, _ = count_audit_logs(cur, count_queries)
             
             cur.close()
         except Exception as e:
@@ -620,99 +4562,135 @@ def admin_dashboard():
                          stats=admin_stats)
 
 # API Routes
-@app.route('/api/login', methods=['POST'])
-def api_login():
-    """Handle login for both citizen, government, and admin users with password verification"""
-    data = request.json
-    role = data.get('role')  # 'citizen', 'government', or 'admin'
-    email = data.get('email')
-    password = data.get('password', '')
-    name = data.get('name', '')
-    department = data.get('department', '')
+class LoginAttempt:
+    """
+    The parts of a login around the password check.
     
-    # For demo purposes, if no password provided, allow login (backward compatibility)
-    # In production, you should ALWAYS require password verification
-    if password:
-        # Verify password based on role
-        authenticated = False
-        user_data = None
+    Shared by api_login and the ASGI login handler, which differ only in how
+    they wait for verify_password. Must be used inside a request context.
+    """
+    
+    def __init__(self, data):
+        self.role = data.get('role')  # 'citizen', 'government', or 'admin'
+        self.email = data.get('email')
+        self.password = data.get('password', '')
+        self.name = data.get('name', '')
+        self.department = data.get('department', '')
+        self.position = 'officer'  # Default
+        self.email_key = (self.email or '').strip().lower()
+    
+    def throttle(self):
+        """
+        Throttle before any bcrypt or database work: every attempt counts
+        against the client IP, failed ones against the account
+        
+        Returns:
+            Response|None: A 429 response if the attempt is rejected
+        """
+        retry_after = max(login_ip_limiter.retry_after(request.remote_addr),
+                          login_email_limiter.retry_after(self.email_key))
+        if retry_after:
+            response = jsonify({'success': False, 'error': 'Too many login attempts, try again later'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        login_ip_limiter.hit(request.remote_addr)
+        return None
+    
+    def candidates(self):
+        """
+        Accounts the password may match, in the order they are tried
+        
+        Returns:
+            list: (password_hash, profile, save_hash) tuples; profile overrides
+            name/department/position on success, save_hash(new_hash) stores a
+            re-hashed password
+        """
+        email = self.email
+        candidates = []
         
-        if role == 'citizen':
+        if self.role == 'citizen':
             # Check citizens in users_db
-            if email in users_db.get('citizens', {}):
-                stored_hash = users_db['citizens'][email].get('password_hash')
-                if stored_hash and verify_password(password, stored_hash):
-                    authenticated = True
-                    user_data = users_db['citizens'][email]
-                    name = user_data.get('name', name)
-        
-        elif role == 'government':
-            # Initialize user_position
-            user_position = 'officer'  # Default
-            
-            # Check government users in database (staff table)
-            conn = get_db_connection()
-            if conn:
-                try:
-                    cur = conn.cursor()
-                    cur.execute("""
-                        SELECT full_name, department, role, password_hash 
-                        FROM staff 
-                        WHERE email = %s AND status = 'active'
-                    """, (email,))
-                    staff_record = cur.fetchone()
-                    
-                    if staff_record and staff_record[3]:
-                        if verify_password(password, staff_record[3]):
-                            authenticated = True
-                            name = staff_record[0]
-                            department = staff_record[1]
-                            user_position = staff_record[2] if staff_record[2] else 'officer'  # Get the role from database
-                            print(f"DEBUG: Login successful - Name: {name}, Dept: {department}, Role: {user_position}")
-                    
-                    cur.close()
-                    conn.close()
-                except Exception as e:
-                    print(f"Database error during login: {e}")
-                    if conn:
-                        conn.close()
+            user_data = users_db.get('citizens', {}).get(email)
+            if user_data:
+                candidates.append((user_data.get('password_hash'),
+                                   {key: user_data[key] for key in ('name',) if key in user_data},
+                                   lambda new_hash: user_data.__setitem__('password_hash', new_hash)))
+        
+        elif self.role == 'government':
+            # Check government users in database (staff table, through the principal cache)
+            principal = staff_cache.get(email)
+            if principal and principal.is_active and principal.password_hash:
+                candidates.append((principal.password_hash,
+                                   {'name': principal.full_name, 'department': principal.department,
+                                    'position': principal.role},  # Get the role from database
+                                   lambda new_hash: update_staff_password_hash(email, new_hash)))
             
             # Fallback to in-memory users_db for backward compatibility
-            if not authenticated and email in users_db.get('government', {}):
-                stored_hash = users_db['government'][email].get('password_hash')
-                if stored_hash and verify_password(password, stored_hash):
-                    authenticated = True
-                    user_data = users_db['government'][email]
-                    name = user_data.get('name', name)
-                    department = user_data.get('department', department)
-                    user_position = user_data.get('role', 'officer')  # Default role
-        
-        elif role == 'admin':
+            user_data = users_db.get('government', {}).get(email)
+            if user_data:
+                candidates.append((user_data.get('password_hash'),
+                                   {**{key: user_data[key] for key in ('name', 'department') if key in user_data},
+                                    'position': user_data.get('role', 'officer')},  # Default role
+                                   lambda new_hash: user_data.__setitem__('password_hash', new_hash)))
+        
+        elif self.role == 'admin':
             # Check admin users in staff_db or dedicated admin list
             admin_user = next((u for u in staff_db if u.get('email') == email and u.get('role') == 'admin'), None)
             if admin_user:
-                stored_hash = admin_user.get('password_hash')
-                if stored_hash and verify_password(password, stored_hash):
-                    authenticated = True
-                    user_data = admin_user
-                    name = admin_user.get('name', name)
+                candidates.append((admin_user.get('password_hash'),
+                                   {key: admin_user[key] for key in ('name',) if key in admin_user},
+                                   lambda new_hash: admin_user.__setitem__('password_hash', new_hash)))
+        
+        return [candidate for candidate in candidates if candidate[0]]
+    
+    def succeed(self, candidate=None):
+        """Log the user in, with the profile of the matched candidate (None in demo mode)"""
+        if candidate is not None:
+            password_hash, profile, save_hash = candidate
+            rehash_password_if_needed(self.password, password_hash, save_hash)
+            self.name = profile.get('name', self.name)
+            self.department = profile.get('department', self.department)
+            self.position = profile.get('position', self.position)
+            logger.debug("Login successful - name=%s dept=%s role=%s", self.name, self.department, self.position)
+            login_email_limiter.reset(self.email_key)
+        
+        # Set session data
+        session['user_email'] = self.email
+        session['user_name'] = self.name
+        session['user_role'] = self.role
+        if self.role == 'government' or self.role == 'admin':
+            session['user_department'] = self.department
+            session['user_position'] = self.position  # Store the position/role
         
-        if not authenticated:
-            log_audit_action('LOGIN_FAILED', email, f'Failed login attempt for {role}', 'USER', email)
-            return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
+        # Log the successful login
+        log_audit_action('LOGIN', self.email, f'{self.role.capitalize()} user logged in successfully')
+        
+        return jsonify({'success': True, 'role': self.role, 'name': self.name})
     
-    # Set session data
-    session['user_email'] = email
-    session['user_name'] = name
-    session['user_role'] = role
-    if role == 'government' or role == 'admin':
-        session['user_department'] = department
-        session['user_position'] = user_position if 'user_position' in locals() else 'officer'  # Store the position/role
+    def fail(self):
+        login_email_limiter.hit(self.email_key)
+        log_audit_action('LOGIN_FAILED', self.email, f'Failed login attempt for {self.role}', 'USER', self.email)
+        return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
+
+
+@app.route('/api/login', methods=['POST'])
+def api_login():
+    """Handle login for both citizen, government, and admin users with password verification"""
+    attempt = LoginAttempt(request.json)
+    throttled = attempt.throttle()
+    if throttled:
+        return throttled
     
-    # Log the successful login
-    log_audit_action('LOGIN', email, f'{role.capitalize()} user logged in successfully')
+    # For demo purposes, if no password provided, allow login (backward compatibility)
+    # In production, you should ALWAYS require password verification
+    if not attempt.password:
+        return attempt.succeed()
     
-    return jsonify({'success': True, 'role': role, 'name': name})
+    for candidate in attempt.candidates():
+        if verify_password(attempt.password, candidate[0]):
+            return attempt.succeed(candidate)
+    return attempt.fail()
 
 @app.route('/api/logout', methods=['POST'])
 def api_logout():
@@ -856,30 +4834,163 @@ def api_change_password():
 
 @app.route('/api/requests', methods=['GET'])
 def api_get_requests():
-    """Get all requests or filtered by user email or role-based access"""
+    """
+    Get all requests or filtered by user email or role-based access
+    
+    Passing limit or cursor switches to keyset pagination: the response is
+    {'requests': [...], 'nextCursor': ..., 'hasMore': ...} ordered by
+    priority score, then submission time, newest first. Filters: status,
+    severity, needType, submitted_from, submitted_to.
+    """
     user_email = request.args.get('email')
     
+    if 'limit' in request.args or 'cursor' in request.args:
+        return api_get_requests_page(user_email)
+    
     # Check if this is a government user with role-based access
     if session.get('user_role') == 'government':
-        user_position = session.get('user_position', 'officer')
-        user_department = session.get('user_department', '')
-        
-        # Apply role-based filtering
-        filtered_requests = filter_requests_by_role(
-            requests_db,
-            user_position,
-            user_department
-        )
-        
+        # Current permissions from the cached staff principal, not the ones stored at login
+        filtered_requests = filter_requests_by_need_types(requests_db, get_session_allowed_need_types())
         return jsonify(filtered_requests)
     
     # For citizen users, filter by their email
     if user_email:
-        filtered_requests = [r for r in requests_db if r['email'] == user_email]
+        filtered_requests = get_requests_by_email(user_email)
         return jsonify(filtered_requests)
     
     # For admin users or others, return all requests
-    return jsonify(requests_db)
+    return jsonify(requests_db.all())
+
+def parse_requests_page_args(args):
+    """
+    Returns:
+        tuple: (filters, after, limit) for query_requests_page_from_db
+    
+    Raises:
+        ValueError: if a filter or the cursor is malformed
+    """
+    limit = min(max(int(args.get('limit', REQUESTS_PAGE_DEFAULT)), 1), REQUESTS_PAGE_MAX)
+    filters = parse_request_filters(args)
+    cursor = args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    return filters, after, limit
+
+def api_get_requests_page(user_email):
+    """Keyset-paginated, server-filtered variant of api_get_requests"""
+    try:
+        filters, after, limit = parse_requests_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # Same visibility rules as the unpaginated listing
+    allowed_types, email = get_request_visibility(user_email)
+    
+    page = query_requests_page_from_db(filters, allowed_types, email, after, limit)
+    if page is None:
+        page = query_requests_page_in_memory(requests_db, filters, allowed_types, email, after, limit)
+    return requests_page_response(page, limit)
+
+def requests_page_response(page, limit):
+    """Response for a page of up to limit + 1 requests"""
+    has_more = len(page) > limit
+    page = page[:limit]
+    return jsonify({
+        'success': True,
+        'requests': page,
+        'nextCursor': encode_cursor(page[-1]) if has_more else None,
+        'hasMore': has_more
+    })
+
+@app.route('/api/requests/changes', methods=['GET'])
+def api_get_request_changes():
+    """
+    Delta sync: requests created or modified after a watermark
+    
+    Without since, returns no changes and a starting watermark; take it
+    before the initial full load. Responses carry the watermark for the next
+    call, and hasMore when the caller should fetch again immediately.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', DELTA_SYNC_PAGE_DEFAULT)), 1), DELTA_SYNC_PAGE_MAX)
+        token = request.args.get('since')
+        since = decode_watermark(token) if token else None
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    allowed_types, email = get_request_visibility(request.args.get('email'))
+    
+    result = query_request_changes_from_db(since, allowed_types, email, limit)
+    if result is None:
+        result = query_request_changes_in_memory(requests_db, since, allowed_types, email, limit)
+    rows, safe_point = result
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    settled = [r for r in rows if (r.get('updatedAt') or '') <= safe_point]
+    
+    if has_more and len(settled) == len(rows):
+        # Page filled with settled rows; continue right after the last one
+        watermark = (rows[-1].get('updatedAt') or '', rows[-1]['id'])
+    else:
+        # Everything up to the safe point has been returned
+        watermark = max(since, (safe_point, '')) if since else (safe_point, '')
+        has_more = False
+    
+    return jsonify({
+        'success': True,
+        'changes': rows,
+        'watermark': encode_watermark(watermark),
+        'hasMore': has_more
+    })
+
+@app.route('/api/events/stream', methods=['GET'])
+def api_event_stream():
+    """
+    Server-sent events for request submissions and status changes
+    
+    Government users receive events for their department's need types,
+    citizens for their own requests and admins for everything. After
+    connecting or seeing a 'resync' event, clients should catch up through
+    /api/requests/changes.
+    """
+    role = session.get('user_role')
+    if not role:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+    
+    allowed_types = None
+    email = None
+    if role == 'government':
+        allowed_types, _ = get_request_visibility(None)
+    elif role == 'citizen':
+        email = session.get('user_email')
+    
+    broker = get_event_broker()
+    subscriber = broker.subscribe(allowed_types, email)
+    if subscriber is None:
+        return jsonify({'success': False, 'error': 'Too many live connections, fall back to polling'}), 503
+    
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    yield format_sse('resync', {})
+                try:
+                    event = subscriber.queue.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse('request', event, event.get('eventId'))
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+    })
 
 @app.route('/api/requests', methods=['POST'])
 def api_submit_request():
@@ -887,10 +4998,10 @@ def api_submit_request():
     data = request.json
     
     # Generate request ID
-    request_id = f"REQ-{str(len(requests_db) + 1).zfill(6)}"
+    request_id = request_ids.next_id()
     
     # Create request object
-    new_request = {
+    new_request = RequestRecord.from_dict({
         'id': request_id,
         'citizenName': data.get('citizenName'),
         'email': data.get('email'),
@@ -910,29 +5021,20 @@ def api_submit_request():
         'updatedAt': datetime.now().isoformat(),
         'verificationCount': 0,
         'priorityScore': 0
-    }
+    })
     
     # Calculate priority score
     new_request['priorityScore'] = calculate_priority_score(new_request)
     
-    # Add to in-memory database
-    requests_db.append(new_request)
-    
-    # Save to PostgreSQL database
+    # Write through: PostgreSQL first, then this worker's store (other workers follow the outbox)
     try:
         save_request_to_db(new_request)
-    except Exception as e:
-        print(f"Error saving request to database: {e}")
-        # Continue with in-memory - don't fail the request
-    
-    # Sort all requests by priority
-    requests_db.sort(key=lambda r: (0 if r['status'] == 'pending' 
-                                   else 1 if r['status'] == 'in-progress' 
-                                   else 2,
-                                   -r['priorityScore']))
+    except Exception:
+        return jsonify({'success': False, 'error': 'Could not save the request, please try again'}), 503
+    requests_db.add(new_request)
     
     # Calculate estimated response time
-    queue_position = [r['id'] for r in requests_db if r['status'] == 'pending'].index(request_id) + 1
+    queue_position = requests_db.queue_position(request_id)
     new_request['estimatedResponseTime'] = estimate_response_time(
         new_request['priorityScore'], 
         queue_position
@@ -943,63 +5045,186 @@ def api_submit_request():
                     f"New {data.get('needType')} request submitted - {data.get('severity')} severity",
                     'REQUEST', request_id)
     
+    # Count the submission in the trends
+    record_response_event('submitted', new_request)
+    
+    # Push to live dashboards
+    publish_request_event('submitted', new_request)
+    
     return jsonify({'success': True, 'request': new_request})
 
+@app.route('/api/requests/bulk', methods=['POST'])
+def api_bulk_submit_requests():
+    """
+    Submit a batch of requests from field teams or partner agencies
+    
+    Accepts a JSON list or CSV (Content-Type: text/csv). Valid rows are
+    stored in one transaction; invalid rows are returned with their errors.
+    """
+    if session.get('user_role') not in ('government', 'admin'):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    try:
+        rows = parse_bulk_rows(request.get_data(as_text=True), request.content_type)
+    except BulkIngestError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    try:
+        result = ingest_requests(rows, session.get('user_email'))
+    except BulkIngestUnavailable:
+        return jsonify({'success': False, 'error': 'Could not save the requests, please try again'}), 503
+    except BulkIngestError as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({
+        'success': bool(result['accepted']),
+        'accepted': len(result['accepted']),
+        'rejected': len(result['errors']),
+        'requestIds': result['accepted'],
+        'errors': result['errors']
+    }), 200 if result['accepted'] else 400
+
+def change_request_statuses(reqs, new_status):
+    """
+    Move requests to new_status: one write to PostgreSQL, then one update of
+    the in-memory store, one audit batch, and batched analytics and live events
+    
+    Returns:
+        list: The requests that were updated (rows deleted from the database meanwhile are skipped)
+    
+    Raises:
+        Exception: if the database write fails; nothing has been changed then
+    """
+    old_statuses = {req['id']: req['status'] for req in reqs}
+    changed_at = datetime.now()
+    assign_to = session.get('user_name', 'Relief Team') if new_status == 'in-progress' else None
+    user_email = session.get('user_email', 'system')
+    principal = staff_cache.get(user_email)
+    
+    # Write through: PostgreSQL first, then this worker's store (other workers follow the outbox)
+    assigned = update_request_statuses_in_db([req['id'] for req in reqs], new_status, assign_to, changed_at,
+                                             principal.staff_id if principal is not None else None)
+    if assigned is None:
+        # No database (demo mode): apply the same assignment rule in memory
+        assigned = {req['id']: req.get('assignedTo') or assign_to for req in reqs}
+    reqs = [req for req in reqs if req['id'] in assigned]
+    
+    requests_db.set_statuses(reqs, new_status, changed_at.isoformat())
+    for req in reqs:
+        if assigned[req['id']] is not None:
+            req['assignedTo'] = assigned[req['id']]
+        if new_status == 'completed':
+            req['completedAt'] = changed_at.isoformat()
+    
+    # Log status changes
+    log_audit_actions([
+        ('STATUS_CHANGE', user_email,
+         f"Request {req['id']} status changed from {old_statuses[req['id']]} to {new_status}",
+         'REQUEST', req['id'])
+        for req in reqs
+    ])
+    
+    # Update response time analytics in every worker
+    moved = [req for req in reqs if old_statuses[req['id']] != new_status]
+    if moved and new_status in TREND_SERIES:
+        department = principal.department if principal is not None else session.get('user_department')
+        record_response_events(new_status, moved, department)
+    
+    # Push to live dashboards
+    if reqs:
+        publish_status_changes(reqs, old_statuses)
+    
+    return reqs
+
 @app.route('/api/requests/<request_id>/status', methods=['PUT'])
 def api_update_status(request_id):
     """Update request status - with role-based access control"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     new_status = data.get('status')
+    if new_status not in REQUEST_STATUSES:
+        return jsonify({'success': False, 'error': f"status must be one of {', '.join(sorted(REQUEST_STATUSES))}"}), 400
     
     # Find the request
-    for req in requests_db:
-        if req['id'] == request_id:
-            # Check if user has permission to update this request
-            if session.get('user_role') == 'government':
-                user_position = session.get('user_position', 'officer')
-                user_department = session.get('user_department', '')
-                
-                # Get allowed need types for this role
-                allowed_types = get_allowed_need_types_for_role(user_position, user_department)
-                
-                # If user has restricted access, check if they can access this request
-                if allowed_types is not None and req.get('needType') not in allowed_types:
-                    return jsonify({
-                        'success': False, 
-                        'error': 'You do not have permission to update this request type'
-                    }), 403
-            
-            # Update the request in memory
-            old_status = req['status']
-            req['status'] = new_status
-            req['updatedAt'] = datetime.now().isoformat()
-            
-            if new_status == 'in-progress' and 'assignedTo' not in req:
-                req['assignedTo'] = session.get('user_name', 'Relief Team')
-            
-            if new_status == 'completed':
-                req['completedAt'] = datetime.now().isoformat()
-            
-            # Update in PostgreSQL database
-            try:
-                update_request_status_in_db(
-                    request_id, 
-                    new_status, 
-                    req.get('assignedTo')
-                )
-            except Exception as e:
-                print(f"Error updating request status in database: {e}")
-                # Continue with in-memory update - don't fail the request
-            
-            # Log status change
-            user_email = session.get('user_email', 'system')
-            log_audit_action('STATUS_CHANGE', user_email,
-                           f"Request {request_id} status changed from {old_status} to {new_status}",
-                           'REQUEST', request_id)
-            
-            return jsonify({'success': True, 'request': req})
+    req = get_request(request_id)
+    if req is None:
+        return jsonify({'success': False, 'error': 'Request not found'}), 404
+    
+    # Check if user has permission to update this request
+    if session.get('user_role') == 'government':
+        # Get allowed need types for this role (cached, no database round trip)
+        allowed_types = get_session_allowed_need_types()
+        
+        # If user has restricted access, check if they can access this request
+        if allowed_types is not None and req.get('needType') not in allowed_types:
+            return jsonify({
+                'success': False, 
+                'error': 'You do not have permission to update this request type'
+            }), 403
+    
+    try:
+        updated = change_request_statuses([req], new_status)
+    except Exception:
+        return jsonify({'success': False, 'error': 'Could not update the request, please try again'}), 503
+    if not updated:
+        return jsonify({'success': False, 'error': 'Request not found'}), 404
+    
+    return jsonify({'success': True, 'request': req})
+
+@app.route('/api/requests/status', methods=['PUT'])
+def api_bulk_update_status():
+    """
+    Move many requests to one status (multi-select on the government dashboard)
+    
+    Body: {"requestIds": [...], "status": "..."}. Requests that do not exist
+    or that the user may not manage are skipped and listed in errors; the
+    rest are updated with a single database statement.
+    """
+    if session.get('user_role') not in ('government', 'admin'):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    new_status = data.get('status')
+    request_ids = data.get('requestIds')
+    if new_status not in REQUEST_STATUSES:
+        return jsonify({'success': False, 'error': f"status must be one of {', '.join(sorted(REQUEST_STATUSES))}"}), 400
+    if not isinstance(request_ids, list) or not request_ids or not all(isinstance(i, str) for i in request_ids):
+        return jsonify({'success': False, 'error': 'requestIds must be a non-empty list of request ids'}), 400
+    request_ids = list(dict.fromkeys(request_ids))  # Drop duplicates, keep order
+    if len(request_ids) > BULK_STATUS_MAX_REQUESTS:
+        return jsonify({'success': False, 'error': f"At most {BULK_STATUS_MAX_REQUESTS} requests per call"}), 400
+    
+    # Fault in requests that were not loaded at startup with one query
+    missing = [request_id for request_id in request_ids if request_id not in requests_db]
+    if missing and lazy_loading():
+        rows = fetch_requests_from_db("request_id = ANY(%s)", (missing,))
+        if rows:
+            requests_db.fault_in(rows)
+    
+    # Role check against the whole set, with one principal lookup
+    allowed_types = get_session_allowed_need_types() if session.get('user_role') == 'government' else None
+    reqs = []
+    errors = []
+    for request_id in request_ids:
+        req = requests_db.get(request_id)
+        if req is None:
+            errors.append({'id': request_id, 'error': 'Request not found'})
+        elif allowed_types is not None and req.get('needType') not in allowed_types:
+            errors.append({'id': request_id, 'error': 'You do not have permission to update this request type'})
+        else:
+            reqs.append(req)
+    
+    if not reqs:
+        forbidden = any(error['error'] != 'Request not found' for error in errors)
+        return jsonify({'success': False, 'updated': [], 'errors': errors}), 403 if forbidden else 404
     
-    return jsonify({'success': False, 'error': 'Request not found'}), 404
+    try:
+        updated = change_request_statuses(reqs, new_status)
+    except Exception:
+        return jsonify({'success': False, 'error': 'Could not update the requests, please try again'}), 503
+    
+    updated_ids = {req['id'] for req in updated}
+    errors.extend({'id': req['id'], 'error': 'Request not found'} for req in reqs if req['id'] not in updated_ids)
+    return jsonify({'success': True, 'updated': [req['id'] for req in updated], 'errors': errors})
 
 @app.route('/api/stats', methods=['GET'])
 def api_get_stats():
@@ -1016,45 +5241,14 @@ def api_get_staff():
     if session.get('user_role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     
-    conn = get_db_connection()
-    if not conn:
+    staff_list = staff_cache.staff_list()
+    if staff_list is None:
         return jsonify(staff_db)  # Fallback to in-memory
     
-    try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT staff_id, full_name, email, phone, official_id, department, 
-                   role, employee_id, status, joined_date, requests_handled, permissions
-            FROM staff 
-            ORDER BY added_date DESC
-        """)
-        staff_rows = cur.fetchall()
-        
-        staff_list = []
-        for row in staff_rows:
-            staff_list.append({
-                'id': row[0],
-                'fullName': row[1],
-                'email': row[2],
-                'phone': row[3],
-                'officialId': row[4],
-                'department': row[5],
-                'role': row[6],
-                'employeeId': row[7],
-                'status': row[8],
-                'joinedDate': row[9].isoformat() if row[9] else None,
-                'requestsHandled': row[10] or 0,
-                'permissions': row[11] or {}
-            })
-        
-        cur.close()
-        conn.close()
-        return jsonify(staff_list)
-    except Exception as e:
-        print(f"Database error: {e}")
-        if conn:
-            conn.close()
-        return jsonify(staff_db)  # Fallback
+    return jsonify([
+        {key: value for key, value in staff.items() if key not in ('addedBy', 'addedDate')}
+        for staff in staff_list
+    ])
 
 @app.route('/api/admin/staff', methods=['POST'])
 def api_create_staff():
@@ -1063,16 +5257,17 @@ def api_create_staff():
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     
     data = request.json
+    
+    # Hash password if provided (before taking a database connection)
+    password_hash = None
+    if 'password' in data and data['password']:
+        password_hash = hash_password(data['password'])
+    
     conn = get_db_connection()
     
     if not conn:
         # Fallback to in-memory
-        staff_id = f"STAFF-{str(len(staff_db) + 1).zfill(4)}"
-        
-        # Hash password if provided
-        password_hash = None
-        if 'password' in data and data['password']:
-            password_hash = hash_password(data['password'])
+        staff_id = staff_ids.next_id()
         
         new_staff = {
             'id': staff_id,
@@ -1096,14 +5291,7 @@ def api_create_staff():
         cur = conn.cursor()
         
         # Generate staff ID
-        cur.execute("SELECT COUNT(*) FROM staff")
-        count = cur.fetchone()[0]
-        staff_id = f"STAFF-{str(count + 1).zfill(4)}"
-        
-        # Hash password if provided
-        password_hash = None
-        if 'password' in data and data['password']:
-            password_hash = hash_password(data['password'])
+        staff_id = staff_ids.next_id()
         
         # Insert staff member
         cur.execute("""
@@ -1143,26 +5331,15 @@ def api_create_staff():
             'permissions': row[11] or {}
         }
         
-        # Log audit action in database
-        admin_email = session.get('user_email', 'system')
-        cur.execute("""
-            INSERT INTO audit_logs (audit_code, action_type, user_email, user_role, 
-                                    entity_type, entity_id, details, ip_address)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            f"AUDIT-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            'CREATE',
-            admin_email,
-            'admin',
-            'STAFF',
-            staff_id,
-            f"New staff member created: {new_staff['fullName']} ({new_staff['email']}) - {new_staff['role']}",
-            request.remote_addr
-        ))
-        
         conn.commit()
         cur.close()
         conn.close()
+        notify_staff_changed(new_staff['email'])
+        
+        # Log audit action
+        log_audit_action('CREATE', session.get('user_email', 'system'),
+                         f"New staff member created: {new_staff['fullName']} ({new_staff['email']}) - {new_staff['role']}",
+                         'STAFF', staff_id)
         
         return jsonify({'success': True, 'staff': new_staff})
     except Exception as e:
@@ -1257,26 +5434,15 @@ def api_update_staff(staff_id):
             'status': row[8]
         }
         
-        # Log audit action
-        admin_email = session.get('user_email', 'system')
-        cur.execute("""
-            INSERT INTO audit_logs (audit_code, action_type, user_email, user_role, 
-                                    entity_type, entity_id, details, ip_address)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            f"AUDIT-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            'UPDATE',
-            admin_email,
-            'admin',
-            'STAFF',
-            staff_id,
-            f"Staff {staff_id} updated",
-            request.remote_addr
-        ))
-        
         conn.commit()
         cur.close()
         conn.close()
+        # The email itself may have changed, so drop every cached principal
+        notify_staff_changed()
+        
+        # Log audit action
+        log_audit_action('UPDATE', session.get('user_email', 'system'),
+                         f"Staff {staff_id} updated", 'STAFF', staff_id)
         
         return jsonify({'success': True, 'staff': updated_staff})
     except Exception as e:
@@ -1321,26 +5487,14 @@ def api_delete_staff(staff_id):
             conn.close()
             return jsonify({'success': False, 'error': 'Staff not found'}), 404
         
-        # Log audit action
-        admin_email = session.get('user_email', 'system')
-        cur.execute("""
-            INSERT INTO audit_logs (audit_code, action_type, user_email, user_role, 
-                                    entity_type, entity_id, details, ip_address)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            f"AUDIT-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            'DELETE',
-            admin_email,
-            'admin',
-            'STAFF',
-            staff_id,
-            f"Staff member deactivated: {row[0]} ({row[1]})",
-            request.remote_addr
-        ))
-        
         conn.commit()
         cur.close()
         conn.close()
+        notify_staff_changed(row[1])
+        
+        # Log audit action
+        log_audit_action('DELETE', session.get('user_email', 'system'),
+                         f"Staff member deactivated: {row[0]} ({row[1]})", 'STAFF', staff_id)
         
         return jsonify({'success': True, 'message': 'Staff deactivated'})
     except Exception as e:
@@ -1354,95 +5508,242 @@ def api_delete_staff(staff_id):
 # ADMIN API ROUTES - Audit Tracking
 # ============================================
 
+AUDIT_PAGE_DEFAULT = 100
+AUDIT_PAGE_MAX = 500
+AUDIT_EXACT_COUNT_LIMIT = int(os.getenv('AUDIT_EXACT_COUNT_LIMIT', 10000))  # Larger totals are planner estimates
+
+AUDIT_LISTING_COLUMNS = """audit_code, timestamp, action_type, user_email, user_role,
+               entity_type, entity_id, details, ip_address, audit_id"""
+
+def encode_audit_cursor(timestamp, audit_key):
+    """Opaque cursor pointing just past an audit entry in (timestamp, audit_id) DESC order"""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, audit_key]).encode('utf-8')).decode('ascii')
+
+def decode_audit_cursor(cursor):
+    """Decode a cursor from encode_audit_cursor; raises ValueError if it is malformed"""
+    try:
+        timestamp, audit_key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        datetime.fromisoformat(timestamp)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(audit_key, (int, str)):
+        raise ValueError('Invalid cursor')
+    return timestamp, audit_key
+
+def parse_audit_logs_args(args):
+    """
+    Read the audit log listing's query parameters
+    
+    Returns:
+        dict: action_type, user_email, entity_type, start_date, end_date (None when absent), after, limit
+    
+    Raises:
+        ValueError: if limit, a date or the cursor is malformed
+    """
+    try:
+        limit = min(max(int(args.get('limit', AUDIT_PAGE_DEFAULT)), 1), AUDIT_PAGE_MAX)
+    except ValueError:
+        raise ValueError('Invalid limit')
+    parsed = {
+        'action_type': args.get('action_type') or None,
+        'user_email': args.get('user_email') or None,
+        'entity_type': args.get('entity_type') or None,
+        'start_date': None,
+        'end_date': None,
+        'after': None,
+        'limit': limit
+    }
+    for param in ('start_date', 'end_date'):
+        value = args.get(param)
+        if value:
+            try:
+                parsed[param] = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f'Invalid {param}: expected an ISO date')
+    cursor = args.get('cursor')
+    if cursor:
+        parsed['after'] = decode_audit_cursor(cursor)
+    return parsed
+
+def build_audit_logs_query(parsed):
+    """
+    SQL for one page of the admin audit log listing, newest first, with a
+    keyset seek on (timestamp, audit_id) DESC
+    
+    start_date, end_date and the cursor are bound as timestamps, so
+    PostgreSQL prunes the monthly partitions outside the range.
+    
+    The total is not a COUNT(*) over every matching row: count_queries holds
+    an exact count capped at AUDIT_EXACT_COUNT_LIMIT + 1 rows and the
+    planner's row estimate; see audit_logs_total.
+    
+    Args:
+        parsed (dict): From parse_audit_logs_args
+    
+    Returns:
+        tuple: (query, params, count_queries) where count_queries is a list of (query, params)
+    """
+    where_clauses = []
+    params = []
+    for column in ('action_type', 'user_email', 'entity_type'):
+        if parsed[column]:
+            where_clauses.append(f"{column} = %s")
+            params.append(parsed[column])
+    if parsed['start_date']:
+        where_clauses.append("timestamp >= %s")
+        params.append(parsed['start_date'])
+    if parsed['end_date']:
+        where_clauses.append("timestamp <= %s")
+        params.append(parsed['end_date'])
+    
+    filter_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+    count_queries = [
+        (f"SELECT COUNT(*) FROM (SELECT 1 FROM audit_logs WHERE {filter_sql} LIMIT %s) capped",
+         params + [AUDIT_EXACT_COUNT_LIMIT + 1]),
+        (f"EXPLAIN (FORMAT JSON) SELECT 1 FROM audit_logs WHERE {filter_sql}", list(params))
+    ]
+    
+    page_params = list(params)
+    after = parsed['after']
+    if after and isinstance(after[1], int):
+        where_clauses.append("(timestamp, audit_id) < (%s::timestamp, %s)")
+        page_params.extend(after)
+    elif after:
+        # Cursor from the in-memory fallback (audit_code, not audit_id): seek on the timestamp alone
+        where_clauses.append("timestamp < %s::timestamp")
+        page_params.append(after[0])
+    where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+    
+    query = f"""
+        SELECT {AUDIT_LISTING_COLUMNS}
+        FROM audit_logs
+        WHERE {where_sql}
+        ORDER BY timestamp DESC, audit_id DESC
+        LIMIT %s
+    """
+    return query, page_params + [parsed['limit'] + 1], count_queries
+
+def audit_logs_total(count_results):
+    """
+    Total for the listing from the results of build_audit_logs_query's count_queries
+    
+    Returns:
+        tuple: (total, is_estimate); exact up to AUDIT_EXACT_COUNT_LIMIT rows,
+            otherwise the planner's estimate (from table statistics, no scan)
+    """
+    capped = count_results[0][0][0]
+    if capped <= AUDIT_EXACT_COUNT_LIMIT:
+        return capped, False
+    plan = count_results[1][0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(int(plan[0]['Plan']['Plan Rows']), capped), True
+
+def count_audit_logs(cur, count_queries):
+    """Run count_queries on cur; returns (total, is_estimate) like audit_logs_total"""
+    results = []
+    for query, params in count_queries:
+        cur.execute(query, params)
+        results.append(cur.fetchall())
+    return audit_logs_total(results)
+
+def audit_row_to_dict(row):
+    return {
+        'id': row[0],
+        'timestamp': row[1].isoformat() if row[1] else None,
+        'action_type': row[2],
+        'user_email': row[3],
+        'user_role': row[4],
+        'entity_type': row[5],
+        'entity_id': row[6],
+        'details': row[7],
+        'ip_address': row[8]
+    }
+
+def audit_logs_response(rows, total, is_estimate, limit):
+    """Listing response for up to limit + 1 audit rows (see build_audit_logs_query)"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    logs = [audit_row_to_dict(row) for row in rows]
+    return {
+        'success': True,
+        'logs': logs,
+        'total': total,
+        'totalIsEstimate': is_estimate,
+        'returned': len(logs),
+        'nextCursor': encode_audit_cursor(logs[-1]['timestamp'], rows[-1][9]) if has_more else None,
+        'hasMore': has_more
+    }
+
+def query_audit_logs_in_memory(parsed):
+    """Fallback for the audit log listing when the database is unavailable"""
+    start_date = parsed['start_date'].isoformat() if parsed['start_date'] else None
+    end_date = parsed['end_date'].isoformat() if parsed['end_date'] else None
+    # Database cursors carry a numeric audit_id; compare it as a string like the in-memory ids
+    after = (parsed['after'][0], str(parsed['after'][1])) if parsed['after'] else None
+    
+    filtered_logs = [
+        log for log in list(audit_logs)
+        if all(parsed[column] is None or log.get(column) == parsed[column]
+               for column in ('action_type', 'user_email', 'entity_type'))
+        and (start_date is None or log['timestamp'] >= start_date)
+        and (end_date is None or log['timestamp'] <= end_date)
+    ]
+    sorted_logs = sorted(filtered_logs, key=lambda x: (x['timestamp'], x['id']), reverse=True)
+    if after:
+        sorted_logs = [log for log in sorted_logs if (log['timestamp'], log['id']) < after]
+    
+    limit = parsed['limit']
+    page = sorted_logs[:limit]
+    has_more = len(sorted_logs) > limit
+    return {
+        'success': True,
+        'logs': page,
+        'total': len(filtered_logs),
+        'totalIsEstimate': False,
+        'returned': len(page),
+        'nextCursor': encode_audit_cursor(page[-1]['timestamp'], page[-1]['id']) if has_more else None,
+        'hasMore': has_more
+    }
+
 @app.route('/api/admin/audit-logs', methods=['GET'])
 def api_get_audit_logs():
-    """Get audit logs with optional filtering from database"""
+    """
+    Get audit logs with optional filtering from database
+    
+    Filters: action_type, user_email, entity_type, start_date, end_date.
+    Newest first; pass the returned nextCursor as cursor for the next page.
+    total is exact up to AUDIT_EXACT_COUNT_LIMIT and estimated above that
+    (totalIsEstimate).
+    """
     if session.get('user_role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     
-    # Get query parameters
-    action_type = request.args.get('action_type')
-    user_email = request.args.get('user_email')
-    entity_type = request.args.get('entity_type')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    limit = int(request.args.get('limit', 100))
+    try:
+        parsed = parse_audit_logs_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
     conn = get_db_connection()
     
     if not conn:
         # Fallback to in-memory
-        filtered_logs = audit_logs
-        if action_type:
-            filtered_logs = [log for log in filtered_logs if log['action_type'] == action_type]
-        sorted_logs = sorted(filtered_logs, key=lambda x: x['timestamp'], reverse=True)[:limit]
-        return jsonify({'success': True, 'logs': sorted_logs, 'total': len(filtered_logs), 'returned': len(sorted_logs)})
+        return jsonify(query_audit_logs_in_memory(parsed))
     
     try:
         cur = conn.cursor()
-        
-        # Build WHERE clause
-        where_clauses = []
-        params = []
-        
-        if action_type:
-            where_clauses.append("action_type = %s")
-            params.append(action_type)
-        if user_email:
-            where_clauses.append("user_email = %s")
-            params.append(user_email)
-        if entity_type:
-            where_clauses.append("entity_type = %s")
-            params.append(entity_type)
-        if start_date:
-            where_clauses.append("timestamp >= %s")
-            params.append(start_date)
-        if end_date:
-            where_clauses.append("timestamp <= %s")
-            params.append(end_date)
-        
-        where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
-        params.append(limit)
-        
-        query = f"""
-            SELECT audit_code, timestamp, action_type, user_email, user_role,
-                   entity_type, entity_id, details, ip_address
-            FROM audit_logs
-            WHERE {where_sql}
-            ORDER BY timestamp DESC
-            LIMIT %s
-        """
+        query, params, count_queries = build_audit_logs_query(parsed)
         
         cur.execute(query, params)
         rows = cur.fetchall()
         
-        logs = []
-        for row in rows:
-            logs.append({
-                'id': row[0],
-                'timestamp': row[1].isoformat() if row[1] else None,
-                'action_type': row[2],
-                'user_email': row[3],
-                'user_role': row[4],
-                'entity_type': row[5],
-                'entity_id': row[6],
-                'details': row[7],
-                'ip_address': row[8]
-            })
-        
-        # Get total count
-        cur.execute(f"SELECT COUNT(*) FROM audit_logs WHERE {where_sql}", params[:-1])
-        total = cur.fetchone()[0]
+        # Get total count (capped exact count, or the planner's estimate)
+        total, is_estimate = count_audit_logs(cur, count_queries)
         
         cur.close()
         conn.close()
         
-        return jsonify({
-            'success': True,
-            'logs': logs,
-            'total': total,
-            'returned': len(logs)
-        })
+        return jsonify(audit_logs_response(rows, total, is_estimate, parsed['limit']))
     except Exception as e:
         print(f"Database error: {e}")
         if conn:
@@ -1455,17 +5756,18 @@ def api_get_audit_stats():
     if session.get('user_role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     
-    total_actions = len(audit_logs)
+    logs = list(audit_logs)  # Snapshot: other threads keep appending
+    total_actions = len(logs)
     
     # Count by action type
     action_counts = {}
-    for log in audit_logs:
+    for log in logs:
         action_type = log['action_type']
         action_counts[action_type] = action_counts.get(action_type, 0) + 1
     
     # Count by user
     user_activity = {}
-    for log in audit_logs:
+    for log in logs:
         user = log['user_email']
         user_activity[user] = user_activity.get(user, 0) + 1
     
@@ -1473,7 +5775,7 @@ def api_get_audit_stats():
     top_users = sorted(user_activity.items(), key=lambda x: x[1], reverse=True)[:5]
     
     # Recent activity (last 24 hours - mock)
-    recent_count = sum(1 for log in audit_logs[-100:])
+    recent_count = min(total_actions, 100)
     
     return jsonify({
         'success': True,
@@ -1494,19 +5796,21 @@ def api_get_system_stats():
     base_stats = get_dashboard_stats()
     
     # Staff statistics
-    total_staff = len(staff_db)
-    active_staff = sum(1 for s in staff_db if s.get('status') == 'active')
-    staff_by_department = {}
-    for staff in staff_db:
-        dept = staff.get('department', 'Unknown')
-        staff_by_department[dept] = staff_by_department.get(dept, 0) + 1
-    
-    # Request statistics by status over time (mock data)
-    request_trends = {
-        'pending_trend': [12, 15, 18, 14, 10],
-        'in_progress_trend': [3, 5, 7, 6, 4],
-        'completed_trend': [5, 8, 10, 15, 20]
-    }
+    staff_summary = get_dashboard_rollup().staff_summary()
+    if staff_summary is not None:
+        total_staff = staff_summary['total']
+        active_staff = staff_summary['active']
+        staff_by_department = staff_summary['byDepartment']
+    else:
+        total_staff = len(staff_db)
+        active_staff = sum(1 for s in staff_db if s.get('status') == 'active')
+        staff_by_department = {}
+        for staff in staff_db:
+            dept = staff.get('department', 'Unknown')
+            staff_by_department[dept] = staff_by_department.get(dept, 0) + 1
+    
+    # Submissions, starts and completions per trend bucket
+    request_trends = response_analytics.trends()
     
     return jsonify({
         'success': True,
@@ -1517,10 +5821,203 @@ def api_get_system_stats():
             'inactiveStaff': total_staff - active_staff,
             'staffByDepartment': staff_by_department,
             'totalAuditLogs': len(audit_logs),
-            'requestTrends': request_trends
+            'requestTrends': request_trends,
+            'responseTimes': response_analytics.breakdown()
         }
     })
 
+@app.route('/api/admin/db-pool', methods=['GET'])
+def api_get_db_pool_stats():
+    """Get database connection pool metrics for the worker serving this request"""
+    if session.get('user_role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    return jsonify({
+        'success': True,
+        'pool': get_db_pool().stats(),
+        'events': get_event_broker().stats(),
+        'audit': get_audit_writer().stats(),
+        'passwords': get_password_hasher().stats(),
+        'loginRateLimits': login_rate_limit_stats(),
+        'staffCache': staff_cache.stats(),
+        'dashboardRollup': get_dashboard_rollup().stats(),
+        'ids': {'requests': request_ids.stats(), 'staff': staff_ids.stats()},
+        'requestSync': request_sync.stats()
+    })
+
+# ============================================
+# CLI COMMANDS (flask --app app <command>)
+# ============================================
+
+def synthetic_request(i):
+    """A realistic request as loaded from the database, for benchmarks"""
+    need_types = ['medical', 'water', 'food', 'shelter', 'mental-health', 'educational', 'clothing', 'financial', 'other']
+    severities = ['critical', 'urgent', 'moderate', 'low']
+    statuses = ['pending', 'in-progress', 'completed']
+    submitted = datetime(2025, 1, 1, 8, 0, 0).timestamp() + i * 37
+    return {
+        'id': f"REQ-{str(i + 1).zfill(6)}",
+        'citizenName': f"Citizen {i}",
+        'email': f"citizen{i % 5000}@example.com",
+        'phone': f"+1-555-{i % 10000:04d}",
+        'location': f"{i % 900 + 100} Main St, District {i % 12}",
+        'needType': ''.join(need_types[i % len(need_types)]),  # Fresh string objects, as psycopg2 returns them
+        'severity': ''.join(severities[i % len(severities)]),
+        'peopleAffected': i % 7 + 1,
+        'description': 'Household needs assistance after flooding; details provided by caller.',
+        'vulnerabilityGroup': [''.join('elderly')] if i % 3 == 0 else [],
+        'specialCircumstances': None,
+        'isStudent': i % 5 == 0,
+        'studentInfo': {},
+        'hasEvidence': i % 2 == 0,
+        'status': ''.join(statuses[i % len(statuses)]),
+        'submittedAt': datetime.fromtimestamp(submitted).isoformat(),
+        'updatedAt': datetime.fromtimestamp(submitted + 3600).isoformat(),
+        'completedAt': None,
+        'priorityScore': i % 100,
+        'estimatedResponse': 'Within 24 hours',
+        'assignedTo': None
+    }
+
+
+def measure_allocated(build):
+    """Bytes still allocated after build() returns, and its result"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+@app.cli.command('bench-request-memory')
+@click.option('--count', default=100000, show_default=True, help='Number of synthetic requests')
+def bench_request_memory(count):
+    """Compare bytes per request for plain dicts and RequestRecords"""
+    dict_bytes, dicts = measure_allocated(lambda: [synthetic_request(i) for i in range(count)])
+    del dicts
+    record_bytes, records = measure_allocated(lambda: [RequestRecord.from_dict(synthetic_request(i)) for i in range(count)])
+    del records
+    
+    print(f"{count} requests")
+    print(f"  dict:          {dict_bytes / count:8.0f} bytes/request")
+    print(f"  RequestRecord: {record_bytes / count:8.0f} bytes/request ({record_bytes / dict_bytes:.0%} of dict)")
+
+@app.cli.command('rescore-requests')
+@click.option('--weights', 'weights_path', default=PRIORITY_WEIGHTS_FILE, show_default=True,
+              type=click.Path(exists=True, dir_okay=False), help='Priority weights config (JSON)')
+@click.option('--status', 'statuses', multiple=True, default=ACTIVE_STATUSES, show_default=True,
+              help='Statuses to rescore (repeatable)')
+@click.option('--actor', default='system', show_default=True, help='Email recorded in the audit log')
+def rescore_requests_command(weights_path, statuses, actor):
+    """Apply a priority weights version to stored requests"""
+    try:
+        weights = load_priority_weights_file(weights_path)
+        result = rescore_requests_in_db(weights, statuses, actor)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if result is None:
+        raise click.ClickException('Unable to connect to the database')
+    
+    log_audit_action('UPDATE', actor,
+                     f"Rescored {result['changed']} of {result['scanned']} requests with priority weights v{weights.version}",
+                     'REQUEST', None)
+    print(f"Weights v{result['version']}: {result['changed']} of {result['scanned']} requests changed "
+          f"(load {result['loadSeconds']}s, score {result['scoreSeconds']}s, update {result['updateSeconds']}s)")
+
+
+@app.cli.command('bench-rescore')
+@click.option('--count', default=1000000, show_default=True, help='Number of synthetic requests')
+def bench_rescore(count):
+    """Time batch priority scoring over columns against the per-request function"""
+    weights = get_priority_weights()
+    rng = random.Random(42)
+    severities = [rng.choice(list(weights.severity)) for _ in range(count)]
+    need_types = [rng.choice(list(weights.need_type)) for _ in range(count)]
+    group_lists = [rng.sample(list(weights.vulnerability), rng.randint(0, len(weights.vulnerability)))
+                   for _ in range(count)]
+    people = [rng.randint(1, 15) for _ in range(count)]
+    evidence = [rng.random() < 0.5 for _ in range(count)]
+    special = [rng.random() < 0.2 for _ in range(count)]
+    
+    started = time.perf_counter()
+    batch = score_priority_columns(weights, severities, weights.vulnerability_bonuses(group_lists),
+                                   people, need_types, evidence, special)
+    batch_seconds = time.perf_counter() - started
+    
+    reqs = [{'severity': s, 'vulnerabilityGroup': g, 'peopleAffected': p, 'needType': n,
+             'hasEvidence': e, 'specialCircumstances': 'yes' if c else None}
+            for s, g, p, n, e, c in zip(severities, group_lists, people, need_types, evidence, special)]
+    started = time.perf_counter()
+    single = [calculate_priority_score(req, weights) for req in reqs]
+    single_seconds = time.perf_counter() - started
+    
+    print(f"{count} requests, weights v{weights.version}, {'NumPy ' + np.__version__ if np is not None else 'no NumPy (plain Python columns)'}")
+    print(f"  batch:       {batch_seconds:8.3f}s")
+    print(f"  per request: {single_seconds:8.3f}s ({single_seconds / max(batch_seconds, 1e-9):.1f}x slower)")
+    print(f"  identical scores: {[int(s) for s in batch] == single}")
+
+
+@app.cli.command('ingest-requests')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--actor', default='system', show_default=True, help='Email recorded in the audit log')
+def ingest_requests_command(path, actor):
+    """Bulk load requests from a CSV or JSON file"""
+    with open(path, encoding='utf-8', newline='') as f:
+        body = f.read()
+    
+    try:
+        rows = parse_bulk_rows(body, 'text/csv' if path.lower().endswith('.csv') else 'application/json')
+        started = time.monotonic()
+        result = ingest_requests(rows, actor)
+    except BulkIngestError as e:
+        raise click.ClickException(str(e))
+    
+    print(f"Accepted {len(result['accepted'])} of {len(rows)} rows in {time.monotonic() - started:.2f}s")
+    for error in result['errors']:
+        print(f"  row {error['row']}: {'; '.join(error['errors'])}")
+
+
+@app.cli.command('create-audit-partitions')
+@click.option('--months-ahead', default=AUDIT_PARTITION_MONTHS_AHEAD, show_default=True,
+              help='Months after the current one to create partitions for')
+def create_audit_partitions_command(months_ahead):
+    """Create upcoming monthly audit_logs partitions"""
+    created = ensure_audit_partitions(months_ahead)
+    if created is None:
+        raise click.ClickException('Unable to connect to the database, or audit_logs is not partitioned')
+    print(f"Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}")
+
+
+@app.cli.command('archive-audit-logs')
+@click.option('--retention-months', default=AUDIT_RETENTION_MONTHS, show_default=True,
+              help='Months of audit entries to keep online, counting the current one')
+@click.option('--archive-dir', default=AUDIT_ARCHIVE_DIR, show_default=True,
+              type=click.Path(file_okay=False), help='Directory for the compressed CSV exports')
+@click.option('--dry-run', is_flag=True, help='List the partitions that would be archived')
+@click.option('--actor', default='system', show_default=True, help='Email recorded in the audit log')
+def archive_audit_logs_command(retention_months, archive_dir, dry_run, actor):
+    """Detach, export and drop audit_logs partitions past the retention window"""
+    try:
+        archived = archive_audit_partitions(retention_months, archive_dir, dry_run)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    if archived is None:
+        raise click.ClickException('Unable to connect to the database, or audit_logs is not partitioned')
+    if not archived:
+        print(f"Nothing to archive (keeping {retention_months} month(s))")
+        return
+    
+    for partition in archived:
+        if dry_run:
+            print(f"Would archive {partition['partition']} to {partition['path']}")
+        else:
+            print(f"Archived {partition['partition']}: {partition['rows']} rows to {partition['path']}")
+            log_audit_action('DELETE', actor,
+                             f"Archived audit partition {partition['partition']} ({partition['rows']} rows) to {partition['path']}",
+                             'AUDIT_LOG', partition['partition'])
+
+
 # Initialize with some mock data
 def init_mock_data():
     """Initialize with sample requests, staff, and test users with hashed passwords"""
@@ -1630,7 +6127,7 @@ def init_mock_data():
                 'estimatedResponseTime': 'Within 6 hours'
             }
         ]
-        requests_db.extend(sample_requests)
+        requests_db.add_many(sample_requests)
     
     # Initialize sample staff data with hashed passwords (COMMENTED OUT - Use database instead)
     # if len(staff_db) == 0:
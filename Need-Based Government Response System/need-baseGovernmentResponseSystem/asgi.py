@@ -0,0 +1,399 @@
+"""
+ASGI entry point (async serving mode)
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+The hot API routes (request listings, login and the admin reads) run as
+coroutines on the worker's event loop: their PostgreSQL queries go through an
+async psycopg 3 pool and bcrypt checks are awaited, so one worker keeps
+serving other connections while those wait. They reuse the Flask handler code
+from app.py inside a normal Flask request context; the database reads are
+awaited first and either handed to the shared helpers or used to prime the
+caches the handler reads. Every other route is served by the Flask app itself
+on a thread pool.
+
+Requires uvicorn, a2wsgi and psycopg[binary,pool] (see DEPLOYMENT.md).
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+
+from a2wsgi import WSGIMiddleware
+from flask import request, session, jsonify
+from psycopg_pool import AsyncConnectionPool
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app import (
+    app, init_app, DB_CONFIG, DB_POOL_TIMEOUT, LOGIN_LIMITER_BACKEND,
+    LoginAttempt, StaffPrincipal, staff_cache, get_password_hasher, _checkpw,
+    STAFF_PRINCIPAL_QUERY, STAFF_LIST_QUERY, staff_row_to_dict,
+    parse_requests_page_args, build_requests_page_query, query_requests_page_in_memory,
+    requests_page_response, get_request_visibility, row_to_request, requests_db, lazy_loading,
+    parse_audit_logs_args, build_audit_logs_query, audit_logs_total, audit_logs_response,
+    query_audit_logs_in_memory,
+    api_get_requests, api_get_staff, api_get_audit_logs, api_get_audit_stats,
+    api_get_system_stats, api_get_db_pool_stats
+)
+
+ASYNC_DB_POOL_MAX_SIZE = int(os.getenv('ASYNC_DB_POOL_MAX_SIZE', 20))  # Per worker process
+ASYNC_DB_POOL_TIMEOUT = float(os.getenv('ASYNC_DB_POOL_TIMEOUT', DB_POOL_TIMEOUT))  # Seconds to wait for a free connection
+ASYNC_DB_RETRY_INTERVAL = 5  # Seconds to serve fallbacks after a connection failure before trying again
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 20))  # Threads for the routes served by the Flask app
+
+# ============================================
+# ASYNC DATABASE POOL
+# ============================================
+
+
+class AsyncDatabasePool:
+    """
+    psycopg 3 AsyncConnectionPool for the coroutine handlers.
+
+    fetch() follows the convention of the sync helpers in app.py: it returns
+    None when the database is unavailable or the query fails, and the caller
+    falls back to in-memory data. After a failure the pool is skipped for
+    ASYNC_DB_RETRY_INTERVAL seconds, then a single request probes it while
+    the others keep using the fallbacks, so requests do not each wait out the
+    pool timeout during an outage.
+    """
+
+    def __init__(self, max_size=ASYNC_DB_POOL_MAX_SIZE, timeout=ASYNC_DB_POOL_TIMEOUT):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pool = None
+        self._skip_until = 0
+        self._failed = False
+        self._probing = False
+        self._metrics = {'queries': 0, 'failures': 0, 'skipped': 0, 'totalMs': 0.0}
+
+    async def open(self):
+        self._pool = AsyncConnectionPool(
+            kwargs={
+                'host': DB_CONFIG['host'],
+                'dbname': DB_CONFIG['database'],
+                'user': DB_CONFIG['user'],
+                'password': DB_CONFIG['password'],
+                'autocommit': True  # Read-only queries; nothing to commit or roll back
+            },
+            min_size=1,
+            max_size=self.max_size,
+            timeout=self.timeout,
+            open=False
+        )
+        try:
+            await self._pool.open(wait=True, timeout=self.timeout)
+        except Exception as e:
+            # Keep serving from the fallbacks; the pool keeps reconnecting in the background
+            print(f"Async database pool could not connect: {e}")
+            self._failed_now()
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+
+    async def fetch(self, query, params=()):
+        """All rows of query, or None if the database is unavailable"""
+        results = await self.fetch_all([(query, params)])
+        return None if results is None else results[0]
+
+    async def fetch_all(self, queries):
+        """
+        Run (query, params) pairs on one connection
+
+        Returns:
+            list|None: The rows of each query, or None if the database is unavailable
+        """
+        if self._pool is None or time.monotonic() < self._skip_until or self._probing:
+            self._metrics['skipped'] += 1
+            return None
+
+        probe = self._failed
+        self._probing = probe
+        started = time.monotonic()
+        try:
+            async with self._pool.connection() as conn:
+                results = []
+                for query, params in queries:
+                    cur = await conn.execute(query, params)
+                    results.append(await cur.fetchall())
+        except Exception as e:
+            print(f"Async database error: {e}")
+            self._metrics['failures'] += 1
+            self._failed_now()
+            return None
+        finally:
+            if probe:
+                self._probing = False
+
+        self._failed = False
+        self._metrics['queries'] += len(queries)
+        self._metrics['totalMs'] += (time.monotonic() - started) * 1000
+        return results
+
+    def _failed_now(self):
+        self._failed = True
+        self._skip_until = time.monotonic() + ASYNC_DB_RETRY_INTERVAL
+
+    def stats(self):
+        pool_stats = self._pool.get_stats() if self._pool is not None else {}
+        return {
+            'pid': os.getpid(),
+            'maxSize': self.max_size,
+            'size': pool_stats.get('pool_size', 0),
+            'available': pool_stats.get('pool_available', 0),
+            'waiting': pool_stats.get('requests_waiting', 0),
+            'queries': self._metrics['queries'],
+            'failures': self._metrics['failures'],
+            'skipped': self._metrics['skipped'],
+            'avgMs': round(self._metrics['totalMs'] / (self._metrics['queries'] or 1), 2)
+        }
+
+
+db = AsyncDatabasePool()
+
+# ============================================
+# COROUTINE HANDLERS
+# ============================================
+
+
+async def prime_staff_principal(email):
+    """Load a staff principal into staff_cache so the handler's staff_cache.get() does not block"""
+    # False without the async pool: staff_cache.get() would then query PostgreSQL synchronously
+    if not email:
+        return True
+    hit, _ = staff_cache.lookup(email)
+    if hit:
+        return True
+    rows = await db.fetch(STAFF_PRINCIPAL_QUERY, (email,))
+    if rows is None:
+        return False
+    staff_cache.put(email, StaffPrincipal(*rows[0]) if rows else None)
+    return True
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """verify_password without blocking the event loop (PasswordHasherBusy when the pool is full)"""
+    return await asyncio.wrap_future(get_password_hasher().submit(_checkpw, plain_password, hashed_password))
+
+
+async def call_login_limiter(fn, *args):
+    """Limiter updates query PostgreSQL with LOGIN_LIMITER_BACKEND=postgres; run them off the event loop then"""
+    if LOGIN_LIMITER_BACKEND == 'postgres':
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+async def get_requests():
+    """GET /api/requests (see api_get_requests)"""
+    user_email = request.args.get('email')
+    if session.get('user_role') == 'government' and not await prime_staff_principal(session.get('user_email')):
+        # get_request_visibility would load the principal synchronously
+        return await asyncio.to_thread(api_get_requests)
+
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            filters, after, limit = parse_requests_page_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        allowed_types, email = get_request_visibility(user_email)
+        rows = await db.fetch(*build_requests_page_query(filters, allowed_types, email, after, limit))
+        if rows is None:
+            page = query_requests_page_in_memory(requests_db, filters, allowed_types, email, after, limit)
+        else:
+            page = [row_to_request(row) for row in rows]
+        return requests_page_response(page, limit)
+
+    if lazy_loading() and user_email and session.get('user_role') != 'government':
+        # A citizen's first listing faults their completed requests in from the database
+        return await asyncio.to_thread(api_get_requests)
+    return api_get_requests()
+
+
+async def login():
+    """POST /api/login (see api_login)"""
+    attempt = LoginAttempt(request.json)
+    throttled = await call_login_limiter(attempt.throttle)
+    if throttled:
+        return throttled
+
+    if not attempt.password:
+        return await call_login_limiter(attempt.succeed)
+
+    if attempt.role == 'government' and not await prime_staff_principal(attempt.email):
+        candidates = await asyncio.to_thread(attempt.candidates)
+    else:
+        candidates = attempt.candidates()
+    for candidate in candidates:
+        if await verify_password_async(attempt.password, candidate[0]):
+            return await call_login_limiter(attempt.succeed, candidate)
+    return await call_login_limiter(attempt.fail)
+
+
+async def get_staff():
+    """GET /api/admin/staff (see api_get_staff)"""
+    if session.get('user_role') == 'admin' and staff_cache.cached_staff_list() is None:
+        rows = await db.fetch(STAFF_LIST_QUERY)
+        if rows is None:
+            # api_get_staff would load the list synchronously
+            return await asyncio.to_thread(api_get_staff)
+        staff_cache.put_staff_list([staff_row_to_dict(row) for row in rows])
+    return api_get_staff()
+
+
+async def get_audit_logs():
+    """GET /api/admin/audit-logs (see api_get_audit_logs)"""
+    if session.get('user_role') != 'admin':
+        return api_get_audit_logs()
+
+    try:
+        parsed = parse_audit_logs_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    query, params, count_queries = build_audit_logs_query(parsed)
+    results = await db.fetch_all([(query, params)] + count_queries)
+    if results is None:
+        return jsonify(query_audit_logs_in_memory(parsed))
+
+    total, is_estimate = audit_logs_total(results[1:])
+    return jsonify(audit_logs_response(results[0], total, is_estimate, parsed['limit']))
+
+
+async def get_db_pool_stats():
+    """GET /api/admin/db-pool, plus the async pool's metrics"""
+    response = api_get_db_pool_stats()
+    if session.get('user_role') != 'admin':
+        return response
+    return jsonify({**response.get_json(), 'asyncPool': db.stats()})
+
+
+def in_memory(view):
+    """Coroutine for a Flask view that only reads in-memory state"""
+    async def handler():
+        return view()
+    return handler
+
+
+NATIVE_ROUTES = {
+    ('GET', '/api/requests'): get_requests,
+    ('POST', '/api/login'): login,
+    ('GET', '/api/admin/staff'): get_staff,
+    ('GET', '/api/admin/audit-logs'): get_audit_logs,
+    ('GET', '/api/admin/audit-stats'): in_memory(api_get_audit_stats),
+    ('GET', '/api/admin/system-stats'): in_memory(api_get_system_stats),
+    ('GET', '/api/admin/db-pool'): get_db_pool_stats
+}
+
+# ============================================
+# ASGI APPLICATION
+# ============================================
+
+
+def build_environ(scope, body):
+    """WSGI environ for scope, so a Flask request context can be built for a coroutine handler"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    # Same client address as the routes served through app.wsgi_app
+    if isinstance(app.wsgi_app, ProxyFix):
+        ProxyFix(lambda env, start_response: None, x_for=app.wsgi_app.x_for)(environ, None)
+    return environ
+
+
+async def read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def run_native(handler, scope, receive, send):
+    """Run a coroutine handler the way Flask's full_dispatch_request runs a view"""
+    ctx = app.request_context(build_environ(scope, await read_body(receive)))
+    ctx.push()
+    error = None
+    try:
+        try:
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = await handler()
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            response = app.finalize_request(rv)
+        except Exception as e:
+            error = e
+            response = app.handle_exception(e)
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in response.headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+    finally:
+        ctx.pop(error)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await asyncio.to_thread(init_app)
+            await db.open()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await db.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+wsgi_application = WSGIMiddleware(app, workers=ASGI_WSGI_THREADS)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http':
+        handler = NATIVE_ROUTES.get((scope['method'], scope['path']))
+        if handler is not None:
+            await run_native(handler, scope, receive, send)
+            return
+
+    await wsgi_application(scope, receive, send)
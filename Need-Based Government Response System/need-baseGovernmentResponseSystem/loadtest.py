@@ -0,0 +1,129 @@
+"""
+HTTP load generator for comparing the serving modes (see DEPLOYMENT.md)
+
+    python loadtest.py --url http://127.0.0.1:8000/api/requests?limit=50 --cores 4
+
+Steps through increasing numbers of keep-alive connections and reports
+requests/s and latency per server core. Standard library only, so it runs on
+any client machine without the app's dependencies.
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+async def read_http_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)"""
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    status = int(head[0].split()[1])
+    headers = {}
+    for line in head[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+    
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)  # Chunk and its CRLF (no trailers)
+            if size == 0:
+                break
+    else:
+        await reader.read()  # Body runs until the server closes the connection
+        return status, False
+    return status, headers.get('connection') != 'close'
+
+
+async def load_test_connection(host, port, request_bytes, deadline, latencies, errors):
+    """Send requests back to back on one keep-alive connection until deadline"""
+    writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.monotonic()
+            writer.write(request_bytes)
+            await writer.drain()
+            status, keep_alive = await read_http_response(reader)
+            latencies.append(time.monotonic() - started)
+            if status >= 400:
+                errors[f"HTTP {status}"] += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            errors[type(e).__name__] += 1
+            if writer is not None:
+                writer.close()
+                writer = None
+            await asyncio.sleep(0.1)  # Back off instead of spinning on a refused connection
+    if writer is not None:
+        writer.close()
+
+
+async def run_load_step(host, port, request_bytes, connections, duration):
+    latencies = []
+    errors = Counter()
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(load_test_connection(host, port, request_bytes, deadline, latencies, errors)
+                           for _ in range(connections)))
+    return sorted(latencies), errors
+
+
+def load_test(url, method, data, cookie, connection_steps, duration, cores, p99_target):
+    """Measure how many concurrent connections per core a running server sustains"""
+    target = urlsplit(url)
+    host, port = target.hostname, target.port or 80
+    path = target.path + (f"?{target.query}" if target.query else '')
+    
+    body = data.encode('utf-8') if data else b''
+    headers = [f"{method} {path} HTTP/1.1", f"Host: {target.netloc}", "Connection: keep-alive"]
+    if body:
+        headers += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    if cookie:
+        headers.append(f"Cookie: {cookie}")
+    request_bytes = ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+    
+    print(f"{method} {url}, {duration:g}s per step, {cores} server core(s)")
+    print(f"{'conns':>6} {'conns/core':>10} {'req/s':>9} {'req/s/core':>10} {'p50 ms':>8} {'p99 ms':>8}  errors")
+    best = None
+    for connections in (int(step) for step in connection_steps.split(',')):
+        latencies, errors = asyncio.run(run_load_step(host, port, request_bytes, connections, duration))
+        if latencies:
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+        else:
+            p50 = p99 = float('nan')
+        rate = len(latencies) / duration
+        print(f"{connections:>6} {connections / cores:>10.1f} {rate:>9.0f} {rate / cores:>10.0f} {p50:>8.1f} {p99:>8.1f}  "
+              f"{', '.join(f'{name}: {count}' for name, count in errors.items()) or '-'}")
+        if latencies and not errors and p99 <= p99_target:
+            best = connections
+    
+    if best is None:
+        print(f"No step stayed within p99 {p99_target:g} ms without errors")
+    else:
+        print(f"Sustained {best / cores:.1f} concurrent connections per core (p99 <= {p99_target:g} ms, no errors)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=load_test.__doc__)
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/requests?limit=50', help='Endpoint to load')
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--data', default=None, help='JSON request body (e.g. login credentials for POST /api/login)')
+    parser.add_argument('--cookie', default=None, help='Cookie header to send, e.g. session=... from a logged-in browser')
+    parser.add_argument('--connections', dest='connection_steps', default='10,50,100,250,500,1000',
+                        help='Concurrent connection counts to step through (comma-separated)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per step')
+    parser.add_argument('--cores', type=int, default=os.cpu_count(), help='CPU cores used by the server under test')
+    parser.add_argument('--p99-target', type=float, default=500.0, help='Latency budget (ms) for the summary line')
+    load_test(**vars(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# app.py is imported as a top-level module; its audit writer spools to disk when
+# there is no database, so keep that out of the source tree
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('AUDIT_SPOOL_DIR', tempfile.mkdtemp(prefix='audit_spool_'))
@@ -0,0 +1,32 @@
+import json
+
+import app
+
+
+def copy_columns(req):
+    return dict(zip(app.BULK_COPY_COLUMNS, app.bulk_copy_row(req)))
+
+
+def valid_row(**fields):
+    return {'citizenName': 'A', 'email': 'a@example.com', 'description': 'Laptop for classes',
+            'needType': 'educational', 'severity': 'urgent', **fields}
+
+
+def test_invalid_rows_are_reported():
+    fields, errors = app.validate_bulk_row({'needType': 'snacks', 'peopleAffected': -2})
+    assert fields is None
+    assert 'citizenName is required' in errors
+    assert 'peopleAffected must be a positive integer' in errors
+    assert app.validate_bulk_row('not a row') == (None, ['Row is not an object'])
+
+
+def test_copy_row_stores_educational_needs_column_like_single_submit():
+    fields, errors = app.validate_bulk_row(valid_row(educationalNeeds={'type': 'devices'}))
+    assert errors == []
+    req = app.RequestRecord.from_dict({**fields, 'id': 'REQ-000001', 'status': 'pending', 'priorityScore': 30,
+                                       'submittedAt': '2026-01-01T00:00:00', 'updatedAt': '2026-01-01T00:00:00'})
+    # save_request_to_db writes studentInfo to educational_needs and row_to_request reads it back from there
+    assert json.loads(copy_columns(req)['educational_needs']) == {}
+
+    req['studentInfo'] = {'year': 2}
+    assert json.loads(copy_columns(req)['educational_needs']) == {'year': 2}
@@ -0,0 +1,27 @@
+import app
+
+
+def test_id_allocator_hands_out_reserved_blocks(monkeypatch):
+    allocator = app.IdAllocator('request_id_seq', 'REQ-', 6, lambda: [])
+    reserved = iter([1, 101])
+
+    def reserve(needed):
+        # One nextval() per block of 100, like a sequence with INCREMENT BY 100
+        for _ in range(-(-needed // 100)):
+            start = next(reserved)
+            allocator._blocks.append((start, start + 100))
+        return True
+
+    monkeypatch.setattr(allocator, '_reserve', reserve)
+    assert allocator.allocate(3) == ['REQ-000001', 'REQ-000002', 'REQ-000003']
+    ids = allocator.allocate(150)
+    assert ids[0] == 'REQ-000004' and ids[-1] == 'REQ-000153'
+    assert allocator.next_id() == 'REQ-000154'
+
+
+def test_id_allocator_continues_after_existing_ids_without_database(monkeypatch):
+    allocator = app.IdAllocator('request_id_seq', 'REQ-', 6, lambda: ['REQ-000041', 'REQ-000007', 'legacy'])
+    monkeypatch.setattr(allocator, '_reserve', lambda needed: False)
+    assert allocator.allocate(2) == ['REQ-000042', 'REQ-000043']
+    assert allocator.parse('REQ-000042') == 42
+    assert allocator.parse('STAFF-0001') is None
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+import app
+
+
+def test_latency_sketch_quantiles_within_accuracy():
+    rng = random.Random(3)
+    values = sorted(rng.uniform(60, 30 * 86400) for _ in range(10000))
+    sketch = app.LatencySketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.mean() == pytest.approx(sum(values) / len(values))
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=app.LATENCY_SKETCH_ACCURACY)
+
+
+def test_latency_sketches_merge_like_one():
+    halves = [app.LatencySketch(), app.LatencySketch()]
+    whole = app.LatencySketch()
+    for i in range(1, 1000):
+        halves[i % 2].add(i * 37.0)
+        whole.add(i * 37.0)
+    halves[0].merge(halves[1])
+    assert halves[0].buckets == whole.buckets
+    assert halves[0].count == whole.count
+    assert halves[0].total == pytest.approx(whole.total)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+import app
+
+WEIGHTS = app.PriorityWeights.from_dict(app.DEFAULT_PRIORITY_WEIGHTS)
+
+
+def original_priority_score(req):
+    """calculate_priority_score as it was before weights became configurable"""
+    score = 0
+    score += {'critical': 40, 'urgent': 30, 'moderate': 15, 'low': 5}.get(req['severity'], 0)
+    vulnerability_weights = {'children': 0.4, 'elderly': 0.3, 'disabled': 0.4,
+                             'pregnant': 0.3, 'student': 0.2, 'none': 0}
+    vulnerability_bonus = sum(vulnerability_weights.get(group, 0)
+                              for group in req.get('vulnerabilityGroup', []))
+    score *= (1 + vulnerability_bonus)
+    score += min(req.get('peopleAffected', 1) * 2, 20)
+    score += {'medical': 10, 'water': 8, 'food': 7, 'shelter': 6, 'mental-health': 5,
+              'educational': 4, 'clothing': 3, 'financial': 3, 'other': 2}.get(req.get('needType'), 0)
+    if req.get('hasEvidence', False):
+        score += 5
+    if req.get('specialCircumstances'):
+        score += 5
+    return round(score)
+
+
+def random_requests(count, seed=7):
+    rng = random.Random(seed)
+    groups = list(WEIGHTS.vulnerability) + ['unknown']
+    return [{
+        'severity': rng.choice(list(WEIGHTS.severity) + ['unknown']),
+        # Repeats and any order, as submitted
+        'vulnerabilityGroup': [rng.choice(groups) for _ in range(rng.randint(0, 4))],
+        'peopleAffected': rng.randint(0, 15),
+        'needType': rng.choice(list(WEIGHTS.need_type) + [None]),
+        'hasEvidence': rng.random() < 0.5,
+        'specialCircumstances': rng.choice([None, '', 'Chronic illness'])
+    } for _ in range(count)]
+
+
+def test_scores_match_original_formula():
+    reqs = random_requests(20000)
+    assert [app.calculate_priority_score(req, WEIGHTS) for req in reqs] == \
+        [original_priority_score(req) for req in reqs]
+
+
+def test_repeated_and_reordered_groups_count_as_submitted():
+    req = {'severity': 'moderate', 'vulnerabilityGroup': ['children', 'student', 'pregnant'],
+           'peopleAffected': 0, 'needType': 'other'}
+    assert app.calculate_priority_score(req, WEIGHTS) == original_priority_score(req) == 31
+
+    req['vulnerabilityGroup'] = ['student', 'student']
+    assert app.calculate_priority_score(req, WEIGHTS) == original_priority_score(req)
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_batch_scores_match_per_request(monkeypatch, use_numpy):
+    if use_numpy and app.np is None:
+        pytest.skip('NumPy is not installed')
+    if not use_numpy:
+        monkeypatch.setattr(app, 'np', None)
+    reqs = random_requests(5000, seed=11)
+    assert app.calculate_priority_scores(reqs, WEIGHTS) == \
+        [app.calculate_priority_score(req, WEIGHTS) for req in reqs]
+
+
+def test_invalid_weights_are_rejected():
+    with pytest.raises(ValueError):
+        app.PriorityWeights.from_dict({'version': 3})
+
+    data = WEIGHTS.to_dict()
+    data['severity'] = {**data['severity'], 'critical': 'high'}
+    with pytest.raises(ValueError):
+        app.PriorityWeights.from_dict(data)
@@ -0,0 +1,35 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [600.0]
+    monkeypatch.setattr(app.time, 'time', lambda: now[0])
+    return now
+
+
+def test_sliding_window_limiter_blocks_then_releases(clock):
+    limiter = app.SlidingWindowLimiter('test', limit=3, window=60)
+    for _ in range(3):
+        assert limiter.retry_after('1.2.3.4') == 0
+        limiter.hit('1.2.3.4')
+    assert limiter.retry_after('1.2.3.4') > 0
+    assert limiter.retry_after('5.6.7.8') == 0
+
+    # Halfway through the next window the previous count weighs 1.5 of 3
+    clock[0] = 690.0
+    assert limiter.retry_after('1.2.3.4') == 0
+
+    limiter.hit('1.2.3.4')
+    limiter.reset('1.2.3.4')
+    assert limiter.stats()['keys'] == 0
+
+
+def test_sliding_window_limiter_evicts_least_recent_keys(clock):
+    limiter = app.SlidingWindowLimiter('test', limit=3, window=60, max_keys=2)
+    for key in ('a', 'b', 'c'):
+        limiter.hit(key)
+    assert limiter.stats()['keys'] == 2
+    assert limiter.stats()['evicted'] == 1
@@ -0,0 +1,24 @@
+import app
+
+
+def test_government_listing_follows_cached_principal(monkeypatch):
+    store = app.RequestStore()
+    store.add_many({'id': f"REQ-{i:06d}", 'email': 'citizen@example.com', 'needType': need_type,
+                    'severity': 'low', 'status': 'pending', 'priorityScore': i,
+                    'submittedAt': '2025-01-01T00:00:00', 'updatedAt': '2025-01-01T00:00:00'}
+                   for i, need_type in enumerate(['food', 'medical', 'shelter', 'educational']))
+    monkeypatch.setattr(app, 'requests_db', store)
+    monkeypatch.setattr(app.staff_cache, '_listening', True)  # No NOTIFY listener without a database
+
+    # Logged in as an admin, since moved to a department-scoped role
+    principal = app.StaffPrincipal('STAFF-0001', 'officer@example.gov', 'Officer', 'Health Department',
+                                   'officer', 'active', {}, None)
+    app.staff_cache.put(principal.email, principal)
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_role='government', user_email=principal.email, user_position='admin', user_department='')
+
+    listed = client.get('/api/requests').get_json()
+    assert sorted(r['needType'] for r in listed) == ['food', 'medical']
+
+    app.staff_cache.invalidate(principal.email)
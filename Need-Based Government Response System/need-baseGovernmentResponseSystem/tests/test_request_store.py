@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+import app
+
+NEED_TYPES = ['food', 'medical', 'shelter', 'educational']
+STATUSES = ['pending', 'in-progress', 'completed']
+
+
+def make_request(i, rng):
+    submitted_at = f"2025-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00"
+    return {
+        'id': f"REQ-{i:06d}",
+        'email': f"citizen{i % 25}@example.com",
+        'needType': rng.choice(NEED_TYPES),
+        'severity': rng.choice(['critical', 'urgent', 'moderate', 'low']),
+        'status': rng.choice(STATUSES),
+        'vulnerabilityGroup': rng.choice([[], ['student'], ['elderly', 'children']]),
+        'isStudent': rng.random() < 0.2,
+        'peopleAffected': rng.randint(1, 10),
+        'priorityScore': rng.randint(0, 60),
+        'submittedAt': submitted_at,
+        'updatedAt': submitted_at
+    }
+
+
+@pytest.fixture
+def store():
+    rng = random.Random(5)
+    store = app.RequestStore()
+    store.add_many(make_request(i, rng) for i in range(2000))
+    return store
+
+
+def assert_consistent(store):
+    """Every index, ordering and counter agrees with a rebuild from the stored requests"""
+    reqs = list(store._by_id.values())
+    assert store.verify_counters() == {}
+    for status in STATUSES:
+        assert sorted(r['id'] for r in store.by_status(status)) == \
+            sorted(r['id'] for r in reqs if r['status'] == status)
+    for need_type in NEED_TYPES:
+        assert sorted(r['id'] for r in store.by_need_types([need_type])) == \
+            sorted(r['id'] for r in reqs if r['needType'] == need_type)
+    assert [app.queue_key(r) for r in store.all()] == sorted(app.queue_key(r) for r in reqs)
+    assert [r['id'] for r in store.view({'food', 'medical'})] == \
+        [r['id'] for r in store.all() if r['needType'] in ('food', 'medical')]
+    assert [r['id'] for r in store.changed_since(('', ''), len(reqs))] == \
+        [r['id'] for r in sorted(reqs, key=lambda r: (r['updatedAt'], r['id']))]
+
+
+def test_indexes_stay_consistent_through_updates(store):
+    rng = random.Random(6)
+    store.view({'food', 'medical'})  # Built now, so it must be kept up to date incrementally
+    assert_consistent(store)
+
+    for request_id in rng.sample(sorted(store._by_id), 200):
+        store.remove(request_id)
+    for request_id in rng.sample(sorted(store._by_id), 300):
+        store.set_status(store.get(request_id), rng.choice(STATUSES), '2025-02-01T00:00:00')
+    store.set_statuses([store.get(i) for i in rng.sample(sorted(store._by_id), 50)],
+                       'completed', '2025-02-02T00:00:00')
+    store.add(make_request(1, rng))  # Replaces the stored copy
+
+    weights = app.PriorityWeights.from_dict({**app.DEFAULT_PRIORITY_WEIGHTS,
+                                             'severity': {'critical': 10, 'urgent': 40, 'moderate': 5, 'low': 25}})
+    store.rescore(weights, app.ACTIVE_STATUSES, updated_at='2025-03-01T00:00:00')
+    assert_consistent(store)
+
+
+def test_rescore_marks_changed_requests_updated(store):
+    weights = app.PriorityWeights.from_dict({**app.DEFAULT_PRIORITY_WEIGHTS,
+                                             'severity': {'critical': 70, 'urgent': 30, 'moderate': 15, 'low': 5}})
+    changed = store.rescore(weights, app.ACTIVE_STATUSES, updated_at='2030-01-01T00:00:00')
+    rescored = store.changed_since(('2029-12-31T00:00:00', ''), len(store))
+    assert changed == len(rescored) > 0
+    for req in rescored:
+        assert req['status'] in app.ACTIVE_STATUSES
+        assert req['priorityScore'] == app.calculate_priority_score(req, weights)
+
+
+def test_load_replaces_contents(store):
+    rng = random.Random(8)
+    store.load([make_request(i, rng) for i in range(5000, 5010)])
+    assert len(store) == 10
+    assert 'REQ-000001' not in store
+    assert_consistent(store)
+
+
+@pytest.mark.parametrize('filters, allowed_types, email', [
+    ({}, None, None),
+    ({'status': 'pending'}, None, None),
+    ({'needType': 'food', 'severity': 'low'}, None, None),
+    ({}, {'medical', 'shelter'}, None),
+    ({}, None, 'citizen3@example.com'),
+])
+def test_listing_pages_round_trip_through_cursors(store, filters, allowed_types, email):
+    filters = {'status': None, 'severity': None, 'needType': None,
+               'submittedFrom': None, 'submittedTo': None, **filters}
+    expected = sorted(
+        (r for r in store._by_id.values()
+         if all(filters[field] in (None, r[field]) for field in ('status', 'severity', 'needType'))
+         and (allowed_types is None or r['needType'] in allowed_types)
+         and (email is None or r['email'] == email)),
+        key=app.listing_key, reverse=True
+    )
+
+    listed, after = [], None
+    while True:
+        page = app.query_requests_page_in_memory(store, filters, allowed_types, email, after, 40)
+        listed.extend(page[:40])
+        if len(page) <= 40:
+            break
+        after = app.decode_cursor(app.encode_cursor(page[39]))
+    assert [r['id'] for r in listed] == [r['id'] for r in expected]
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        app.decode_cursor('not-a-cursor')
+
+
+def test_record_fields_read_back_as_stored():
+    record = app.RequestRecord(id='REQ-000001', studentInfo={}, vulnerabilityGroup=['student'])
+    assert 'student' in record['vulnerabilityGroup']
+    with pytest.raises(TypeError):
+        record['studentInfo']['year'] = 2
+    record['studentInfo'] = {'year': 2}
+    assert record['studentInfo'] == {'year': 2}
+    assert record.to_dict() == {'id': 'REQ-000001', 'vulnerabilityGroup': ['student'], 'studentInfo': {'year': 2}}
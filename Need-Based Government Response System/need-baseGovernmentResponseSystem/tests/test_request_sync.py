@@ -0,0 +1,102 @@
+import pytest
+
+import app
+
+
+class FakeOutbox:
+    """request_outbox rows visible to catch_up(), as (outbox_id, change_type, origin, request)"""
+
+    def __init__(self):
+        self.rows = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        self.params = params
+
+    def fetchall(self):
+        after, limit = self.params
+        return [row for row in sorted(self.rows, key=lambda r: r[0]) if row[0] > after][:limit]
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def commit_row(self, outbox_id, request_id):
+        self.rows.append((outbox_id, 'created', 'other-worker', {
+            'id': request_id, 'email': 'a@example.com', 'needType': 'food', 'severity': 'low',
+            'status': 'pending', 'priorityScore': 10, 'vulnerabilityGroup': [],
+            'submittedAt': '2026-01-01T00:00:00', 'updatedAt': '2026-01-01T00:00:00'
+        }))
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    outbox = FakeOutbox()
+    monkeypatch.setattr(app, 'get_db_connection', lambda: outbox)
+    monkeypatch.setattr(app, 'row_to_request', lambda columns: dict(columns[0]))
+    monkeypatch.setattr(app, 'requests_db', app.RequestStore())
+    monkeypatch.setattr(app, 'OUTBOX_BATCH_SIZE', 2)
+    monkeypatch.setattr(app, 'DELTA_SYNC_LAG_SECONDS', 5)
+    return outbox
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_late_commit_below_the_watermark_is_applied(outbox, clock, monkeypatch):
+    monkeypatch.setattr(app.get_event_broker(), 'ensure_listener', lambda: None)
+    sync = app.RequestCacheSync()
+    sync.start(0)
+
+    # Id 2 was taken by a transaction that commits after 3 and 4
+    for outbox_id in (1, 3, 4):
+        outbox.commit_row(outbox_id, f"REQ-00000{outbox_id}")
+    sync.catch_up()
+    assert sync.last_outbox_id == 1
+    assert 'REQ-000004' in app.requests_db
+
+    clock[0] += 1
+    outbox.commit_row(2, 'REQ-000002')
+    sync.catch_up()
+    assert 'REQ-000002' in app.requests_db
+    assert sync.last_outbox_id == 4
+    assert sync.stats()['applied'] == 4
+
+
+def test_gap_that_never_commits_is_skipped_after_the_lag(outbox, clock, monkeypatch):
+    monkeypatch.setattr(app.get_event_broker(), 'ensure_listener', lambda: None)
+    sync = app.RequestCacheSync()
+    sync.start(0)
+
+    outbox.commit_row(1, 'REQ-000001')
+    outbox.commit_row(4, 'REQ-000004')
+    sync.catch_up()
+    assert sync.last_outbox_id == 1
+
+    clock[0] += 10
+    sync.catch_up()
+    assert sync.last_outbox_id == 4
+    assert sync.stats()['pendingGaps'] == 0
+    assert sync.stats()['applied'] == 2
+
+
+def test_bulk_ingest_stores_nothing_without_a_database(monkeypatch):
+    monkeypatch.setattr(app, 'get_db_connection', lambda: None)
+    monkeypatch.setattr(app, 'requests_db', app.RequestStore())
+    monkeypatch.setattr(app.request_ids, '_reserve', lambda needed: False)
+    row = {'citizenName': 'A', 'email': 'a@example.com', 'description': 'Water needed',
+           'needType': 'water', 'severity': 'urgent'}
+    with pytest.raises(app.BulkIngestUnavailable):
+        app.ingest_requests([row], 'admin@example.com')
+    assert len(app.requests_db) == 0
@@ -0,0 +1,28 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = app.RequestStore()
+    store.add({'id': 'REQ-000001', 'email': 'citizen@example.com', 'needType': 'food',
+               'severity': 'low', 'status': 'pending', 'priorityScore': 10,
+               'submittedAt': '2025-01-01T00:00:00', 'updatedAt': '2025-01-01T00:00:00'})
+    monkeypatch.setattr(app, 'requests_db', store)
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_role='admin', user_email='admin@example.gov')
+    return client
+
+
+@pytest.mark.parametrize('url, body', [
+    ('/api/requests/REQ-000001/status', {'status': 'done'}),
+    ('/api/requests/REQ-000001/status', {}),
+    ('/api/requests/status', {'requestIds': ['REQ-000001'], 'status': 'done'}),
+])
+def test_unknown_status_is_rejected(client, url, body):
+    response = client.put(url, json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('status must be one of')
+    assert app.requests_db.get('REQ-000001')['status'] == 'pending'